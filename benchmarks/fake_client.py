@@ -0,0 +1,85 @@
+import json
+from types import SimpleNamespace
+
+from openai.types.chat.chat_completion import ChatCompletion, Choice
+from openai.types.chat.chat_completion_chunk import ChatCompletionChunk
+
+from swarm.types import ChatCompletionMessage, ChatCompletionMessageToolCall, Function
+
+
+def make_completion(content="", function_calls=(), model="gpt-4o") -> ChatCompletion:
+    tool_calls = [
+        ChatCompletionMessageToolCall(
+            id=f"call_{i}",
+            type="function",
+            function=Function(
+                name=call["name"], arguments=json.dumps(call.get("args", {}))
+            ),
+        )
+        for i, call in enumerate(function_calls)
+    ] or None
+    return ChatCompletion(
+        id="bench",
+        created=0,
+        model=model,
+        object="chat.completion",
+        choices=[
+            Choice(
+                index=0,
+                finish_reason="tool_calls" if tool_calls else "stop",
+                message=ChatCompletionMessage(
+                    role="assistant", content=content, tool_calls=tool_calls
+                ),
+            )
+        ],
+    )
+
+
+def make_chunks(tokens=(), function_calls=(), model="gpt-4o") -> list:
+    deltas = [{"role": "assistant", "content": ""}]
+    deltas += [{"content": token} for token in tokens]
+    for i, call in enumerate(function_calls):
+        deltas.append(
+            {
+                "tool_calls": [
+                    {
+                        "index": i,
+                        "id": f"call_{i}",
+                        "type": "function",
+                        "function": {
+                            "name": call["name"],
+                            "arguments": json.dumps(call.get("args", {})),
+                        },
+                    }
+                ]
+            }
+        )
+    return [
+        ChatCompletionChunk(
+            id="bench",
+            created=0,
+            model=model,
+            object="chat.completion.chunk",
+            choices=[{"index": 0, "delta": delta}],
+        )
+        for delta in deltas
+    ]
+
+
+class FakeClient:
+    """
+    Zero-latency stand-in for `OpenAI()`, so benchmarks only measure Swarm.
+
+    `respond` receives the create params of each request and returns a
+    ChatCompletion, or a list of ChatCompletionChunks for streamed requests.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **create_params):
+        self.requests += 1
+        response = self.respond(create_params)
+        return iter(response) if create_params.get("stream") else response
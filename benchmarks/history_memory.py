@@ -0,0 +1,57 @@
+"""
+Per-turn cost of a long REPL-style session, where the whole transcript is
+passed back to `Swarm.run` on every turn (as `run_demo_loop` does).
+
+Usage: python -m benchmarks.history_memory [--turns 1500]
+"""
+
+import argparse
+import copy
+import time
+import tracemalloc
+
+from swarm import Agent, Swarm
+
+from .fake_client import FakeClient, make_completion
+
+CHECKPOINTS = (100, 250, 500, 1000, 1500, 2000, 5000)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=1500)
+    args = parser.parse_args()
+
+    reply = make_completion(content="Sure, happy to help with that. " * 8)
+    client = Swarm(client=FakeClient(lambda params: reply))
+    agent = Agent()
+    messages = []
+
+    print(f"{'messages':>9} {'run (us)':>10} {'peak (KiB)':>11} {'deepcopy (us)':>14}")
+    tracemalloc.start()
+    for turn in range(1, args.turns + 1):
+        messages.append({"role": "user", "content": f"Question number {turn}?"})
+
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        response = client.run(agent=agent, messages=messages)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+
+        messages.extend(response.messages)
+
+        if len(messages) // 2 in CHECKPOINTS:
+            # what copying the transcript up front used to cost on its own
+            start = time.perf_counter()
+            copy.deepcopy(messages)
+            deepcopy_time = time.perf_counter() - start
+            print(
+                f"{len(messages):>9} {elapsed * 1e6:>10.0f} "
+                f"{(peak - before) / 1024:>11.1f} {deepcopy_time * 1e6:>14.0f}"
+            )
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
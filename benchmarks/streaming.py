@@ -0,0 +1,82 @@
+"""
+Cost of consuming a long streamed response, per token.
+
+Compares the previous per-delta path (`json.loads(delta.json())` followed by
+`merge_chunk`) with the typed path used by `run_and_stream` today, and
+times a full `run_and_stream` turn on a zero-latency fake client.
+
+Usage: python -m benchmarks.streaming [--tokens 10000]
+"""
+
+import argparse
+import json
+import time
+import warnings
+from collections import defaultdict
+
+from swarm import Agent, Swarm
+from swarm.util import StreamedMessage, delta_to_dict, merge_chunk
+
+from .fake_client import FakeClient, make_chunks
+
+
+def legacy_consume(chunks):
+    message = {
+        "content": "",
+        "sender": "Agent",
+        "role": "assistant",
+        "function_call": None,
+        "tool_calls": defaultdict(
+            lambda: {"function": {"arguments": "", "name": ""}, "id": "", "type": ""}
+        ),
+    }
+    for chunk in chunks:
+        delta = json.loads(chunk.choices[0].delta.json())
+        delta.pop("role", None)
+        merge_chunk(message, delta)
+    return message
+
+
+def typed_consume(chunks):
+    message = StreamedMessage("Agent")
+    for chunk in chunks:
+        delta = chunk.choices[0].delta
+        delta_to_dict(delta)
+        message.add(delta)
+    return message.to_dict()
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=10_000)
+    args = parser.parse_args()
+
+    tokens = [f"tok{i} " for i in range(args.tokens)]
+    chunks = make_chunks(tokens)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        legacy = timed(legacy_consume, chunks)
+    typed = timed(typed_consume, chunks)
+
+    client = Swarm(client=FakeClient(lambda params: chunks))
+    messages = [{"role": "user", "content": "Tell me a long story."}]
+    end_to_end = timed(
+        lambda: list(client.run(agent=Agent(), messages=messages, stream=True))
+    )
+
+    per_token = 1e6 / len(chunks)
+    print(f"{len(chunks)} chunks")
+    print(f"json round trip + merge_chunk: {legacy * 1e3:8.1f} ms ({legacy * per_token:.2f} us/token)")
+    print(f"typed deltas + StreamedMessage: {typed * 1e3:7.1f} ms ({typed * per_token:.2f} us/token)")
+    print(f"run_and_stream end to end:     {end_to_end * 1e3:8.1f} ms ({end_to_end * per_token:.2f} us/token)")
+
+
+if __name__ == "__main__":
+    main()
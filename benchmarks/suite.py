@@ -0,0 +1,221 @@
+"""
+Orchestration overhead of `Swarm.run` and `run_and_stream`, excluding model
+latency: every completion comes from a zero-latency fake client, so the
+numbers are Swarm's own cost per turn.
+
+Scenarios (name/parameter):
+    history/N   one turn on top of N earlier messages
+    tools/N     an agent with N functions calls one of them, then answers
+    fanout/N    one completion with N parallel tool calls, then an answer
+    handoffs/N  a chain of N handoffs, one agent per turn
+    stream/N    one streamed turn of N tokens
+
+Each case reports the median wall time per turn over `--repeat` runs and
+the peak memory allocated by one run (tracemalloc, measured separately so
+it doesn't slow the timed runs).
+
+Usage:
+    python -m benchmarks.suite [--repeat 20] [--filter history] [--output results.json]
+    python -m benchmarks.suite --baseline results.json [--threshold 1.2]
+
+With `--baseline`, cases slower (or using more memory) than the baseline by
+more than `--threshold` are listed and the exit status is 1.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from swarm import Agent, Swarm
+
+from .fake_client import FakeClient, make_chunks, make_completion
+
+REPLY = make_completion(content="Sure, happy to help with that.")
+
+
+def make_tool(name: str):
+    def tool(query: str = "") -> str:
+        return "ok"
+
+    tool.__name__ = name
+    return tool
+
+
+def tool_then_reply(call):
+    # call a tool on the first request, answer once tool results are in
+    first = make_completion(function_calls=call)
+
+    def respond(params):
+        return REPLY if params["messages"][-1]["role"] == "tool" else first
+
+    return respond
+
+
+def history_case(n: int):
+    messages = []
+    for i in range(n // 2):
+        messages.append({"role": "user", "content": f"Question number {i}?"})
+        messages.append({"role": "assistant", "content": "An answer. " * 8})
+    messages.append({"role": "user", "content": "One more question?"})
+    fake = FakeClient(lambda params: REPLY)
+    client = Swarm(client=fake)
+    agent = Agent()
+    return fake, lambda: client.run(agent=agent, messages=messages)
+
+
+def tools_case(n: int):
+    agent = Agent(functions=[make_tool(f"tool_{i}") for i in range(n)])
+    fake = FakeClient(tool_then_reply([{"name": "tool_0", "args": {"query": "x"}}]))
+    client = Swarm(client=fake)
+    messages = [{"role": "user", "content": "Use a tool."}]
+    return fake, lambda: client.run(agent=agent, messages=messages)
+
+
+def fanout_case(n: int):
+    agent = Agent(functions=[make_tool("lookup")])
+    fake = FakeClient(
+        tool_then_reply([{"name": "lookup", "args": {"query": str(i)}} for i in range(n)])
+    )
+    client = Swarm(client=fake)
+    messages = [{"role": "user", "content": "Look these up."}]
+    return fake, lambda: client.run(agent=agent, messages=messages)
+
+
+def handoffs_case(n: int):
+    def make_transfer(target: Agent, name: str):
+        def transfer():
+            return target
+
+        transfer.__name__ = name
+        return transfer
+
+    # agent i hands off to agent i + 1; the last one answers
+    agents = [Agent(name=f"Agent {i}") for i in range(n + 1)]
+    handoffs = {}
+    for i, agent in enumerate(agents[:-1]):
+        name = f"transfer_to_agent_{i + 1}"
+        agent.functions = [make_transfer(agents[i + 1], name)]
+        handoffs[name] = make_completion(function_calls=[{"name": name}])
+
+    def respond(params):
+        tools = params["tools"]
+        return handoffs[tools[0]["function"]["name"]] if tools else REPLY
+
+    fake = FakeClient(respond)
+    client = Swarm(client=fake)
+    messages = [{"role": "user", "content": "Pass me along."}]
+    return fake, lambda: client.run(agent=agents[0], messages=messages)
+
+
+def stream_case(n: int):
+    chunks = make_chunks([f"tok{i} " for i in range(n)])
+    fake = FakeClient(lambda params: chunks)
+    client = Swarm(client=fake)
+    agent = Agent()
+    messages = [{"role": "user", "content": "Tell me a long story."}]
+    return fake, lambda: list(client.run(agent=agent, messages=messages, stream=True))
+
+
+SCENARIOS = {
+    "history": (history_case, (10, 100, 1000, 10000)),
+    "tools": (tools_case, (1, 10, 50)),
+    "fanout": (fanout_case, (1, 8, 32)),
+    "handoffs": (handoffs_case, (1, 5, 20)),
+    "stream": (stream_case, (100, 1000, 10000)),
+}
+
+
+def measure(fake: FakeClient, run, repeat: int) -> dict:
+    run()  # warm up caches (tool schemas, imports)
+    requests = fake.requests
+    run()
+    turns = fake.requests - requests
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = statistics.median(times)
+    return {
+        "turns": turns,
+        "seconds": seconds,
+        "per_turn_us": seconds / turns * 1e6,
+        "peak_kib": peak / 1024,
+    }
+
+
+def run_suite(repeat: int, name_filter: str = None) -> dict:
+    results = {}
+    for name, (case, params) in SCENARIOS.items():
+        for param in params:
+            key = f"{name}/{param}"
+            if name_filter and name_filter not in key:
+                continue
+            result = results[key] = measure(*case(param), repeat)
+            print(f"{key:<16} {result['per_turn_us']:>12.1f} {result['peak_kib']:>11.1f}")
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Returns the cases slower or larger than baseline by more than threshold."""
+    regressions = []
+    print(f"\n{'vs baseline':<16} {'time':>12} {'memory':>11}")
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        time_ratio = result["per_turn_us"] / base["per_turn_us"]
+        memory_ratio = result["peak_kib"] / max(base["peak_kib"], 1e-9)
+        print(f"{key:<16} {time_ratio:>11.2f}x {memory_ratio:>10.2f}x")
+        if time_ratio > threshold or memory_ratio > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--filter", help="only run cases containing this text")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args()
+
+    print(f"{'case':<16} {'us/turn':>12} {'peak (KiB)':>11}")
+    results = run_suite(args.repeat, args.filter)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "repeat": args.repeat,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressed by more than {args.threshold}x: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,4 +19,15 @@ engine_name = 'local'
 
 max_iterations = 5
 
+# Test tasks run (and are graded) concurrently by this many threads each
+test_workers = 8
+
+# Optional snapshot of the parsed tool and assistant configs, e.g.
+# 'configs/registry_snapshot.json', for faster startup with large configs
+registry_snapshot = None
+
+# Ids and config hashes of the assistants created by the assistants engine,
+# so unchanged assistants are reused at startup
+assistants_manifest = 'configs/assistants_manifest.json'
+
 persist = False
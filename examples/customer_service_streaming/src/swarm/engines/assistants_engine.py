@@ -1,21 +1,36 @@
+import hashlib
 import json
 import os
 from src.utils import get_completion
-from configs.general import Colors
+from configs.general import Colors, assistants_manifest, registry_snapshot
 from configs.prompts import TRIAGE_SYSTEM_PROMPT, TRIAGE_MESSAGE_PROMPT, EVALUATE_TASK_PROMPT
 import time
+from concurrent.futures import ThreadPoolExecutor
 from src.swarm.assistants import Assistant
+from src.swarm.registry import LocalRegistry
 from src.tasks.task import EvaluationTask
-from openai import OpenAI
-import importlib
+from src.swarm.engines.local_engine import load_tool_handler
+from openai import APIError
+
+# Run statuses after which a run makes no more progress
+TERMINAL_STATUSES = {"completed", "expired", "cancelling", "cancelled", "failed", "incomplete"}
+
+# assistant.json keys that are sent to the Assistants API
+ASSISTANT_PARAMS = {"model", "description", "instructions", "metadata", "temperature", "top_p", "response_format"}
 
 
 class AssistantsEngine:
-    def __init__(self,client,tasks):
+    def __init__(self,client,tasks,manifest_path=assistants_manifest):
         self.client = client
         self.assistants = []
         self.tasks = tasks
+        self.manifest_path = manifest_path
         self.thread = self.initialize_thread()
+        # outputs of the tool calls already run, by tool call id, and the ids
+        # of those submitted, so polling a run whose stream broke off doesn't
+        # run or submit a tool call twice
+        self.tool_outputs = {}
+        self.submitted_tool_calls = set()
 
 
     def initialize_thread(self):
@@ -28,54 +43,65 @@ class AssistantsEngine:
         self.thread = self.client.beta.threads.create()
 
     def load_all_assistants(self):
-        base_path = 'assistants'
-        tools_base_path = 'tools'
-
-        # Load individual tool definitions from the tools directory
-        tool_defs = {}
-        for tool_dir in os.listdir(tools_base_path):
-            if '__pycache__' in tool_dir:
-                continue
-            tool_dir_path = os.path.join(tools_base_path, tool_dir)
-            if os.path.isdir(tool_dir_path):
-                tool_json_path = os.path.join(tool_dir_path, 'tool.json')
-                if os.path.isfile(tool_json_path):
-                    with open(tool_json_path, 'r') as file:
-                        # Assuming the JSON file contains a list of tool definitions
-                        tool_def = json.load(file)
-                        tool_defs[tool_def['function']['name']] = tool_def['function']
-        # Load assistants and their tools
-        for assistant_dir in os.listdir(base_path):
-            if '__pycache__' in assistant_dir:
-                continue
-            assistant_config_path = os.path.join(base_path, assistant_dir, "assistant.json")
-            if os.path.exists(assistant_config_path):
-                with open(assistant_config_path, "r") as file:
-                    assistant_config = json.load(file)[0]
-
-                    assistant_name = assistant_config.get('name', assistant_dir)
-                    log_flag = assistant_config.pop('log_flag', False)
-
-                    # List of tool names from the assistant's config
-                    assistant_tools_names = assistant_config.get('tools', [])
-
-                    # Build the list of tool definitions for this assistant
-                    assistant_tools = [tool_defs[name] for name in assistant_tools_names if name in tool_defs]
-
-                    # Create or update the assistant instance
-                    existing_assistants = self.client.beta.assistants.list()
-                    loaded_assistant = next((a for a in existing_assistants if a.name == assistant_name), None)
-
-                    if loaded_assistant:
-                        assistant_tools = [{'type': 'function', 'function': tool_defs[name]} for name in assistant_tools_names if name in tool_defs]
-                        assistant_config['tools'] = assistant_tools
-                        assistant_config['name']=assistant_name
+        """
+        Creates or updates the remote assistant for each assistant config.
 
-                        loaded_assistant = self.client.beta.assistants.create(**assistant_config)
-                        print(f"Assistant '{assistant_name}' created.\n")
+        The remote assistants are listed once and indexed by name, and the
+        manifest keeps the id and a hash of what was last sent for each one,
+        so unchanged assistants are reused without any further API calls.
+        """
+        registry = LocalRegistry.load(snapshot_path=registry_snapshot)
+        manifest = self.read_manifest()
+        remote_by_id = {}
+        remote_by_name = {}
+        # iterating the page fetches the next pages, if any
+        for remote in self.client.beta.assistants.list(limit=100):
+            remote_by_id[remote.id] = remote
+            remote_by_name.setdefault(remote.name, remote)  # newest first
+
+        changed = False
+        for assistant_name, assistant_config in registry.assistant_configs.items():
+            log_flag = assistant_config.get('log_flag', False)
+            params = {key: value for key, value in assistant_config.items() if key in ASSISTANT_PARAMS}
+            params['name'] = assistant_name
+            params['tools'] = [
+                {'type': 'function', 'function': registry.tool_defs[tool.function.name]['function']}
+                for tool in registry.assistant_tools[assistant_name]
+            ]
+            digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+            entry = manifest.get(assistant_name, {})
+            loaded_assistant = remote_by_id.get(entry.get('id')) or remote_by_name.get(assistant_name)
+            if loaded_assistant is None:
+                loaded_assistant = self.client.beta.assistants.create(**params)
+                print(f"Assistant '{assistant_name}' created.\n")
+            elif entry.get('id') != loaded_assistant.id or entry.get('hash') != digest:
+                loaded_assistant = self.client.beta.assistants.update(loaded_assistant.id, **params)
+                print(f"Assistant '{assistant_name}' updated.\n")
+
+            if entry != {'id': loaded_assistant.id, 'hash': digest}:
+                manifest[assistant_name] = {'id': loaded_assistant.id, 'hash': digest}
+                changed = True
+            asst_object = Assistant(name=assistant_name, log_flag=log_flag, instance=loaded_assistant, tools=params['tools'])
+            self.assistants.append(asst_object)
+
+        if changed:
+            self.write_manifest(manifest)
+
+    def read_manifest(self):
+        """Assistant name -> {"id", "hash"} of the remote assistant last created or updated."""
+        if not self.manifest_path or not os.path.isfile(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r') as file:
+                return json.load(file)
+        except (IOError, json.JSONDecodeError):
+            return {}  # corrupt manifest: every assistant gets updated once
 
-                    asst_object = Assistant(name=assistant_name, log_flag=log_flag, instance=loaded_assistant, tools=assistant_tools)
-                    self.assistants.append(asst_object)
+    def write_manifest(self, manifest):
+        if self.manifest_path:
+            with open(self.manifest_path, 'w') as file:
+                json.dump(manifest, file, indent=2, sort_keys=True)
 
 
     def initialize_and_display_assistants(self):
@@ -144,32 +170,19 @@ class AssistantsEngine:
             content=request
         )
 
-        # Initialize run
-        run = self.client.beta.threads.runs.create(
-            thread_id=self.thread.id,
-            assistant_id=assistant.instance.id
-        )
-
-        # Monitor the run status in a loop
-        while True:
-            run = self.client.beta.threads.runs.retrieve(
+        # Start the run and follow its events; poll if the stream breaks off
+        self.tool_outputs.clear()
+        self.submitted_tool_calls.clear()
+        run = self.stream_run(assistant)
+        if run is None:
+            run = self.client.beta.threads.runs.create(
                 thread_id=self.thread.id,
-                run_id=run.id
+                assistant_id=assistant.instance.id
             )
-
-            if run.status in ["queued", "in_progress"]:
-                time.sleep(2)  # Wait before checking the status again
-                if not test_mode:
-                    print('waiting for run')
-            elif run.status == "requires_action":
-                tool_call = run.required_action.submit_tool_outputs.tool_calls[0]
-                self.handle_tool_call(tool_call, run)
-                # Re-submitting the tool outputs and continue the loop
-
-            elif run.status in ["completed","expired", "cancelling", "cancelled", "failed"]:
-                if not test_mode:
-                    print(f'\nrun {run.status}')
-                break
+        if run.status not in TERMINAL_STATUSES:
+            run = self.poll_run(run, test_mode)
+        if not test_mode:
+            print(f'\nrun {run.status}')
 
         if assistant.log_flag:
             self.store_messages()
@@ -186,17 +199,89 @@ class AssistantsEngine:
         return "No response from the assistant."
 
 
-    def handle_tool_call(self, tool_call, run):
+    def stream_run(self, assistant):
+        """
+        Creates a streamed run and follows its events, submitting tool outputs
+        as soon as the run requires them. Returns the last state of the run
+        seen, or None if the run couldn't be streamed.
+        """
+        run = None
+        try:
+            events = self.client.beta.threads.runs.create(
+                thread_id=self.thread.id,
+                assistant_id=assistant.instance.id,
+                stream=True
+            )
+            while events is not None:
+                # closes the stream, and its connection, when we stop reading early
+                with events:
+                    for event in events:
+                        # thread.run.* events carry the run; thread.run.step.* carry steps
+                        if event.event.startswith('thread.run.') and not event.event.startswith('thread.run.step'):
+                            run = event.data
+                        if event.event == 'thread.run.requires_action':
+                            break
+                events = None
+                if run is not None and run.status == 'requires_action':
+                    events = self.submit_tool_outputs(run, stream=True)
+        except APIError as e:
+            print(f"Run stream interrupted ({e}), polling instead")
+        return run
+
+    def poll_run(self, run, test_mode):
+        """
+        Polls a run until it finishes, starting at 100ms and backing off to
+        2s, and submitting tool outputs whenever the run requires them.
+        """
+        delay = 0.1
+        while True:
+            # re-read first: the state we were given may be stale
+            run = self.client.beta.threads.runs.retrieve(
+                thread_id=self.thread.id,
+                run_id=run.id
+            )
+            if run.status in TERMINAL_STATUSES:
+                return run
+            # a run can still require the outputs we submitted, until it takes them
+            if run.status == "requires_action" and self.submit_tool_outputs(run) is not None:
+                delay = 0.1
+                continue
+            if not test_mode:
+                print('waiting for run')
+            time.sleep(delay)
+            delay = min(delay * 2, 2.0)
+
+    def submit_tool_outputs(self, run, stream=False):
+        """
+        Runs all the tool calls the run requires concurrently and submits their
+        outputs together. Tool calls that already ran reuse their outputs, and
+        if all of them were submitted already, nothing is sent and None is
+        returned.
+        """
+        tool_calls = run.required_action.submit_tool_outputs.tool_calls
+        if all(tool_call.id in self.submitted_tool_calls for tool_call in tool_calls):
+            return None
+        pending = [tool_call for tool_call in tool_calls if tool_call.id not in self.tool_outputs]
+        if pending:
+            with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+                for tool_output in pool.map(self.handle_tool_call, pending):
+                    self.tool_outputs[tool_output["tool_call_id"]] = tool_output
+        submitted = self.client.beta.threads.runs.submit_tool_outputs(
+            thread_id=self.thread.id,
+            run_id=run.id,
+            tool_outputs=[self.tool_outputs[tool_call.id] for tool_call in tool_calls],
+            stream=stream,
+        )
+        self.submitted_tool_calls.update(tool_call.id for tool_call in tool_calls)
+        return submitted
+
+    def handle_tool_call(self, tool_call):
+        """Runs a tool call's handler and returns its tool output."""
         tool_name = tool_call.function.name
-        tool_dir = os.path.join(os.getcwd(), 'tools', tool_name)
-        handler_path = os.path.join(tool_dir, 'handler.py')
 
-        # Dynamically import the handler function from the handler.py file
-        if os.path.isfile(handler_path):
-            spec = importlib.util.spec_from_file_location(f"{tool_name}_handler", handler_path)
-            tool_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(tool_module)
-            tool_handler = getattr(tool_module, tool_name+ '_assistants')
+        # Import the handler function from the handler.py file, once per process
+        tool_handler = load_tool_handler(tool_name, '_assistants')
+        if tool_handler is not None:
 
             # Prepare the arguments for the handler function
             handler_args = {'tool_id': tool_call.id}
@@ -209,20 +294,15 @@ class AssistantsEngine:
             print(f"{Colors.HEADER}Running Tool:{Colors.ENDC} {tool_name}")
             print(handler_args)
             tool_response = tool_handler(**handler_args)
-
-            # Submit the tool response back to the thread
-            self.client.beta.threads.runs.submit_tool_outputs(
-                thread_id=self.thread.id,
-                run_id=run.id,
-                tool_outputs=[
-                    {
-                        "tool_call_id": tool_call.id,
-                        "output": json.dumps({"result": tool_response}),
-                    }
-                ],
-            )
         else:
             print(f"No handler found for tool {tool_name}")
+            tool_response = f"No handler found for tool {tool_name}"
+
+        # The output is submitted with those of the other tool calls of the run
+        return {
+            "tool_call_id": tool_call.id,
+            "output": json.dumps({"result": tool_response}),
+        }
 
     def store_messages(self, filename="threads/thread_data.json"):
 
@@ -1,69 +1,82 @@
-import importlib
+import importlib.util
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from configs.prompts import TRIAGE_MESSAGE_PROMPT, TRIAGE_SYSTEM_PROMPT, EVAL_GROUNDTRUTH_PROMPT, EVAL_PLANNING_PROMPT, ITERATE_PROMPT
 from src.utils import get_completion, is_dict_empty
-from configs.general import Colors, max_iterations
+from configs.general import Colors, max_iterations, registry_snapshot, test_workers
 from src.swarm.assistants import Assistant
-from src.swarm.tool import Tool
+from src.swarm.registry import LocalRegistry
 from src.tasks.task import EvaluationTask
 from src.runs.run import Run
 
 
+# tool name -> (handler path, mtime, handler module), shared by all engines
+_handler_cache = {}
+_handler_lock = threading.Lock()
+
+# one confirmation prompt at a time when tests run concurrently
+_input_lock = threading.Lock()
+
+
+def load_tool_handler(tool_name, variant=''):
+    """
+    Returns the handler function of configs/tools/<tool_name>/handler.py, or
+    None if the tool has no handler file. Each handler module is executed once
+    per process, so clients it creates at import time are reused across calls,
+    and it is reloaded when the file changes (hot reload during development).
+    With a variant, e.g. '_assistants', returns <tool_name><variant> when the
+    handler defines it.
+    """
+    handler_path = os.path.join(os.getcwd(), 'configs/tools', tool_name, 'handler.py')
+    if not os.path.isfile(handler_path):
+        return None
+    mtime = os.stat(handler_path).st_mtime_ns
+
+    with _handler_lock:
+        cached = _handler_cache.get(tool_name)
+        if cached and cached[0] == handler_path and cached[1] == mtime:
+            tool_module = cached[2]
+        else:
+            spec = importlib.util.spec_from_file_location(f"{tool_name}_handler", handler_path)
+            tool_module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(tool_module)
+            _handler_cache[tool_name] = (handler_path, mtime, tool_module)
+    return getattr(tool_module, tool_name + variant, None) or getattr(tool_module, tool_name)
+
 
 class LocalEngine:
-    def __init__(self, client, tasks, persist=False):
+    def __init__(self, client, tasks, persist=False, snapshot_path=registry_snapshot):
         self.client = client
         self.assistants = []
+        self.assistants_by_name = {}
         self.last_assistant = None
         self.persist = persist
         self.tasks = tasks
         self.tool_functions = []
         self.global_context = {}
+        self.snapshot_path = snapshot_path
+        self.registry = None
 
     def load_tools(self):
-        tools_path = 'configs/tools'
-
-        self.tool_functions = []
-        for tool_dir in os.listdir(tools_path):
-            dir_path = os.path.join(tools_path, tool_dir)
-            if os.path.isdir(dir_path):
-                for tool_name in os.listdir(dir_path):
-                    if tool_name.endswith('.json'):
-                        with open(os.path.join(dir_path, tool_name), 'r') as file:
-                            try:
-                                tool_def = json.load(file)
-                                tool = Tool(type=tool_def['type'], function=tool_def['function'], human_input=tool_def.get('human_input', False))
-                                self.tool_functions.append(tool)
-                            except json.JSONDecodeError as e:
-                                print(f"Error decoding JSON for tool {tool_name}: {e}")
+        # Tools and assistant configs are read once, indexed by name
+        if self.registry is None:
+            self.registry = LocalRegistry.load(snapshot_path=self.snapshot_path)
+        self.tool_functions = list(self.registry.tools.values())
 
     def load_all_assistants(self):
-        base_path = 'configs/assistants'
         self.load_tools()
-        tool_defs = {tool.function.name: tool.function.dict() for tool in self.tool_functions}
 
-        for assistant_dir in os.listdir(base_path):
-            if '__pycache__' in assistant_dir:
-                continue
-            assistant_config_path = os.path.join(base_path, assistant_dir, "assistant.json")
-            if os.path.exists(assistant_config_path):
-                try:
-                    with open(assistant_config_path, "r") as file:
-                        assistant_config = json.load(file)[0]
-                        assistant_tools_names = assistant_config.get('tools', [])
-                        assistant_name = assistant_config.get('name', assistant_dir)
-                        assistant_tools = [tool for tool in self.tool_functions if tool.function.name in assistant_tools_names]
-
-                        log_flag = assistant_config.pop('log_flag', False)
-                        sub_assistants = assistant_config.get('assistants', None)
-                        planner = assistant_config.get('planner', 'sequential') #default is sequential
-                        print(f"Assistant '{assistant_name}' created.\n")
-                        asst_object = Assistant(name=assistant_name, log_flag=log_flag, instance=None, tools=assistant_tools, sub_assistants=sub_assistants, planner=planner)
-                        asst_object.initialize_history()
-                        self.assistants.append(asst_object)
-                except (IOError, json.JSONDecodeError) as e:
-                    print(f"Error loading assistant configuration from {assistant_config_path}: {e}")
+        for assistant_name, assistant_config in self.registry.assistant_configs.items():
+            log_flag = assistant_config.get('log_flag', False)
+            sub_assistants = assistant_config.get('assistants', None)
+            planner = assistant_config.get('planner', 'sequential') #default is sequential
+            print(f"Assistant '{assistant_name}' created.\n")
+            asst_object = Assistant(name=assistant_name, log_flag=log_flag, instance=None, tools=self.registry.assistant_tools[assistant_name], sub_assistants=sub_assistants, planner=planner)
+            asst_object.initialize_history()
+            self.assistants.append(asst_object)
+            self.assistants_by_name[assistant_name] = asst_object
 
 
     def initialize_and_display_assistants(self):
@@ -83,12 +96,10 @@ class LocalEngine:
 
 
     def get_assistant(self, assistant_name):
-
-        for assistant in self.assistants:
-            if assistant.name == assistant_name:
-                return assistant
-        print('No assistant found')
-        return None
+        assistant = self.assistants_by_name.get(assistant_name)
+        if assistant is None:
+            print('No assistant found')
+        return assistant
 
     def triage_request(self, assistant, message):
         """
@@ -128,13 +139,14 @@ class LocalEngine:
 
 
     def determine_appropriate_assistant(self, assistant, message):
+        sub_assistants = set(assistant.sub_assistants)
         triage_message = [{"role": "system", "content": TRIAGE_SYSTEM_PROMPT}]
         triage_message.append(
             {
                 "role": "user",
                 "content": TRIAGE_MESSAGE_PROMPT.format(
                     message,
-                    [(asst.name, asst.tools) for asst in [assistant] + [asst for asst in self.assistants if asst.name in assistant.sub_assistants]]                ),
+                    [(asst.name, asst.tools) for asst in [assistant] + [asst for asst in self.assistants if asst.name in sub_assistants]]                ),
             }
         )
         response = get_completion(self.client, triage_message)
@@ -174,14 +186,15 @@ class LocalEngine:
             else:
                 return "Error generating plan", "Error generating plan"
             assistant.add_tool_message(step)
-            human_input_flag = next((tool.human_input for tool in assistant.tools if tool.function.name == step['tool']), False)
+            human_input_flag = step['tool'] in self.registry.human_input.get(assistant.name, ())
             if step['tool']:
                 print(f"{Colors.HEADER}Running Tool:{Colors.ENDC} {step['tool']}")
                 if human_input_flag:
                     print(f"\n{Colors.HEADER}Tool {step['tool']} requires human input:{Colors.HEADER}")
                     print(f"{Colors.GREY}Tool arguments:{Colors.ENDC} {step['args']}\n")
 
-                    user_confirmation = input(f"Type 'yes' to execute tool, anything else to skip: ")
+                    with _input_lock:
+                        user_confirmation = input(f"Type 'yes' to execute tool, anything else to skip: ")
                     if user_confirmation.lower() != 'yes':
                         assistant.add_assistant_message(f"Tool {step['tool']} execution skipped by user.")
                         print(f"{Colors.GREY}Skipping tool execution.{Colors.ENDC}")
@@ -205,15 +218,10 @@ class LocalEngine:
 
     def handle_tool_call(self,assistant, tool_call, test_mode=False):
         tool_name = tool_call['tool']
-        tool_dir = os.path.join(os.getcwd(), 'configs/tools', tool_name)
-        handler_path = os.path.join(tool_dir, 'handler.py')
 
-        # Dynamically import the handler function from the handler.py file
-        if os.path.isfile(handler_path):
-            spec = importlib.util.spec_from_file_location(f"{tool_name}_handler", handler_path)
-            tool_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(tool_module)
-            tool_handler = getattr(tool_module, tool_name)
+        # Import the handler function from the handler.py file, once per process
+        tool_handler = load_tool_handler(tool_name)
+        if tool_handler is not None:
             # Call the handler function with arguments
             try:
                 tool_response = tool_handler(**tool_call['args'])
@@ -288,66 +296,107 @@ class LocalEngine:
             return original_plan, plan_log
 
 
-    def run_tests(self):
-        total_groundtruth = 0
-        total_planning = 0
-        total_assistant = 0
-        groundtruth_pass = 0
-        planning_pass = 0
-        assistant_pass = 0
-        for task in self.tasks:
-            original_plan, plan_log = self.run_task(task, test_mode=True)
-
-            if task.groundtruth:
-                total_groundtruth += 1
-                # Assuming get_completion returns a response object with a content attribute
-                response = get_completion(self.client, [{"role": "user", "content": EVAL_GROUNDTRUTH_PROMPT.format(original_plan, task.groundtruth)}])
-                if response.content.lower() == 'true':
-                    groundtruth_pass += 1
-                    print(f"{Colors.OKGREEN}✔ Groundtruth test passed for: {Colors.ENDC}{task.description}{Colors.OKBLUE}. Expected: {Colors.ENDC}{task.groundtruth}{Colors.OKBLUE}, Got: {Colors.ENDC}{original_plan}{Colors.ENDC}")
-                else:
-                    print(f"{Colors.RED}✘ Test failed for: {Colors.ENDC}{task.description}{Colors.OKBLUE}. Expected: {Colors.ENDC}{task.groundtruth}{Colors.OKBLUE}, Got: {Colors.ENDC}{original_plan}{Colors.ENDC}")
-
-                total_assistant += 1
-                if task.assistant == task.expected_assistant:
-                    assistant_pass += 1
-                    print(f"{Colors.OKGREEN}✔ Correct assistant assigned. {Colors.ENDC}{Colors.OKBLUE} Expected: {Colors.ENDC}{task.expected_assistant}{Colors.OKBLUE}, Got: {Colors.ENDC}{task.assistant}{Colors.ENDC}\n")
-                else:
-                    print(f"{Colors.RED}✘ Incorrect assistant assigned. {Colors.ENDC}{Colors.OKBLUE} Expected: {Colors.ENDC}{task.expected_assistant}{Colors.OKBLUE}, Got: {Colors.ENDC}{task.assistant}{Colors.ENDC}\n")
-
-
-            elif task.expected_plan:
-                total_planning += 1
-                # Assuming get_completion returns a response object with a content attribute
-                response = get_completion(self.client, [{"role": "user", "content": EVAL_PLANNING_PROMPT.format(original_plan, task.expected_plan)}])
+    def for_task(self):
+        """
+        An engine sharing this one's client and registry, with fresh copies of
+        the assistants, so a task's history and runs don't leak into others.
+        """
+        engine = LocalEngine(self.client, [], snapshot_path=self.snapshot_path)
+        engine.registry = self.registry
+        engine.tool_functions = self.tool_functions
+        for asst in self.assistants:
+            copy = asst.model_copy(update={'context': {}, 'runs': []})
+            copy.initialize_history()
+            engine.assistants.append(copy)
+            engine.assistants_by_name[copy.name] = copy
+        engine.initialize_global_history()
+        return engine
+
+    def merge_history(self, engine, entry_assistant):
+        """
+        Appends a task engine's assistant histories to this engine's
+        assistants. A history shared after pass_context goes to the task's
+        entry assistant, which it started with.
+        """
+        entry = engine.assistants_by_name.get(entry_assistant)
+        merged = set()
+        for asst in ([entry] if entry else []) + engine.assistants:
+            history = asst.context['history']
+            # sub-assistants share their parent's history list after pass_context
+            if id(history) in merged:
+                continue
+            merged.add(id(history))
+            self.assistants_by_name[asst.name].context['history'].extend(history)
 
-                if response.content.lower() == 'true':
-                    planning_pass += 1
-                    print(f"{Colors.OKGREEN}✔ Planning test passed for: {Colors.ENDC}{task.description}{Colors.OKBLUE}. Expected: {Colors.ENDC}{task.expected_plan}{Colors.OKBLUE}, Got: {Colors.ENDC}{original_plan}{Colors.ENDC}")
-                else:
-                    print(f"{Colors.RED}✘ Test failed for: {Colors.ENDC}{task.description}{Colors.OKBLUE}. Expected: {Colors.ENDC}{task.expected_plan}{Colors.OKBLUE}, Got: {Colors.ENDC}{original_plan}{Colors.ENDC}")
+    def grade_test(self, task, original_plan):
+        """
+        Grades a finished test task. Returns (kind, passed, message) for each
+        check: "groundtruth" or "planning" when the task has one, then "assistant".
+        """
+        checks = []
+        if task.groundtruth:
+            kind, prompt, expected = 'groundtruth', EVAL_GROUNDTRUTH_PROMPT, task.groundtruth
+        elif task.expected_plan:
+            kind, prompt, expected = 'planning', EVAL_PLANNING_PROMPT, task.expected_plan
+        else:
+            kind = None
+        if kind:
+            response = get_completion(self.client, [{"role": "user", "content": prompt.format(original_plan, expected)}])
+            if response.content.lower() == 'true':
+                checks.append((kind, True, f"{Colors.OKGREEN}✔ {kind.capitalize()} test passed for: {Colors.ENDC}{task.description}{Colors.OKBLUE}. Expected: {Colors.ENDC}{expected}{Colors.OKBLUE}, Got: {Colors.ENDC}{original_plan}{Colors.ENDC}"))
+            else:
+                checks.append((kind, False, f"{Colors.RED}✘ Test failed for: {Colors.ENDC}{task.description}{Colors.OKBLUE}. Expected: {Colors.ENDC}{expected}{Colors.OKBLUE}, Got: {Colors.ENDC}{original_plan}{Colors.ENDC}"))
 
-                total_assistant += 1
-                if task.assistant == task.expected_assistant:
-                    assistant_pass += 1
-                    print(f"{Colors.OKGREEN}✔ Correct assistant assigned.  {Colors.ENDC}{Colors.OKBLUE}Expected: {Colors.ENDC}{task.expected_assistant}{Colors.OKBLUE}, Got: {Colors.ENDC}{task.assistant}{Colors.ENDC}\n")
-                else:
-                    print(f"{Colors.RED}✘ Incorrect assistant assigned for. {Colors.ENDC}{Colors.OKBLUE} Expected: {Colors.ENDC}{task.expected_assistant}{Colors.OKBLUE}, Got: {Colors.ENDC}{task.assistant}{Colors.ENDC}\n")
+        if task.assistant == task.expected_assistant:
+            checks.append(('assistant', True, f"{Colors.OKGREEN}✔ Correct assistant assigned for: {Colors.ENDC}{task.description}{Colors.OKBLUE}. Expected: {Colors.ENDC}{task.expected_assistant}{Colors.OKBLUE}, Got: {Colors.ENDC}{task.assistant}{Colors.ENDC}\n"))
+        else:
+            checks.append(('assistant', False, f"{Colors.RED}✘ Incorrect assistant assigned for: {Colors.ENDC}{task.description}{Colors.OKBLUE}. Expected: {Colors.ENDC}{task.expected_assistant}{Colors.OKBLUE}, Got: {Colors.ENDC}{task.assistant}{Colors.ENDC}\n"))
+        return checks
 
-            else:
-                total_assistant += 1
-                if task.assistant == task.expected_assistant:
-                    assistant_pass += 1
-                    print(f"{Colors.OKGREEN}✔ Correct assistant assigned for: {Colors.ENDC}{task.description}{Colors.OKBLUE}. Expected: {Colors.ENDC}{task.expected_assistant}{Colors.OKBLUE}, Got: {Colors.ENDC}{task.assistant}{Colors.ENDC}\n")
-                else:
-                    print(f"{Colors.RED}✘ Incorrect assistant assigned for: {Colors.ENDC}{task.description}{Colors.OKBLUE}. Expected: {Colors.ENDC}{task.expected_assistant}{Colors.OKBLUE}, Got: {Colors.ENDC}{task.assistant}{Colors.ENDC}\n")
-
-        if total_groundtruth > 0:
-            print(f"\n{Colors.OKGREEN}Passed {groundtruth_pass} groundtruth tests out of {total_groundtruth} tests. Success rate: {groundtruth_pass / total_groundtruth * 100}%{Colors.ENDC}\n")
-        if total_planning > 0:
-            print(f"{Colors.OKGREEN}Passed {planning_pass} planning tests out of {total_planning} tests. Success rate: {planning_pass / total_planning * 100}%{Colors.ENDC}\n")
-        if total_assistant > 0:
-            print(f"{Colors.OKGREEN}Passed {assistant_pass} assistant tests out of {total_assistant} tests. Success rate: {assistant_pass / total_assistant * 100}%{Colors.ENDC}\n")
+    def run_tests(self, workers=test_workers):
+        """
+        Runs the test tasks concurrently, each on its own copy of the
+        assistants. A task is graded as soon as it finishes, while the others
+        keep running, and the report is printed in test file order.
+        """
+        def run_and_grade(task, grader):
+            engine = self.for_task()
+            # run_task replaces task.assistant with the assistant it selected
+            entry_assistant = task.assistant
+            try:
+                result = engine.run_task(task, test_mode=True)
+            except Exception as e:
+                return engine, entry_assistant, [('error', False, f"{Colors.RED}✘ Test errored for: {Colors.ENDC}{task.description}{Colors.OKBLUE}. Error: {Colors.ENDC}{e!r}\n")]
+            original_plan = result[0] if result else None
+            return engine, entry_assistant, grader.submit(self.grade_test, task, original_plan)
+
+        results = []
+        with ThreadPoolExecutor(max_workers=workers) as grader, ThreadPoolExecutor(max_workers=workers) as runner:
+            futures = [runner.submit(run_and_grade, task, grader) for task in self.tasks]
+            for future in futures:
+                engine, entry_assistant, checks = future.result()
+                if not isinstance(checks, list):
+                    try:
+                        checks = checks.result()
+                    except Exception as e:
+                        checks = [('error', False, f"{Colors.RED}✘ Grading errored: {Colors.ENDC}{e!r}\n")]
+                self.merge_history(engine, entry_assistant)
+                results.append(checks)
+
+        print(f"\n{Colors.HEADER}Test results{Colors.ENDC}\n")
+        totals = {}
+        passes = {}
+        for checks in results:
+            for kind, passed, message in checks:
+                totals[kind] = totals.get(kind, 0) + 1
+                passes[kind] = passes.get(kind, 0) + passed
+                print(message)
+
+        for kind in ('groundtruth', 'planning', 'assistant'):
+            if totals.get(kind):
+                print(f"\n{Colors.OKGREEN}Passed {passes[kind]} {kind} tests out of {totals[kind]} tests. Success rate: {passes[kind] / totals[kind] * 100}%{Colors.ENDC}\n")
+        if totals.get('error'):
+            print(f"{Colors.RED}{totals['error']} tests errored.{Colors.ENDC}\n")
         print("Completed testing the swarm\n\n")
 
     def deploy(self, client, test_mode=False, test_file_path=None):
@@ -0,0 +1,93 @@
+import json
+import os
+from src.swarm.tool import Tool
+
+
+class LocalRegistry:
+    """
+    The tools and assistants in configs/, read once and indexed by name.
+
+    tools: tool name -> Tool
+    assistant_configs: assistant name -> assistant.json config
+    assistant_tools: assistant name -> its Tools, in config order
+    human_input: assistant name -> names of its tools that need confirmation
+
+    load() can keep a snapshot of the parsed configs in one JSON file, reused
+    while no config file has been added, removed or modified.
+    """
+
+    def __init__(self, tool_defs, assistant_configs):
+        self.tool_defs = tool_defs
+        self.assistant_configs = assistant_configs
+        self.tools = {
+            name: Tool(type=tool_def['type'], function=tool_def['function'], human_input=tool_def.get('human_input', False))
+            for name, tool_def in tool_defs.items()
+        }
+        self.assistant_tools = {}
+        self.human_input = {}
+        for name, config in assistant_configs.items():
+            tools = [self.tools[tool_name] for tool_name in config.get('tools', []) if tool_name in self.tools]
+            self.assistant_tools[name] = tools
+            self.human_input[name] = frozenset(tool.function.name for tool in tools if tool.human_input)
+
+    @staticmethod
+    def config_files(base_path='configs'):
+        """Paths of the tool and assistant JSON files, sorted."""
+        paths = []
+        for kind in ('tools', 'assistants'):
+            kind_path = os.path.join(base_path, kind)
+            for entry in os.scandir(kind_path):
+                if not entry.is_dir() or '__pycache__' in entry.name:
+                    continue
+                for file in os.scandir(entry.path):
+                    if file.name.endswith('.json') and (kind == 'tools' or file.name == 'assistant.json'):
+                        paths.append(file.path)
+        return sorted(paths)
+
+    @staticmethod
+    def fingerprint(paths):
+        fingerprint = []
+        for path in paths:
+            stat = os.stat(path)
+            fingerprint.append([path, stat.st_mtime_ns, stat.st_size])
+        return fingerprint
+
+    @classmethod
+    def read_configs(cls, paths):
+        tool_defs = {}
+        assistant_configs = {}
+        for path in paths:
+            directory = os.path.basename(os.path.dirname(path))
+            try:
+                with open(path, 'r') as file:
+                    config = json.load(file)
+            except (IOError, json.JSONDecodeError) as e:
+                print(f"Error loading configuration from {path}: {e}")
+                continue
+            if os.path.basename(path) == 'assistant.json':
+                config = config[0]
+                config.setdefault('name', directory)
+                assistant_configs[config['name']] = config
+            else:
+                tool_defs[config['function']['name']] = config
+        return tool_defs, assistant_configs
+
+    @classmethod
+    def load(cls, base_path='configs', snapshot_path=None):
+        paths = cls.config_files(base_path)
+        fingerprint = cls.fingerprint(paths)
+
+        if snapshot_path and os.path.isfile(snapshot_path):
+            try:
+                with open(snapshot_path, 'r') as file:
+                    snapshot = json.load(file)
+                if snapshot['fingerprint'] == fingerprint:
+                    return cls(snapshot['tools'], snapshot['assistants'])
+            except (IOError, json.JSONDecodeError, KeyError):
+                pass  # stale or corrupt snapshot: rebuild it
+
+        tool_defs, assistant_configs = cls.read_configs(paths)
+        if snapshot_path:
+            with open(snapshot_path, 'w') as file:
+                json.dump({'fingerprint': fingerprint, 'tools': tool_defs, 'assistants': assistant_configs}, file)
+        return cls(tool_defs, assistant_configs)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the example imports its own modules as src.* and configs.*
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,193 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+from openai import OpenAI
+
+from src.swarm.assistants import Assistant
+from src.swarm.engines.assistants_engine import AssistantsEngine
+
+pytestmark = pytest.mark.filterwarnings("ignore:The Assistants API is deprecated:DeprecationWarning")
+
+TOOL_CALLS = [
+    {"id": "call_1", "type": "function", "function": {"name": "lookup", "arguments": '{"query": "a"}'}},
+    {"id": "call_2", "type": "function", "function": {"name": "lookup", "arguments": '{"query": "b"}'}},
+]
+
+HANDLER = """
+def lookup(tool_id, query):
+    with open('tool_calls.log', 'a') as file:
+        file.write(query + '\\n')
+    return 'found ' + query
+"""
+
+
+def run_object(status):
+    required_action = None
+    if status == "requires_action":
+        required_action = {"type": "submit_tool_outputs", "submit_tool_outputs": {"tool_calls": TOOL_CALLS}}
+    return {
+        "id": "run_1",
+        "object": "thread.run",
+        "thread_id": "thread_1",
+        "assistant_id": "asst_1",
+        "status": status,
+        "required_action": required_action,
+    }
+
+
+class FakeAssistantsHandler(BaseHTTPRequestHandler):
+    """
+    A thread with one run, which requires the two TOOL_CALLS and completes
+    once their outputs are submitted. server.submit_mode picks how a submit
+    is answered: "stream", "stream_error" (taken, but the stream fails) or
+    "error" (refused once).
+    """
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path))
+        if self.path.endswith("/runs/run_1"):
+            if not self.server.accepted or self.server.lagging_polls:
+                self.server.lagging_polls = max(self.server.lagging_polls - 1, 0)
+                self.send_json(run_object("requires_action"))
+            else:
+                self.send_json(run_object("completed"))
+        else:  # the thread's messages
+            message = {
+                "id": "msg_2",
+                "object": "thread.message",
+                "thread_id": "thread_1",
+                "role": "assistant",
+                "content": [{"type": "text", "text": {"value": "done", "annotations": []}}],
+            }
+            self.send_json({"object": "list", "data": [message], "has_more": False})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])) or b"{}")
+        self.server.requests.append(("POST", self.path))
+        if self.path.endswith("/threads"):
+            self.send_json({"id": "thread_1", "object": "thread", "created_at": 0, "metadata": {}})
+        elif self.path.endswith("/messages"):
+            self.send_json({"id": "msg_1", "object": "thread.message", "thread_id": "thread_1", "role": "user", "content": []})
+        elif self.path.endswith("/runs"):
+            self.send_events(
+                ("thread.run.created", run_object("queued")),
+                ("thread.run.requires_action", run_object("requires_action")),
+            )
+            self.hold_stream()
+        else:  # submit_tool_outputs
+            self.server.submits.append(body["tool_outputs"])
+            if self.server.submit_mode == "error" and len(self.server.submits) == 1:
+                self.send_json({"error": {"message": "try again", "type": "server_error"}}, status=500)
+                return
+            self.server.accepted = True
+            if not body.get("stream"):
+                self.send_json(run_object("in_progress"))
+            elif self.server.submit_mode == "stream_error":
+                # the outputs were taken, but the run still shows as requiring them for a poll
+                self.server.lagging_polls = 1
+                self.send_events(("error", {"error": {"message": "stream interrupted"}}))
+            else:
+                self.send_events(
+                    ("thread.run.in_progress", run_object("in_progress")),
+                    ("thread.run.completed", run_object("completed")),
+                )
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_events(self, *events):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for event, data in events:
+            self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+
+    def hold_stream(self):
+        # the run's stream stays open until the client closes it, or for 3s
+        deadline = time.monotonic() + 3
+        try:
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                self.wfile.write(b": keep-alive\n\n")
+        except OSError:
+            self.server.stream_closed.set()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_api(tmp_path, monkeypatch):
+    # tool handlers are loaded from configs/tools under the working directory
+    handler_dir = tmp_path / "configs" / "tools" / "lookup"
+    handler_dir.mkdir(parents=True)
+    (handler_dir / "handler.py").write_text(HANDLER)
+    monkeypatch.chdir(tmp_path)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAssistantsHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.submits = []
+    server.submit_mode = "stream"
+    server.accepted = False
+    server.lagging_polls = 0
+    server.stream_closed = threading.Event()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = OpenAI(base_url=f"http://127.0.0.1:{server.server_port}/v1", api_key="test", max_retries=0)
+    yield server, AssistantsEngine(client, tasks=[], manifest_path=None)
+    server.shutdown()
+    server.server_close()
+
+
+def run_request(engine):
+    assistant = Assistant(name="support", log_flag=False, instance=SimpleNamespace(id="asst_1"))
+    return engine.run_request("Look up a and b", assistant, test_mode=True)
+
+
+def tool_calls_run():
+    with open("tool_calls.log") as file:
+        return sorted(file.read().split())
+
+
+def expected_outputs():
+    return [
+        {"tool_call_id": "call_1", "output": json.dumps({"result": "found a"})},
+        {"tool_call_id": "call_2", "output": json.dumps({"result": "found b"})},
+    ]
+
+
+def test_streamed_run_submits_all_tool_outputs_together(fake_api):
+    server, engine = fake_api
+
+    assert run_request(engine) == "done"
+    assert tool_calls_run() == ["a", "b"]
+    assert server.submits == [expected_outputs()]
+    # the run completed on the stream, without polling
+    assert ("GET", "/v1/threads/thread_1/runs/run_1") not in server.requests
+    # the run's stream was closed when the engine stopped reading it
+    assert server.stream_closed.wait(2)
+
+
+@pytest.mark.parametrize("submit_mode", ["stream_error", "error"])
+def test_polling_fallback_doesnt_rerun_tools(fake_api, submit_mode):
+    server, engine = fake_api
+    server.submit_mode = submit_mode
+
+    assert run_request(engine) == "done"
+    assert ("GET", "/v1/threads/thread_1/runs/run_1") in server.requests
+    # the tools ran once, and their outputs went out again only if refused
+    assert tool_calls_run() == ["a", "b"]
+    if submit_mode == "error":
+        assert server.submits == [expected_outputs(), expected_outputs()]
+    else:
+        assert server.submits == [expected_outputs()]
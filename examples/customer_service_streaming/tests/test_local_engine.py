@@ -0,0 +1,76 @@
+import json
+import re
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from configs.prompts import TRIAGE_SYSTEM_PROMPT
+from src.swarm.engines.local_engine import LocalEngine
+from src.swarm.registry import LocalRegistry
+from src.tasks.task import EvaluationTask
+
+
+class FakeCompletions:
+    """
+    Triages every task to the billing assistant, which answers "answer to
+    <task>" after a delay that makes earlier tasks finish last. Grading
+    passes unless the expected answer is "wrong".
+    """
+
+    def create(self, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        if messages[0]["content"] == TRIAGE_SYSTEM_PROMPT:
+            content = "billing"
+        elif prompt.startswith("Given the following completion"):
+            content = "false" if "wrong" in prompt else "true"
+        else:  # the planner
+            number = int(re.search(r"task (\d)", prompt).group(1))
+            time.sleep(0.1 * (3 - number))
+            content = json.dumps(f"answer to task {number}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def engine():
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    engine = LocalEngine(client, [])
+    # configs are read in path order, so the sub-assistant comes first
+    engine.registry = LocalRegistry({}, {"billing": {}, "user_interface": {"assistants": ["billing"]}})
+    engine.initialize_and_display_assistants()
+    for number, groundtruth in enumerate(["answer to task 0", "wrong", "answer to task 2"]):
+        engine.tasks.append(EvaluationTask(
+            description=f"task {number}", assistant="user_interface", iterate=False, evaluate=False,
+            groundtruth=groundtruth, expected_assistant="billing", eval_function="default", expected_plan=None,
+        ))
+    return engine
+
+
+def test_run_tests_reports_in_test_file_order(engine, capsys):
+    engine.run_tests(workers=3)
+
+    report = capsys.readouterr().out.split("Test results")[1]
+    groundtruth = re.findall(r"(✔|✘) .*?for: \S*(task \d)", report)
+    assert groundtruth == [
+        ("✔", "task 0"), ("✔", "task 0"),
+        ("✘", "task 1"), ("✔", "task 1"),
+        ("✔", "task 2"), ("✔", "task 2"),
+    ]
+    assert "Passed 2 groundtruth tests out of 3 tests" in report
+    assert "Passed 3 assistant tests out of 3 tests" in report
+
+
+def test_run_tests_merges_each_task_history(engine):
+    engine.run_tests(workers=3)
+
+    # the tasks ran concurrently, each on its own history, merged in test file order
+    expected = []
+    for number, task in enumerate(engine.tasks):
+        expected += [
+            {"task_id": task.id, "role": "user", "content": f"task {number}"},
+            {"task_id": task.id, "role": "assistant", "content": "Selecting sub-assistant: billing"},
+            {"task_id": task.id, "role": "assistant", "content": f"Response to user: answer to task {number}"},
+        ]
+    assert engine.get_assistant("user_interface").context["history"] == expected
+    # the billing sub-assistant shared the entry assistant's history, which is merged once
+    assert engine.get_assistant("billing").context["history"] == []
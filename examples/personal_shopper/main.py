@@ -3,7 +3,7 @@ import random
 
 import database
 from swarm import Agent
-from swarm.agents import create_triage_agent
+from swarm.registry import AgentRegistry
 from swarm.repl import run_demo_loop
 
 
@@ -94,7 +94,7 @@ database.preview_table("Products")
 
 refunds_agent = Agent(
     name="Refunds Agent",
-    description=f"""You are a refund agent that handles all actions related to refunds after a return has been processed.
+    instructions=f"""You are a refund agent that handles all actions related to refunds after a return has been processed.
     You must ask for both the user ID and item ID to initiate a refund. Ask for both user_id and item_id in one message.
     If the user asks you to notify them, you must ask them what their preferred method of notification is. For notifications, you must
     ask them for user_id and method in one message.""",
@@ -103,7 +103,7 @@ refunds_agent = Agent(
 
 sales_agent = Agent(
     name="Sales Agent",
-    description=f"""You are a sales agent that handles all actions related to placing an order to purchase an item.
+    instructions=f"""You are a sales agent that handles all actions related to placing an order to purchase an item.
     Regardless of what the user wants to purchase, must ask for BOTH the user ID and product ID to place an order.
     An order cannot be placed without these two pieces of information. Ask for both user_id and product_id in one message.
     If the user asks you to notify them, you must ask them what their preferred method is. For notifications, you must
@@ -112,7 +112,7 @@ sales_agent = Agent(
     functions=[order_item, notify_customer],
 )
 
-triage_agent = create_triage_agent(
+triage_agent = Agent(
     name="Triage Agent",
     instructions=f"""You are to triage a users request, and call a tool to transfer to the right intent.
     Once you are ready to transfer to the right intent, call the tool to transfer to the right intent.
@@ -121,10 +121,15 @@ triage_agent = create_triage_agent(
     If the user request is about getting a refund on an item or returning a product, transfer to the Refunds Agent.
     When you need more information to triage the request to an agent, ask a direct question without explaining why you're asking it.
     Do not share your thought process with the user! Do not make unreasonable assumptions on behalf of user.""",
-    agents=[sales_agent, refunds_agent],
-    add_backlinks=True,
 )
 
+# Build the handoff graph: triage routes to both agents, which can hand back
+registry = AgentRegistry()
+registry.add(triage_agent, handoffs=[sales_agent, refunds_agent])
+registry.add(sales_agent, handoffs=[triage_agent])
+registry.add(refunds_agent, handoffs=[triage_agent])
+registry.build(entry=triage_agent)
+
 for f in triage_agent.functions:
     print(f.__name__)
 
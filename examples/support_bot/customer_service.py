@@ -5,9 +5,10 @@ from openai import OpenAI
 
 from swarm import Agent
 from swarm.repl import run_demo_loop
+from swarm.transport import shared_http_client
 
 # Initialize connections
-client = OpenAI()
+client = OpenAI(http_client=shared_http_client())
 qdrant = qdrant_client.QdrantClient(host="localhost")
 
 # Set embedding model
@@ -3,7 +3,9 @@ import instructor
 from pydantic import BaseModel
 from typing import Optional
 
-__client = instructor.from_openai(OpenAI())
+from swarm.transport import shared_http_client
+
+__client = instructor.from_openai(OpenAI(http_client=shared_http_client()))
 
 
 class BoolEvalResult(BaseModel):
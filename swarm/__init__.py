@@ -1,4 +1,22 @@
-from .core import Swarm
-from .types import Agent, Response
+__all__ = ["Swarm", "AsyncSwarm", "Agent", "Response"]
 
-__all__ = ["Swarm", "Agent", "Response"]
+# imported on first access, so `import swarm` doesn't load openai or pydantic
+_LAZY = {
+    "Swarm": "core",
+    "AsyncSwarm": "core",
+    "Agent": "types",
+    "Response": "types",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = __import__(_LAZY[name], globals(), fromlist=(name,), level=1)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
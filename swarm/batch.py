@@ -0,0 +1,110 @@
+import asyncio
+import functools
+import json
+import random
+import threading
+import time
+
+
+@functools.lru_cache(maxsize=None)
+def transient_errors() -> tuple:
+    import openai
+
+    return (
+        openai.APIConnectionError,  # includes APITimeoutError
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+
+
+def is_transient_error(error: Exception) -> bool:
+    return isinstance(error, transient_errors())
+
+
+def backoff_delay(attempt: int, error: Exception = None, base: float = 0.5, cap: float = 30.0) -> float:
+    """
+    Seconds to wait before retry number `attempt` (starting at 0): the
+    server's Retry-After when it sent one, else exponential backoff with jitter.
+    """
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return min(cap, float(retry_after))
+    except (TypeError, ValueError):
+        return min(cap, base * 2**attempt) * random.uniform(0.5, 1.0)
+
+
+def estimate_tokens(create_params: dict) -> int:
+    # rough prompt size (~4 characters per token), corrected after the call
+    return len(json.dumps(create_params["messages"], default=str)) // 4
+
+
+class RateLimiter:
+    """
+    Thread-safe requests-per-minute and tokens-per-minute budget, shared by
+    every completion made through a Swarm.
+
+    Both budgets are token buckets that refill continuously. A request takes
+    one request slot plus its estimated prompt tokens up front; once the
+    completion returns, `record` settles the difference with the actual
+    `usage.total_tokens`.
+    """
+
+    def __init__(self, requests_per_minute: float = None, tokens_per_minute: float = None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = requests_per_minute or 0.0
+        self._tokens = tokens_per_minute or 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(
+                self.requests_per_minute,
+                self._requests + elapsed * self.requests_per_minute / 60,
+            )
+        if self.tokens_per_minute:
+            self._tokens = min(
+                self.tokens_per_minute,
+                self._tokens + elapsed * self.tokens_per_minute / 60,
+            )
+
+    def reserve(self, tokens: int = 0) -> float:
+        """
+        Takes one request and `tokens` from the budget if available and
+        returns 0, otherwise takes nothing and returns the seconds to wait.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = 0.0
+            if self.requests_per_minute and self._requests < 1:
+                wait = (1 - self._requests) * 60 / self.requests_per_minute
+            if self.tokens_per_minute:
+                # a request larger than the whole budget waits for a full bucket
+                needed = min(tokens, self.tokens_per_minute)
+                if self._tokens < needed:
+                    wait = max(wait, (needed - self._tokens) * 60 / self.tokens_per_minute)
+            if wait:
+                return wait
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+            return 0.0
+
+    def acquire(self, tokens: int = 0) -> None:
+        while wait := self.reserve(tokens):
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 0) -> None:
+        while wait := self.reserve(tokens):
+            await asyncio.sleep(wait)
+
+    def record(self, reserved_tokens: int, usage) -> None:
+        if not self.tokens_per_minute or usage is None:
+            return
+        with self._lock:
+            self._tokens -= usage.total_tokens - reserved_tokens
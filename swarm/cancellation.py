@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import wait as wait_futures
+from typing import Optional
+
+
+class CancellationToken:
+    """
+    Stops one or more runs from another thread or task: pass it as
+    `run(cancel=token)` and call `token.cancel()`, or give it a `timeout` in
+    seconds after which every run using it stops with reason "deadline".
+
+    Runs check the token between turns, between streamed chunks, while
+    waiting on tools and, for `AsyncSwarm`, while waiting on the model. A
+    sync `Swarm` notices a cancel once the model's response or next chunk
+    arrives; a deadline also caps its requests' HTTP timeouts. Either way
+    the run returns the partial `Response` with `stop_reason` set.
+    """
+
+    def __init__(self, timeout: float = None):
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.reason = None
+        self._event = threading.Event()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.check() is not None
+
+    def check(self) -> Optional[str]:
+        """The reason to stop, or None to keep going."""
+        if self._event.is_set():
+            return self.reason
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return "deadline"
+        return None
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+
+class RunInterrupted(Exception):
+    """Raised inside a run when a limit trips; the run returns a partial Response."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class ToolClock:
+    """
+    When a tool submitted to a pool actually started running: None while it
+    waits for a thread, so time spent queued never counts as tool time.
+    """
+
+    __slots__ = ("started",)
+
+    def __init__(self, started: float = None):
+        self.started = started
+
+    def call(self, func, *args):
+        self.started = time.monotonic()
+        return func(*args)
+
+
+class RunLimits:
+    """
+    The cancellation token and timeouts of a single run. Tracks the current
+    turn's deadline, and waits on tools and completions in short polls so a
+    cancel from another thread is noticed promptly.
+    """
+
+    __slots__ = ("token", "turn_timeout", "tool_timeout", "turn_deadline")
+
+    poll_interval = 0.05
+
+    def __init__(
+        self,
+        token: CancellationToken = None,
+        turn_timeout: float = None,
+        tool_timeout: float = None,
+    ):
+        self.token = token
+        self.turn_timeout = turn_timeout
+        self.tool_timeout = tool_timeout
+        self.turn_deadline = None
+
+    def start_turn(self) -> Optional[str]:
+        if self.turn_timeout is not None:
+            self.turn_deadline = time.monotonic() + self.turn_timeout
+        return self.check()
+
+    def check(self) -> Optional[str]:
+        if self.token is not None:
+            reason = self.token.check()
+            if reason:
+                return reason
+        if self.turn_deadline is not None and time.monotonic() >= self.turn_deadline:
+            return "turn_timeout"
+        return None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the run or the current turn must stop, if bounded."""
+        remaining = [
+            r
+            for r in (
+                self.token.remaining() if self.token is not None else None,
+                self.turn_deadline - time.monotonic()
+                if self.turn_deadline is not None
+                else None,
+            )
+            if r is not None
+        ]
+        return min(remaining) if remaining else None
+
+    @property
+    def timed(self) -> bool:
+        """Whether a timeout or deadline can trip while a tool never returns."""
+        return (
+            self.tool_timeout is not None
+            or self.turn_timeout is not None
+            or (self.token is not None and self.token.deadline is not None)
+        )
+
+    def _check_tool(self, clock: ToolClock) -> Optional[str]:
+        reason = self.check()
+        if (
+            reason is None
+            and self.tool_timeout is not None
+            and clock is not None
+            and clock.started is not None
+        ):
+            if time.monotonic() - clock.started >= self.tool_timeout:
+                reason = "tool_timeout"
+        return reason
+
+    def wait(self, future, clock: ToolClock = None):
+        """
+        Returns the result of a concurrent.futures.Future, or raises
+        RunInterrupted if a limit trips first (`clock` enables the tool
+        timeout). The work itself can't be stopped and finishes in the
+        background. Errors of the work itself, including a TimeoutError it
+        raises, are raised as is.
+        """
+        while True:
+            done, _ = wait_futures((future,), timeout=self.poll_interval)
+            if done:
+                return future.result()
+            reason = self._check_tool(clock)
+            if reason:
+                future.cancel()
+                raise RunInterrupted(reason)
+
+    def sleep(self, delay: float) -> None:
+        """Sleeps for a retry backoff, at most until the time left; a cancel ends it early."""
+        remaining = self.remaining()
+        if remaining is not None:
+            delay = max(0.0, min(delay, remaining))
+        if self.token is not None:
+            self.token._event.wait(delay)
+        else:
+            time.sleep(delay)
+
+    async def sleep_async(self, delay: float) -> None:
+        """Like `sleep`, on the event loop."""
+        end = time.monotonic() + delay
+        while self.check() is None:
+            left = end - time.monotonic()
+            if left <= 0:
+                return
+            await asyncio.sleep(min(left, self.poll_interval))
+
+    async def wait_async(self, future, clock: ToolClock = None):
+        """Like `wait`, for an asyncio future or task, which is cancelled on interruption."""
+        while True:
+            done, _ = await asyncio.wait({future}, timeout=self.poll_interval)
+            if done:
+                return future.result()
+            reason = self._check_tool(clock)
+            if reason:
+                future.cancel()
+                raise RunInterrupted(reason)
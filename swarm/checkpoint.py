@@ -0,0 +1,266 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Mapping, NamedTuple, Optional, Sequence
+
+from .types import Agent
+
+try:
+    import msgpack
+except ImportError:  # optional, smaller and faster than JSON
+    msgpack = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    agent TEXT,
+    context BLOB,
+    start INTEGER NOT NULL,
+    message_count INTEGER NOT NULL,
+    stop_reason TEXT,
+    done INTEGER NOT NULL DEFAULT 0,
+    codec TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    run_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (run_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+def _encoder(codec: str, default: Callable = None):
+    if codec == "msgpack":
+        return lambda value: msgpack.packb(value, default=default)
+    return lambda value: json.dumps(value, separators=(",", ":"), default=default).encode()
+
+
+def _decoder(codec: str, object_hook: Callable = None):
+    if codec == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("checkpoint was written with msgpack, which is not installed")
+        return lambda data: msgpack.unpackb(data, object_hook=object_hook)
+    return lambda data: json.loads(data, object_hook=object_hook)
+
+
+def _check_lossless(value, path: str) -> None:
+    # both codecs decode tuples as lists and turn non-string keys into
+    # strings (JSON) or refuse them on load (msgpack)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise TypeError(
+                    f"{path} has the non-string key {key!r}, which would not be restored as is"
+                )
+            _check_lossless(item, f"{path}[{key!r}]")
+    elif isinstance(value, tuple):
+        raise TypeError(f"{path} is a tuple, which would be restored as a list")
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            _check_lossless(item, f"{path}[{i}]")
+
+
+class Checkpoint(NamedTuple):
+    """
+    The state of a run after its last completed turn.
+
+    Attributes:
+        run_id (str): The key the run was checkpointed under.
+        agent (str): Name of the active agent, None once the run has no agent.
+        messages (List[dict]): The whole conversation, including the messages
+            the run started with.
+        context_variables (dict): Context variables after the turn.
+        start (int): Number of messages the run started with; messages after
+            it are the run's `Response.messages`.
+        stop_reason (str): `Response.stop_reason` of a finished run.
+        done (bool): Whether the run returned, rather than being cut off.
+    """
+
+    run_id: str
+    agent: Optional[str]
+    messages: List[dict]
+    context_variables: dict
+    start: int
+    stop_reason: Optional[str]
+    done: bool
+
+    @property
+    def pending_tool_calls(self) -> List[dict]:
+        """Tool calls of the last assistant message that have no result yet."""
+        for i in range(len(self.messages) - 1, -1, -1):
+            message = self.messages[i]
+            if message.get("role") == "assistant":
+                answered = {m.get("tool_call_id") for m in self.messages[i + 1:]}
+                return [
+                    tool_call
+                    for tool_call in message.get("tool_calls") or ()
+                    if tool_call["id"] not in answered
+                ]
+        return []
+
+
+class CheckpointStore:
+    """
+    Run state in a SQLite file, written by `Swarm(checkpoints=store)` after
+    every turn of a run given a `run_id`, and read back by `Swarm.resume`.
+
+    Messages are append-only rows, so a turn writes only the messages it
+    added plus one small state row; agents are stored by name. Rows are
+    encoded with msgpack when it is installed, JSON otherwise.
+
+    Values that wouldn't come back unchanged on resume make `save` raise a
+    TypeError: tuples, dicts with non-string keys, and values the codec
+    can't encode (datetimes, clients, custom objects). Pass `default` to
+    encode the latter as a dict of values the codec supports, and
+    `object_hook` to rebuild them from those dicts on load.
+
+    Attributes:
+        path (str): The database file; ":memory:" for a private store.
+        codec (str): "msgpack" or "json". Defaults to msgpack if available.
+        default (Callable): Called with each value the codec can't encode.
+        object_hook (Callable): Called with each decoded dict.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        codec: str = None,
+        default: Callable = None,
+        object_hook: Callable = None,
+    ):
+        self.path = path
+        self.codec = codec or ("msgpack" if msgpack is not None else "json")
+        self.object_hook = object_hook
+        self._encode = _encoder(self.codec, default)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def save(
+        self,
+        run_id: str,
+        agent: Optional[str],
+        messages: Sequence[dict],
+        context_variables: dict,
+        start: int,
+        stop_reason: str = None,
+        done: bool = False,
+    ) -> None:
+        """
+        Writes the run's messages not stored yet and its current state.
+        `start` is only recorded by the first save of a run. Raises
+        TypeError, and writes nothing, if a value can't be encoded.
+        """
+
+        def encode(value, what):
+            try:
+                _check_lossless(value, what)
+                return self._encode(value)
+            except (TypeError, ValueError) as e:
+                raise TypeError(
+                    f"Can't checkpoint {what} of run {run_id!r}: {e}. Store lists and "
+                    "string-keyed dicts, or pass CheckpointStore(default=...) to encode other values."
+                ) from e
+
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT message_count, codec, start FROM runs WHERE run_id = ?",
+                    (run_id,),
+                ).fetchone()
+                count = 0
+                if row is not None:
+                    count, codec, first_start = row
+                    if codec != self.codec or count > len(messages):
+                        # a different history under the same id: start over
+                        conn.execute("DELETE FROM messages WHERE run_id = ?", (run_id,))
+                        count = 0
+                    else:
+                        # a resumed run keeps the start of the original run
+                        start = first_start
+                conn.executemany(
+                    "INSERT OR REPLACE INTO messages (run_id, seq, data) VALUES (?, ?, ?)",
+                    (
+                        (run_id, seq, encode(messages[seq], f"message {seq}"))
+                        for seq in range(count, len(messages))
+                    ),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO runs "
+                    "(run_id, agent, context, start, message_count, stop_reason, done, codec, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        run_id,
+                        agent,
+                        encode(context_variables, "context_variables"),
+                        start,
+                        len(messages),
+                        stop_reason,
+                        int(done),
+                        self.codec,
+                        time.time(),
+                    ),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def load(self, run_id: str) -> Checkpoint:
+        """Reads the latest checkpoint of a run; raises KeyError if there is none."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT agent, context, start, message_count, stop_reason, done, codec "
+                "FROM runs WHERE run_id = ?",
+                (run_id,),
+            ).fetchone()
+            if row is None:
+                raise KeyError(run_id)
+            agent, context, start, count, stop_reason, done, codec = row
+            rows = self._conn.execute(
+                "SELECT data FROM messages WHERE run_id = ? AND seq < ? ORDER BY seq",
+                (run_id, count),
+            ).fetchall()
+        decode = _decoder(codec, self.object_hook)
+        return Checkpoint(
+            run_id=run_id,
+            agent=agent,
+            messages=[decode(data) for (data,) in rows],
+            context_variables=decode(context),
+            start=start,
+            stop_reason=stop_reason,
+            done=bool(done),
+        )
+
+    def unfinished(self) -> List[str]:
+        """Ids of runs that were checkpointed but never returned, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id FROM runs WHERE done = 0 ORDER BY updated"
+            ).fetchall()
+        return [run_id for (run_id,) in rows]
+
+    def delete(self, run_id: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM messages WHERE run_id = ?", (run_id,))
+            self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def agents_by_name(agents) -> Mapping[str, Agent]:
+    """Accepts a mapping of name to agent, or an iterable of agents."""
+    if isinstance(agents, Mapping):
+        return agents
+    return {agent.name: agent for agent in agents}
@@ -0,0 +1,245 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, List
+
+
+def approximate_tokens(text: str) -> int:
+    # ~4 characters per token for English text
+    return (len(text) + 3) // 4
+
+
+class TokenCounter:
+    """
+    Counts the tokens of messages, remembering the count of the most recent
+    message objects so a growing history is only counted once per new
+    message. Each compactor gets its own counter unless one is passed.
+
+    Attributes:
+        count_text (Callable[[str], int]): Tokenizer, e.g.
+            `lambda text: len(tiktoken.encoding_for_model("gpt-4o").encode(text))`.
+            Defaults to an approximation of 4 characters per token.
+        maxsize (int): Number of messages whose count is remembered.
+    """
+
+    per_message = 4  # role and separators
+
+    def __init__(self, count_text: Callable[[str], int] = approximate_tokens, maxsize: int = 4096):
+        self.count_text = count_text
+        self.maxsize = maxsize
+        # id(message) -> (message, tokens); keeping the message guards against id reuse
+        self._counts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count_message(self, message: dict) -> int:
+        key = id(message)
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is not None and entry[0] is message:
+                self._counts.move_to_end(key)
+                return entry[1]
+
+        tokens = self.per_message
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += self.count_text(content)
+        elif isinstance(content, list):  # content parts
+            tokens += sum(
+                self.count_text(part.get("text", "")) for part in content if isinstance(part, dict)
+            )
+        for tool_call in message.get("tool_calls") or ():
+            function = tool_call["function"]
+            tokens += self.count_text(function["name"]) + self.count_text(function["arguments"])
+
+        with self._lock:
+            self._counts[key] = (message, tokens)
+            if len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+        return tokens
+
+    def count(self, messages) -> int:
+        return sum(self.count_message(message) for message in messages)
+
+
+def group_units(messages: List[dict]) -> List[List[dict]]:
+    """
+    Splits messages into units that must be kept or dropped together: an
+    assistant message with tool_calls plus the tool results that follow it,
+    or any other single message.
+    """
+    units = []
+    for message in messages:
+        if message.get("role") == "tool" and units and (
+            units[-1][0].get("tool_calls")
+        ):
+            units[-1].append(message)
+        else:
+            units.append([message])
+    return units
+
+
+class HistoryCompactor:
+    """
+    A stage that shrinks the history sent with each request. Called with the
+    conversation messages (without the system prompt) and returns the
+    messages to send; input messages must not be modified.
+    """
+
+    def __call__(self, messages: List[dict]) -> List[dict]:
+        raise NotImplementedError
+
+
+class Chain(HistoryCompactor):
+    """Applies compactors in order, e.g. `Chain(DropToolOutputs(2), SlidingWindow(8000))`."""
+
+    def __init__(self, *compactors: Callable):
+        self.compactors = compactors
+
+    def __call__(self, messages):
+        for compactor in self.compactors:
+            messages = compactor(messages)
+        return messages
+
+
+class SlidingWindow(HistoryCompactor):
+    """
+    Keeps the most recent messages that fit in `max_tokens`. The latest
+    message (or tool_call unit) is always kept, even if it alone is larger.
+    """
+
+    def __init__(self, max_tokens: int, counter: TokenCounter = None):
+        self.max_tokens = max_tokens
+        self.counter = counter or TokenCounter()
+
+    def __call__(self, messages):
+        budget = self.max_tokens
+        kept = []
+        for unit in reversed(group_units(messages)):
+            tokens = self.counter.count(unit)
+            if kept and tokens > budget:
+                break
+            budget -= tokens
+            kept.append(unit)
+        return [message for unit in reversed(kept) for message in unit]
+
+
+class DropToolOutputs(HistoryCompactor):
+    """
+    Replaces the content of tool results older than the last `keep_turns`
+    assistant messages with a short placeholder. The tool messages
+    themselves stay, so every tool_call still has its result.
+    """
+
+    def __init__(self, keep_turns: int, placeholder: str = "[tool output omitted]", maxsize: int = 4096):
+        self.keep_turns = keep_turns
+        self.placeholder = placeholder
+        self.maxsize = maxsize
+        # id(message) -> (message, replacement), so a replaced message is the
+        # same object every turn and later stages can cache on it
+        self._replaced = OrderedDict()
+        self._lock = threading.Lock()
+
+    def replace(self, message: dict) -> dict:
+        key = id(message)
+        with self._lock:
+            entry = self._replaced.get(key)
+            if entry is None or entry[0] is not message:
+                entry = (message, {**message, "content": self.placeholder})
+                self._replaced[key] = entry
+                if len(self._replaced) > self.maxsize:
+                    self._replaced.popitem(last=False)
+            return entry[1]
+
+    def __call__(self, messages):
+        turns = 0
+        cutoff = 0
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i].get("role") == "assistant":
+                turns += 1
+                if turns > self.keep_turns:
+                    cutoff = i + 1
+                    break
+        return [
+            self.replace(message)
+            if i < cutoff and message.get("role") == "tool"
+            else message
+            for i, message in enumerate(messages)
+        ]
+
+
+class Summarize(HistoryCompactor):
+    """
+    Once a conversation exceeds `max_tokens`, replaces everything but the
+    most recent `keep_tokens` with a summary message from `summarize`, a
+    function taking a list of messages and returning a string (typically a
+    cheap model call).
+
+    Summaries are remembered per conversation and extended incrementally:
+    later turns reuse the summary until the messages after it exceed
+    `max_tokens` again, and then only the summary plus the newly dropped
+    messages are summarized.
+    """
+
+    def __init__(
+        self,
+        summarize: Callable[[List[dict]], str],
+        max_tokens: int,
+        keep_tokens: int = None,
+        counter: TokenCounter = None,
+        maxsize: int = 1024,
+    ):
+        self.summarize = summarize
+        self.max_tokens = max_tokens
+        self.keep_tokens = keep_tokens if keep_tokens is not None else max_tokens // 2
+        self.counter = counter or TokenCounter()
+        self.maxsize = maxsize
+        # id(first message) -> (first message, last summarized message, cut, summary message)
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def summary_message(self, summary: str) -> dict:
+        return {"role": "system", "content": f"Summary of the earlier conversation: {summary}"}
+
+    def __call__(self, messages):
+        if not messages:
+            return messages
+        key = id(messages[0])
+        with self._lock:
+            entry = self._summaries.get(key)
+        cut, summary = 0, None
+        # reuse the summary if this is the same conversation, grown or not
+        if (
+            entry is not None
+            and entry[0] is messages[0]
+            and entry[2] <= len(messages)
+            and messages[entry[2] - 1] is entry[1]
+        ):
+            _, _, cut, summary = entry
+
+        recent = messages[cut:]
+        if self.counter.count(recent) <= self.max_tokens:
+            return [summary, *recent] if summary else list(messages)
+
+        # keep the newest units within keep_tokens, summarize the rest
+        units = group_units(recent)
+        budget = self.keep_tokens
+        kept = 0
+        for unit in reversed(units):
+            tokens = self.counter.count(unit)
+            if kept and tokens > budget:
+                break
+            budget -= tokens
+            kept += 1
+        dropped = [message for unit in units[: len(units) - kept] for message in unit]
+        if not dropped:
+            return [summary, *recent] if summary else list(messages)
+
+        summary = self.summary_message(
+            self.summarize(([summary] if summary else []) + dropped)
+        )
+        cut += len(dropped)
+        with self._lock:
+            self._summaries[key] = (messages[0], messages[cut - 1], cut, summary)
+            self._summaries.move_to_end(key)
+            if len(self._summaries) > self.maxsize:
+                self._summaries.popitem(last=False)
+        return [summary, *messages[cut:]]
@@ -1,35 +1,471 @@
+from __future__ import annotations
+
 # Standard library imports
+import asyncio
 import copy
+import functools
+import inspect
 import json
+import time
 from collections import defaultdict
-from typing import List, Callable, Union
-
-# Package/library imports
-from openai import OpenAI
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Callable, Tuple, Union
 
 
 # Local imports
-from .util import function_to_json, debug_print, merge_chunk
-from .types import (
-    Agent,
-    AgentFunction,
-    ChatCompletionMessage,
-    ChatCompletionMessageToolCall,
-    Function,
-    Response,
-    Result,
+from .batch import RateLimiter, backoff_delay, estimate_tokens, is_transient_error
+from .cache import CompletionCache
+from .cancellation import CancellationToken, RunInterrupted, RunLimits, ToolClock
+from .checkpoint import CheckpointStore, agents_by_name
+from .compaction import HistoryCompactor
+from .history import History
+from .tracing import Trace, Tracer
+from .util import (
+    __CTX_VARS_NAME__,
+    CompiledTools,
+    StreamedMessage,
+    compile_tools,
+    debug_print,
+    delta_to_dict,
+    instructions_cache,
+    request_hash,
 )
+from .types import Agent, AgentFunction, PartialResponse, Response, Result
+
+# openai is imported on first use, to keep `import swarm` fast
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessage
+    from openai.types.chat.chat_completion_message_tool_call import (
+        ChatCompletionMessageToolCall,
+    )
+
+
+def _missing_tool_message(tool_call: ChatCompletionMessageToolCall) -> dict:
+    name = tool_call.function.name
+    return {
+        "role": "tool",
+        "tool_call_id": tool_call.id,
+        "tool_name": name,
+        "content": f"Error: Tool {name} not found.",
+    }
+
+
+@functools.lru_cache(maxsize=1024)
+def _handoff_value(agent_name: str) -> str:
+    # the tool result of a handoff, serialized once per agent name
+    return json.dumps({"assistant": agent_name})
+
+
+def _timed_call(
+    name: str, func: AgentFunction, args: dict, debug: bool, trace: Trace = None
+):
+    if trace:
+        trace.tool_start(name, args)
+    start = time.perf_counter()
+    try:
+        raw_result = func(**args)
+        if inspect.iscoroutine(raw_result):
+            raw_result = asyncio.run(raw_result)
+    except Exception as e:
+        if trace:
+            trace.tool_end(name, time.perf_counter() - start, e)
+        raise
+    duration = time.perf_counter() - start
+    if trace:
+        trace.tool_end(name, duration)
+    debug_print(debug, f"Tool {name} finished in {duration:.3f}s.")
+    return raw_result
+
+
+async def _async_timed_call(
+    name: str, func: AgentFunction, args: dict, debug: bool, trace: Trace = None
+):
+    if trace:
+        trace.tool_start(name, args)
+    start = time.perf_counter()
+    try:
+        raw_result = func(**args)
+        if inspect.isawaitable(raw_result):
+            raw_result = await raw_result
+    except Exception as e:
+        if trace:
+            trace.tool_end(name, time.perf_counter() - start, e)
+        raise
+    duration = time.perf_counter() - start
+    if trace:
+        trace.tool_end(name, duration)
+    debug_print(debug, f"Tool {name} finished in {duration:.3f}s.")
+    return raw_result
 
-__CTX_VARS_NAME__ = "context_variables"
+
+def _interrupted_tool_messages(tool_calls: List[dict], reason: str) -> List[dict]:
+    # results for an interrupted batch, so the history stays valid to resume
+    return [
+        {
+            "role": "tool",
+            "tool_call_id": tool_call["id"],
+            "tool_name": tool_call["function"]["name"],
+            "content": f"Error: interrupted ({reason}).",
+        }
+        for tool_call in tool_calls
+    ]
+
+
+def _raise_first_error(outcomes: List) -> List:
+    # outcomes are (ok, value) pairs in tool_call order
+    for ok, value in outcomes:
+        if not ok:
+            raise value
+    return [value for _, value in outcomes]
+
+
+def _conversation_kwargs(conversation, run_kwargs: dict) -> dict:
+    # a conversation is a list of messages, or a dict of run() arguments
+    if isinstance(conversation, dict):
+        return {**run_kwargs, **conversation}
+    return {**run_kwargs, "messages": conversation}
+
+
+def _stream_tool_calls(message: dict) -> List[ChatCompletionMessageToolCall]:
+    # convert streamed tool_calls dicts to objects
+    from openai.types.chat.chat_completion_message_tool_call import (
+        ChatCompletionMessageToolCall,
+        Function,
+    )
+
+    tool_calls = []
+    for tool_call in message["tool_calls"]:
+        function = Function(
+            arguments=tool_call["function"]["arguments"],
+            name=tool_call["function"]["name"],
+        )
+        tool_call_object = ChatCompletionMessageToolCall(
+            id=tool_call["id"], function=function, type=tool_call["type"]
+        )
+        tool_calls.append(tool_call_object)
+    return tool_calls
+
+
+def _deferred_calls(tool_calls, prepared, early_calls: dict) -> List:
+    # (name, func, args) of the calls still to run, in tool_call order
+    return [
+        (tool_call.function.name, *p)
+        for tool_call, p in zip(tool_calls, prepared)
+        if p is not None and tool_call.id not in early_calls
+    ]
+
+
+def _is_timeout(error: Exception) -> bool:
+    # a request or stream read that ran past its HTTP timeout
+    import httpx
+    from openai import APITimeoutError
+
+    return isinstance(error, (httpx.TimeoutException, APITimeoutError))
+
+
+def _submit_tool(executor, name: str, func: AgentFunction, args: dict, debug: bool, trace):
+    # (future, clock) of a sync tool call run on a pool
+    clock = ToolClock()
+    future = executor.submit(clock.call, _timed_call, name, func, args, debug, trace)
+    return future, clock
+
+
+def _close_stream(completion):
+    # returns what close() returns, awaitable for async streams
+    close = getattr(completion, "close", None)
+    if close:
+        return close()
+
+
+class RunState:
+    """
+    One run's state and the steps of its turn loop.
+
+    `Swarm` and `AsyncSwarm` drive the same steps and differ only in how they
+    wait for completions and tools, so limits, tracing, streamed messages,
+    handoffs and checkpoints are handled here once for both.
+    """
+
+    def __init__(
+        self,
+        swarm: Swarm,
+        agent: Agent,
+        messages: List,
+        context_variables: dict,
+        model_override: str = None,
+        debug: bool = False,
+        max_turns: int = float("inf"),
+        execute_tools: bool = True,
+        stream_arguments: bool = False,
+        cancel: CancellationToken = None,
+        turn_timeout: float = None,
+        tool_timeout: float = None,
+        run_id: str = None,
+    ):
+        self.swarm = swarm
+        self.agent = agent
+        # the caller's messages are shared rather than copied and never
+        # modified; context values are deep-copied, since tools may mutate them
+        self.context_variables = copy.deepcopy(context_variables)
+        self.history = History(messages)
+        self.model_override = model_override
+        self.debug = debug
+        self.max_turns = max_turns
+        self.execute_tools = execute_tools
+        self.stream_arguments = stream_arguments
+        self.run_id = run_id
+        self.trace = Trace(swarm.tracer) if swarm.tracer else None
+        self.limits = (
+            RunLimits(cancel, turn_timeout, tool_timeout)
+            if cancel or turn_timeout or tool_timeout
+            else None
+        )
+        self.stop_reason = None
+        # the current turn: when its completion was requested, its tool
+        # calls and, when streamed, the message being assembled
+        self.started = None
+        self.tool_calls = None
+        self.compiled = None
+        self.message = None
+        self.early_start = False
+        self.early_calls = {}
+        self.usage = None
+
+    def next_turn(self) -> bool:
+        """Starts a turn, or returns False when the run is over."""
+        if len(self.history.new_messages) >= self.max_turns or not self.agent:
+            return False
+        if self.limits:
+            self.stop_reason = self.limits.start_turn()
+            if self.stop_reason:
+                return False
+        if self.trace:
+            self.trace.turn_start(self.agent, self.history)
+        self.started = time.perf_counter()
+        return True
+
+    def completion_args(self, stream: bool) -> dict:
+        """Keyword arguments of `get_chat_completion` for this turn."""
+        return {
+            "agent": self.agent,
+            "history": self.history,
+            "context_variables": self.context_variables,
+            "model_override": self.model_override,
+            "stream": stream,
+            "debug": self.debug,
+            "limits": self.limits,
+        }
+
+    def end_turn(self) -> None:
+        if self.trace:
+            self.trace.turn_end(self.history)
+
+    def interrupt(self, reason: str) -> None:
+        """Ends the run when a limit trips before the completion arrives."""
+        self.stop_reason = reason
+        self.end_turn()
+
+    def trace_completion(self, usage) -> None:
+        if self.trace:
+            self.trace.completion(
+                self.agent,
+                self.model_override or self.agent.model,
+                self.started,
+                usage,
+            )
+
+    def add_completion(self, completion) -> bool:
+        """Adds a completion's message; returns whether to run its tool calls."""
+        self.trace_completion(completion.usage)
+        message = completion.choices[0].message
+        message.sender = self.agent.name
+        self.tool_calls = message.tool_calls
+        # to avoid OpenAI types (?)
+        return self.add_message(json.loads(message.model_dump_json()))
+
+    def add_message(self, message: dict) -> bool:
+        debug_print(self.debug, "Received completion:", message)
+        self.history.append(message)
+        if not message["tool_calls"] or not self.execute_tools:
+            debug_print(self.debug, "Ending turn.")
+            self.end_turn()
+            return False
+        return True
+
+    def start_stream(self) -> None:
+        """Prepares to assemble this turn's message from streamed chunks."""
+        self.compiled = compile_tools(self.agent.functions)
+        self.early_start = self.execute_tools and self.swarm.can_start_early(
+            self.compiled
+        )
+        self.early_calls = {}
+        self.message = StreamedMessage(
+            self.agent.name,
+            parse_arguments=self.stream_arguments or self.early_start,
+        )
+        self.usage = None
+
+    def add_chunk(self, chunk) -> List[dict]:
+        """
+        Adds a streamed chunk and returns the events to yield for it, or None
+        when a limit tripped and the stream should stop.
+        """
+        if self.limits:
+            self.stop_reason = self.limits.check()
+            if self.stop_reason:
+                return None
+        if chunk.usage:
+            self.usage = chunk.usage
+        if not chunk.choices:
+            return []
+        delta = chunk.choices[0].delta
+        event = delta_to_dict(delta)
+        if delta.role == "assistant":
+            event["sender"] = self.agent.name
+        events = [event]
+        message = self.message
+        message.add(delta)
+        if message.updates:
+            for update in message.updates:
+                if self.stream_arguments:
+                    events.append({"tool_call_arguments": update})
+                if self.early_start and update["done"]:
+                    early_call = self.swarm.start_early(
+                        update,
+                        self.compiled,
+                        self.context_variables,
+                        self.debug,
+                        self.trace,
+                    )
+                    if early_call is not None:
+                        self.early_calls[update["id"]] = early_call
+            message.updates.clear()
+        return events
+
+    def end_stream(self) -> bool:
+        """
+        Adds the streamed message, or after an interruption the text streamed
+        so far. Returns whether to run its tool calls.
+        """
+        self.trace_completion(self.usage)
+        message = self.message.to_dict()
+        if self.stop_reason:
+            # keep the streamed text, without half-streamed tool calls
+            if message["content"]:
+                message["tool_calls"] = None
+                self.history.append(message)
+            self.end_turn()
+            return False
+        if not self.add_message(message):
+            return False
+        self.tool_calls = _stream_tool_calls(message)
+        return True
+
+    def tool_call_args(self) -> dict:
+        """Keyword arguments of `handle_tool_calls` for this turn's tool calls."""
+        return {
+            "tool_calls": self.tool_calls,
+            "functions": self.agent.functions,
+            "context_variables": self.context_variables,
+            "debug": self.debug,
+            "parallel": self.agent.parallel_tool_calls,
+            "trace": self.trace,
+            "early_calls": self.early_calls,
+            "limits": self.limits,
+            "partial": True,
+        }
+
+    def interrupt_tools(self, reason: str) -> None:
+        """
+        Ends the run when a limit trips while tools run. Every tool call gets
+        an error result, so the history stays valid to resume.
+        """
+        self.stop_reason = reason
+        self.history.extend(
+            _interrupted_tool_messages(self.history[-1]["tool_calls"], reason)
+        )
+        self.end_turn()
+
+    def add_tool_results(self, partial_response: PartialResponse) -> None:
+        """Adds the turn's tool results, follows a handoff and checkpoints."""
+        self.history.extend(partial_response.messages)
+        self.context_variables.update(partial_response.context_variables)
+        if partial_response.agent:
+            if self.trace:
+                self.trace.handoff(self.agent, partial_response.agent)
+            self.agent = partial_response.agent
+        self.end_turn()
+        self.swarm.save_checkpoint(
+            self.run_id, self.agent, self.history, self.context_variables
+        )
+
+    def response(self) -> Response:
+        self.swarm.save_checkpoint(
+            self.run_id,
+            self.agent,
+            self.history,
+            self.context_variables,
+            self.stop_reason,
+            done=True,
+        )
+        return Response(
+            messages=self.history.new_messages,
+            agent=self.agent,
+            context_variables=self.context_variables,
+            stop_reason=self.stop_reason,
+        )
 
 
 class Swarm:
-    def __init__(self, client=None):
+    def __init__(
+        self,
+        client=None,
+        max_tool_workers: int = None,
+        max_background_tools: int = None,
+        rate_limiter: RateLimiter = None,
+        max_retries: int = 0,
+        cache: CompletionCache = None,
+        tracer: Tracer = None,
+        compactor: HistoryCompactor = None,
+        checkpoints: CheckpointStore = None,
+    ):
         if not client:
-            client = OpenAI()
+            from openai import OpenAI
+
+            from .transport import shared_http_client
+
+            client = OpenAI(http_client=shared_http_client())
         self.client = client
+        self.tracer = tracer
+        # shrinks the history sent with each request; Response.messages
+        # and the caller's messages are never compacted
+        self.compactor = compactor
+        # non-streamed completions are reused for identical requests
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        # retries on transient API errors, on top of the client's own
+        self.max_retries = max_retries
+        # (client, copy of it that doesn't retry), see request_client
+        self._unretried = None
+        # tool calls of agents with parallel_tool_calls run concurrently
+        # on this pool; None keeps sequential execution
+        self.max_tool_workers = max_tool_workers
+        self.tool_executor = (
+            ThreadPoolExecutor(
+                max_workers=max_tool_workers, thread_name_prefix="swarm-tool"
+            )
+            if max_tool_workers
+            else None
+        )
+        # tools that a timeout may have to abandon run on a thread, on the
+        # tool pool or else on this one; threads start on first use
+        self.background_executor = self.tool_executor or ThreadPoolExecutor(
+            max_workers=max_background_tools, thread_name_prefix="swarm-background-tool"
+        )
+        # run state is saved here after every turn of runs given a run_id
+        self.checkpoints = checkpoints
 
-    def get_chat_completion(
+    def build_create_params(
         self,
         agent: Agent,
         history: List,
@@ -37,23 +473,21 @@ class Swarm:
         model_override: str,
         stream: bool,
         debug: bool,
-    ) -> ChatCompletionMessage:
-        context_variables = defaultdict(str, context_variables)
-        instructions = (
-            agent.instructions(context_variables)
-            if callable(agent.instructions)
-            else agent.instructions
-        )
-        messages = [{"role": "system", "content": instructions}] + history
+    ) -> dict:
+        if not callable(agent.instructions):
+            instructions = agent.instructions
+        elif agent.cache_instructions:
+            instructions = instructions_cache.render(
+                agent.instructions, context_variables
+            )
+        else:
+            instructions = agent.instructions(defaultdict(str, context_variables))
+        if self.compactor:
+            history = self.compactor(list(history))
+        messages = [{"role": "system", "content": instructions}, *history]
         debug_print(debug, "Getting chat completion for...:", messages)
 
-        tools = [function_to_json(f) for f in agent.functions]
-        # hide context_variables from model
-        for tool in tools:
-            params = tool["function"]["parameters"]
-            params["properties"].pop(__CTX_VARS_NAME__, None)
-            if __CTX_VARS_NAME__ in params["required"]:
-                params["required"].remove(__CTX_VARS_NAME__)
+        tools = compile_tools(agent.functions).tools
 
         create_params = {
             "model": model_override or agent.model,
@@ -65,8 +499,168 @@ class Swarm:
 
         if tools:
             create_params["parallel_tool_calls"] = agent.parallel_tool_calls
+        if stream and self.tracer:
+            # the last chunk then carries the usage for on_completion
+            create_params["stream_options"] = {"include_usage": True}
 
-        return self.client.chat.completions.create(**create_params)
+        return create_params
+
+    def get_chat_completion(
+        self,
+        agent: Agent,
+        history: List,
+        context_variables: dict,
+        model_override: str,
+        stream: bool,
+        debug: bool,
+        limits: RunLimits = None,
+    ) -> ChatCompletionMessage:
+        create_params = self.build_create_params(
+            agent, history, context_variables, model_override, stream, debug
+        )
+        return self.create_completion(create_params, limits)
+
+    def cached_completion(self, create_params: dict):
+        """
+        Returns (cache key, cached ChatCompletion or None) for a request;
+        the key is None when the request can't be cached.
+        """
+        if self.cache is None or create_params.get("stream"):
+            return None, None
+        key = request_hash(create_params)
+        cached = self.cache.get(key)
+        if cached is None:
+            return key, None
+        from openai.types.chat import ChatCompletion
+
+        return key, ChatCompletion.model_validate_json(cached)
+
+    def create_completion(self, create_params: dict, limits: RunLimits = None):
+        cache_key, cached = self.cached_completion(create_params)
+        if cached is not None:
+            return cached
+        completion = self.request_completion(create_params, limits)
+        if cache_key is not None:
+            self.cache.set(cache_key, completion.model_dump_json())
+        return completion
+
+    def request_client(self, limits: RunLimits = None) -> Tuple:
+        """
+        Returns (client, retries) for a request. Under a time limit the
+        client's own retries would run past the time left, so this returns a
+        copy that doesn't retry, and Swarm makes those retries itself.
+        """
+        client = self.client
+        if limits is None or limits.remaining() is None or not hasattr(client, "with_options"):
+            return client, self.max_retries
+        if self._unretried is None or self._unretried[0] is not client:
+            self._unretried = (client, client.with_options(max_retries=0))
+        return self._unretried[1], self.max_retries + client.max_retries
+
+    def request_completion(self, create_params: dict, limits: RunLimits = None):
+        """
+        Makes the API call, waiting on the rate limiter and retrying
+        transient errors. Under `limits`, each attempt's HTTP timeout and
+        backoff are capped at the time left and a timeout interrupts the run.
+        """
+        limiter = self.rate_limiter
+        reserved = (
+            estimate_tokens(create_params)
+            if limiter and limiter.tokens_per_minute
+            else 0
+        )
+        client, max_retries = self.request_client(limits)
+        attempt = 0
+        while True:
+            if limiter:
+                limiter.acquire(reserved)
+            options = {}
+            if limits:
+                if reason := limits.check():
+                    raise RunInterrupted(reason)
+                remaining = limits.remaining()
+                if remaining is not None:
+                    if remaining <= 0:
+                        raise RunInterrupted(limits.check() or "deadline")
+                    options["timeout"] = remaining
+            try:
+                completion = client.chat.completions.create(**create_params, **options)
+            except Exception as e:
+                if limits and _is_timeout(e):
+                    raise RunInterrupted(limits.check() or "turn_timeout") from e
+                if attempt >= max_retries or not is_transient_error(e):
+                    raise
+                delay = backoff_delay(attempt, e)
+                if limits:
+                    limits.sleep(delay)
+                else:
+                    time.sleep(delay)
+                attempt += 1
+                continue
+            if limiter:
+                limiter.record(reserved, getattr(completion, "usage", None))
+            return completion
+
+    def stream_chunks(self, completion, limits: RunLimits = None) -> Iterator:
+        """
+        Yields the chunks of a streamed completion. Under `limits`, a read
+        that times out (a stalled stream) interrupts the run.
+        """
+        if limits is None:
+            yield from completion
+            return
+        try:
+            yield from completion
+        except Exception as e:
+            if _is_timeout(e):
+                raise RunInterrupted(limits.check() or "turn_timeout") from e
+            raise
+
+    def save_checkpoint(
+        self,
+        run_id: str,
+        agent: Agent,
+        history: History,
+        context_variables: dict,
+        stop_reason: str = None,
+        done: bool = False,
+    ) -> None:
+        if self.checkpoints is None or run_id is None:
+            return
+        self.checkpoints.save(
+            run_id,
+            agent.name if agent else None,
+            history,
+            context_variables,
+            len(history.prefix),
+            stop_reason,
+            done,
+        )
+
+    def load_checkpoint(self, run_id: str, agents) -> Tuple:
+        """
+        Loads the run's checkpoint and looks up its agent by name, returning
+        `(checkpoint, agent, pending tool calls)`.
+        """
+        if self.checkpoints is None:
+            raise ValueError("Swarm was created without a checkpoint store")
+        checkpoint = self.checkpoints.load(run_id)
+        agent = None
+        if checkpoint.agent is not None:
+            agent = agents_by_name(agents).get(checkpoint.agent)
+            if agent is None:
+                raise KeyError(
+                    f"Agent {checkpoint.agent!r} of run {run_id!r} is not registered"
+                )
+        from openai.types.chat.chat_completion_message_tool_call import (
+            ChatCompletionMessageToolCall,
+        )
+
+        pending = [
+            ChatCompletionMessageToolCall.model_validate(tool_call)
+            for tool_call in checkpoint.pending_tool_calls
+        ]
+        return checkpoint, agent, pending
 
     def handle_function_result(self, result, debug) -> Result:
         match result:
@@ -74,10 +668,7 @@ class Swarm:
                 return result
 
             case Agent() as agent:
-                return Result(
-                    value=json.dumps({"assistant": agent.name}),
-                    agent=agent,
-                )
+                return Result(value=_handoff_value(agent.name), agent=agent)
             case _:
                 try:
                     return Result(value=str(result))
@@ -86,55 +677,233 @@ class Swarm:
                     debug_print(debug, error_message)
                     raise TypeError(error_message)
 
+    def prepare_tool_call(
+        self,
+        tool_call: ChatCompletionMessageToolCall,
+        compiled: CompiledTools,
+        context_variables: dict,
+        debug: bool,
+    ):
+        """
+        Resolves a tool call to its agent function and keyword arguments.
+        Returns None when the tool is not one of the agent's functions.
+        """
+        name = tool_call.function.name
+        if name not in compiled.function_map:
+            debug_print(debug, f"Tool {name} not found in function map.")
+            return None
+        args = json.loads(tool_call.function.arguments)
+        debug_print(
+            debug, f"Processing tool call: {name} with arguments {args}")
+
+        func = compiled.function_map[name]
+        # pass context_variables to agent functions
+        if name in compiled.context_aware:
+            args[__CTX_VARS_NAME__] = context_variables
+        return func, args
+
+    def merge_tool_result(
+        self,
+        tool_call: ChatCompletionMessageToolCall,
+        raw_result,
+        partial_response: PartialResponse,
+        debug: bool,
+    ) -> None:
+        # strings and handoffs, the common results, skip building a Result
+        if isinstance(raw_result, str):
+            value, agent = raw_result, None
+        elif isinstance(raw_result, Agent):
+            value, agent = _handoff_value(raw_result.name), raw_result
+        else:
+            result: Result = self.handle_function_result(raw_result, debug)
+            value, agent = result.value, result.agent
+            partial_response.context_variables.update(result.context_variables)
+        partial_response.messages.append(
+            {
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "tool_name": tool_call.function.name,
+                "content": value,
+            }
+        )
+        if agent:
+            partial_response.agent = agent
+
+    def can_start_early(self, compiled: CompiledTools) -> bool:
+        # sync functions need the tool pool to run alongside the stream
+        return bool(compiled.streaming_safe) and self.tool_executor is not None
+
+    def start_early(
+        self,
+        update: dict,
+        compiled: CompiledTools,
+        context_variables: dict,
+        debug: bool,
+        trace: Trace = None,
+    ):
+        """
+        Starts a `streaming_safe` tool call as soon as its streamed arguments
+        are complete. Returns a future of its raw result, or None if the tool
+        isn't streaming-safe.
+        """
+        name = update["name"]
+        if name not in compiled.streaming_safe:
+            return None
+        args = dict(update["arguments"])
+        if name in compiled.context_aware:
+            args[__CTX_VARS_NAME__] = context_variables
+        debug_print(debug, f"Starting tool call {name} while streaming.")
+        return self.submit_early(name, compiled.function_map[name], args, debug, trace)
+
+    def submit_early(
+        self,
+        name: str,
+        func: AgentFunction,
+        args: dict,
+        debug: bool,
+        trace: Trace = None,
+    ):
+        # (future of the raw result, clock), waited on in handle_tool_calls
+        return _submit_tool(self.tool_executor, name, func, args, debug, trace)
+
+    def call_tool(
+        self,
+        name: str,
+        func: AgentFunction,
+        args: dict,
+        debug: bool,
+        trace: Trace = None,
+        limits: RunLimits = None,
+    ):
+        """
+        Runs one tool call. Under a timeout or deadline it runs on
+        `background_executor`, so the run can stop waiting for it.
+        """
+        if limits and limits.timed:
+            future, clock = _submit_tool(
+                self.background_executor, name, func, args, debug, trace
+            )
+            return limits.wait(future, clock)
+        return _timed_call(name, func, args, debug, trace)
+
+    def call_tools_concurrently(
+        self, calls: List, debug: bool, trace: Trace = None, limits: RunLimits = None
+    ) -> List:
+        """
+        Runs (name, func, args) calls at once: regular functions on the tool
+        thread pool, coroutine functions together under `asyncio.gather`.
+        Waits for every call, then returns raw results in the order given,
+        raising the first error (in that order) if any call failed.
+        """
+        outcomes = [None] * len(calls)
+        futures = {}
+        clocks = {}
+        coroutines = {}
+        for i, (name, func, args) in enumerate(calls):
+            if inspect.iscoroutinefunction(func):
+                coroutines[i] = _async_timed_call(
+                    name, func, args, debug, trace)
+            else:
+                clocks[i] = ToolClock()
+                futures[i] = self.tool_executor.submit(
+                    clocks[i].call, _timed_call, name, func, args, debug, trace
+                )
+
+        if coroutines:
+            async def gather():
+                gathered = asyncio.gather(
+                    *coroutines.values(), return_exceptions=True
+                )
+                if limits:
+                    return await limits.wait_async(
+                        gathered, ToolClock(time.monotonic())
+                    )
+                return await gathered
+
+            for i, value in zip(coroutines, asyncio.run(gather())):
+                outcomes[i] = (not isinstance(value, BaseException), value)
+
+        for i, future in futures.items():
+            if limits:
+                try:
+                    limits.wait(future, clocks[i])
+                except RunInterrupted:
+                    raise
+                except Exception:
+                    pass  # collected below, in tool_call order
+            error = future.exception()
+            outcomes[i] = (True, future.result()) if error is None else (
+                False, error)
+
+        return _raise_first_error(outcomes)
+
+    def prepare_tool_calls(
+        self,
+        tool_calls: List[ChatCompletionMessageToolCall],
+        functions: List[AgentFunction],
+        context_variables: dict,
+        debug: bool,
+    ) -> List:
+        """`prepare_tool_call` for each tool call, in order."""
+        compiled = compile_tools(functions)
+        return [
+            self.prepare_tool_call(tool_call, compiled, context_variables, debug)
+            for tool_call in tool_calls
+        ]
+
     def handle_tool_calls(
         self,
         tool_calls: List[ChatCompletionMessageToolCall],
         functions: List[AgentFunction],
         context_variables: dict,
         debug: bool,
-    ) -> Response:
-        function_map = {f.__name__: f for f in functions}
-        partial_response = Response(
-            messages=[], agent=None, context_variables={})
+        parallel: bool = False,
+        trace: Trace = None,
+        early_calls: dict = None,
+        limits: RunLimits = None,
+        partial: bool = False,
+    ) -> Union[Response, PartialResponse]:
+        """
+        Runs the tool calls and returns their messages, handoff and context
+        updates as a `Response`, or with `partial=True` as the lighter
+        `PartialResponse` the run loop uses.
+        """
+        prepared = self.prepare_tool_calls(
+            tool_calls, functions, context_variables, debug
+        )
+        # tool_call id -> (future, clock) of a call started while streaming
+        early_calls = early_calls or {}
+        raw_results = None
+        if parallel and self.tool_executor and len(tool_calls) > 1:
+            raw_results = iter(
+                self.call_tools_concurrently(
+                    _deferred_calls(tool_calls, prepared, early_calls),
+                    debug,
+                    trace,
+                    limits,
+                )
+            )
 
-        for tool_call in tool_calls:
-            name = tool_call.function.name
+        partial_response = PartialResponse()
+        # merge in tool_call order, so later calls win context_variables
+        # and the last handoff is used, exactly as when run sequentially
+        for tool_call, p in zip(tool_calls, prepared):
             # handle missing tool case, skip to next tool
-            if name not in function_map:
-                debug_print(debug, f"Tool {name} not found in function map.")
+            if p is None:
                 partial_response.messages.append(
-                    {
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "tool_name": name,
-                        "content": f"Error: Tool {name} not found.",
-                    }
-                )
+                    _missing_tool_message(tool_call))
                 continue
-            args = json.loads(tool_call.function.arguments)
-            debug_print(
-                debug, f"Processing tool call: {name} with arguments {args}")
-
-            func = function_map[name]
-            # pass context_variables to agent functions
-            if __CTX_VARS_NAME__ in func.__code__.co_varnames:
-                args[__CTX_VARS_NAME__] = context_variables
-            raw_result = function_map[name](**args)
-
-            result: Result = self.handle_function_result(raw_result, debug)
-            partial_response.messages.append(
-                {
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "tool_name": name,
-                    "content": result.value,
-                }
-            )
-            partial_response.context_variables.update(result.context_variables)
-            if result.agent:
-                partial_response.agent = result.agent
-
-        return partial_response
+            if tool_call.id in early_calls:
+                future, clock = early_calls[tool_call.id]
+                raw_result = limits.wait(future, clock) if limits else future.result()
+            elif raw_results is not None:
+                raw_result = next(raw_results)
+            else:
+                raw_result = self.call_tool(
+                    tool_call.function.name, *p, debug, trace, limits
+                )
+            self.merge_tool_result(tool_call, raw_result, partial_response, debug)
+        return partial_response if partial else partial_response.to_response()
 
     def run_and_stream(
         self,
@@ -145,90 +914,589 @@ class Swarm:
         debug: bool = False,
         max_turns: int = float("inf"),
         execute_tools: bool = True,
+        stream_arguments: bool = False,
+        cancel: CancellationToken = None,
+        turn_timeout: float = None,
+        tool_timeout: float = None,
+        run_id: str = None,
     ):
-        active_agent = agent
-        context_variables = copy.deepcopy(context_variables)
-        history = copy.deepcopy(messages)
-        init_len = len(messages)
-
-        while len(history) - init_len < max_turns:
-
-            message = {
-                "content": "",
-                "sender": agent.name,
-                "role": "assistant",
-                "function_call": None,
-                "tool_calls": defaultdict(
-                    lambda: {
-                        "function": {"arguments": "", "name": ""},
-                        "id": "",
-                        "type": "",
-                    }
-                ),
-            }
+        state = RunState(
+            self,
+            agent,
+            messages,
+            context_variables,
+            model_override,
+            debug,
+            max_turns,
+            execute_tools,
+            stream_arguments,
+            cancel,
+            turn_timeout,
+            tool_timeout,
+            run_id,
+        )
+        while state.next_turn():
+            state.start_stream()
+            try:
+                completion = self.get_chat_completion(**state.completion_args(True))
+            except RunInterrupted as interrupted:
+                state.interrupt(interrupted.reason)
+                break
 
-            # get completion with current history, agent
-            completion = self.get_chat_completion(
-                agent=active_agent,
-                history=history,
+            yield {"delim": "start"}
+            try:
+                for chunk in self.stream_chunks(completion, state.limits):
+                    events = state.add_chunk(chunk)
+                    if events is None:
+                        break
+                    yield from events
+            except RunInterrupted as interrupted:
+                state.stop_reason = interrupted.reason
+            yield {"delim": "end"}
+            if state.stop_reason:
+                _close_stream(completion)
+            if not state.end_stream():
+                break
+
+            # handle function calls, updating context_variables, and switching agents
+            try:
+                partial_response = self.handle_tool_calls(**state.tool_call_args())
+            except RunInterrupted as interrupted:
+                state.interrupt_tools(interrupted.reason)
+                break
+            state.add_tool_results(partial_response)
+
+        yield {"response": state.response()}
+
+    def run(
+        self,
+        agent: Agent,
+        messages: List,
+        context_variables: dict = {},
+        model_override: str = None,
+        stream: bool = False,
+        debug: bool = False,
+        max_turns: int = float("inf"),
+        execute_tools: bool = True,
+        stream_arguments: bool = False,
+        cancel: CancellationToken = None,
+        turn_timeout: float = None,
+        tool_timeout: float = None,
+        run_id: str = None,
+    ) -> Response:
+        if stream:
+            return self.run_and_stream(
+                agent=agent,
+                messages=messages,
                 context_variables=context_variables,
                 model_override=model_override,
-                stream=True,
                 debug=debug,
+                max_turns=max_turns,
+                execute_tools=execute_tools,
+                stream_arguments=stream_arguments,
+                cancel=cancel,
+                turn_timeout=turn_timeout,
+                tool_timeout=tool_timeout,
+                run_id=run_id,
             )
+        state = RunState(
+            self,
+            agent,
+            messages,
+            context_variables,
+            model_override,
+            debug,
+            max_turns,
+            execute_tools,
+            stream_arguments,
+            cancel,
+            turn_timeout,
+            tool_timeout,
+            run_id,
+        )
+        while state.next_turn():
+            # get completion with current history, agent
+            try:
+                completion = self.get_chat_completion(**state.completion_args(False))
+            except RunInterrupted as interrupted:
+                state.interrupt(interrupted.reason)
+                break
+            if not state.add_completion(completion):
+                break
 
-            yield {"delim": "start"}
-            for chunk in completion:
-                delta = json.loads(chunk.choices[0].delta.json())
-                if delta["role"] == "assistant":
-                    delta["sender"] = active_agent.name
-                yield delta
-                delta.pop("role", None)
-                delta.pop("sender", None)
-                merge_chunk(message, delta)
-            yield {"delim": "end"}
+            # handle function calls, updating context_variables, and switching agents
+            try:
+                partial_response = self.handle_tool_calls(**state.tool_call_args())
+            except RunInterrupted as interrupted:
+                state.interrupt_tools(interrupted.reason)
+                break
+            state.add_tool_results(partial_response)
 
-            message["tool_calls"] = list(
-                message.get("tool_calls", {}).values())
-            if not message["tool_calls"]:
-                message["tool_calls"] = None
-            debug_print(debug, "Received completion:", message)
-            history.append(message)
+        return state.response()
 
-            if not message["tool_calls"] or not execute_tools:
-                debug_print(debug, "Ending turn.")
-                break
+    def load_resume(self, run_id: str, agents, run_kwargs: dict) -> Tuple:
+        """
+        Loads a checkpoint for `resume`, returning `(checkpoint, agent, tool
+        calls to execute before the run continues)`.
+        """
+        if run_kwargs.get("stream"):
+            raise ValueError("resume() does not stream")
+        checkpoint, agent, pending = self.load_checkpoint(run_id, agents)
+        if not agent or not run_kwargs.get("execute_tools", True):
+            pending = []
+        return checkpoint, agent, pending
 
-            # convert tool_calls to objects
-            tool_calls = []
-            for tool_call in message["tool_calls"]:
-                function = Function(
-                    arguments=tool_call["function"]["arguments"],
-                    name=tool_call["function"]["name"],
-                )
-                tool_call_object = ChatCompletionMessageToolCall(
-                    id=tool_call["id"], function=function, type=tool_call["type"]
-                )
-                tool_calls.append(tool_call_object)
+    def finished_response(self, checkpoint, agent: Agent, pending: List):
+        """
+        The stored `Response` of a run that already returned with nothing
+        left to do, so resuming it doesn't ask the model again; else None.
+        A run stopped by a limit (`stop_reason`) is continued instead.
+        """
+        if not checkpoint.done or checkpoint.stop_reason or pending:
+            return None
+        return Response(
+            messages=checkpoint.messages[checkpoint.start:],
+            agent=agent,
+            context_variables=checkpoint.context_variables,
+        )
 
-            # handle function calls, updating context_variables, and switching agents
+    def resume(self, run_id: str, agents, **run_kwargs) -> Response:
+        """
+        Continues a checkpointed run, e.g. on another worker after a restart.
+        `agents` maps agent names to agents (or is a list of agents), and
+        `run_kwargs` are passed on to `run()`. Tool calls the checkpoint left
+        without results (a run with `execute_tools=False`) are executed
+        first. The returned messages are all the messages of the run since
+        it first started. A run that already returned is not run again; its
+        stored `Response` is returned.
+        """
+        checkpoint, agent, pending = self.load_resume(run_id, agents, run_kwargs)
+        finished = self.finished_response(checkpoint, agent, pending)
+        if finished is not None:
+            return finished
+        messages = checkpoint.messages
+        context_variables = checkpoint.context_variables
+        if pending:
             partial_response = self.handle_tool_calls(
-                tool_calls, active_agent.functions, context_variables, debug
+                pending,
+                agent.functions,
+                context_variables,
+                run_kwargs.get("debug", False),
+                parallel=agent.parallel_tool_calls,
+                partial=True,
             )
-            history.extend(partial_response.messages)
+            messages = messages + partial_response.messages
             context_variables.update(partial_response.context_variables)
-            if partial_response.agent:
-                active_agent = partial_response.agent
+            agent = partial_response.agent or agent
+        response = self.run(
+            agent=agent,
+            messages=messages,
+            context_variables=context_variables,
+            run_id=run_id,
+            **run_kwargs,
+        )
+        response.messages = messages[checkpoint.start:] + response.messages
+        return response
 
-        yield {
-            "response": Response(
-                messages=history[init_len:],
-                agent=active_agent,
-                context_variables=context_variables,
+    def run_many(
+        self,
+        agent: Agent,
+        conversations: Iterable,
+        max_concurrency: int = 8,
+        rate_limit: RateLimiter = None,
+        max_retries: int = 3,
+        ordered: bool = False,
+        return_exceptions: bool = False,
+        **run_kwargs,
+    ) -> Iterator[Tuple[int, Response]]:
+        """
+        Runs many independent conversations with `agent` on a pool of
+        `max_concurrency` threads, yielding `(index, Response)` pairs as runs
+        finish, or in input order when `ordered` is True.
+
+        Each conversation is a list of messages, or a dict of `run()` arguments
+        (e.g. `messages` and `context_variables`) that override `run_kwargs`.
+        Completions share `rate_limit` and are retried up to `max_retries`
+        times on transient API errors. A failed run raises, or is yielded as
+        its exception when `return_exceptions` is True.
+        """
+        worker = copy.copy(self)
+        worker.rate_limiter = rate_limit or self.rate_limiter
+        worker.max_retries = max_retries
+        run_kwargs.pop("stream", None)
+
+        conversations = enumerate(conversations)
+        pending = {}
+        finished = {}
+        next_index = 0
+
+        with ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="swarm-run"
+        ) as pool:
+
+            def submit_next() -> None:
+                for index, conversation in conversations:
+                    kwargs = _conversation_kwargs(conversation, run_kwargs)
+                    kwargs.setdefault("agent", agent)
+                    pending[pool.submit(worker.run, **kwargs)] = index
+                    return
+
+            for _ in range(max_concurrency):
+                submit_next()
+
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for index, future in sorted(
+                        (pending.pop(future), future) for future in done
+                    ):
+                        submit_next()
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            if not return_exceptions:
+                                raise
+                            result = e
+                        if not ordered:
+                            yield index, result
+                            continue
+                        finished[index] = result
+                        while next_index in finished:
+                            yield next_index, finished.pop(next_index)
+                            next_index += 1
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+class AsyncSwarm(Swarm):
+    """
+    asyncio counterpart of `Swarm`, built on `AsyncOpenAI`.
+
+    Drives the same turn loop (`RunState`), handoffs and `Response` shape as
+    `Swarm`, but awaits completions and agent functions, so a single event
+    loop can serve many conversations concurrently. Agent functions may be
+    coroutine functions, which run on the loop, or regular functions, which
+    run on a thread so they never block it.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_tool_workers: int = None,
+        max_background_tools: int = None,
+        rate_limiter: RateLimiter = None,
+        max_retries: int = 0,
+        cache: CompletionCache = None,
+        tracer: Tracer = None,
+        compactor: HistoryCompactor = None,
+        checkpoints: CheckpointStore = None,
+    ):
+        if not client:
+            from openai import AsyncOpenAI
+
+            from .transport import shared_async_http_client
+
+            client = AsyncOpenAI(http_client=shared_async_http_client())
+        super().__init__(
+            client,
+            max_tool_workers,
+            max_background_tools,
+            rate_limiter,
+            max_retries,
+            cache,
+            tracer,
+            compactor,
+            checkpoints,
+        )
+
+    async def get_chat_completion(
+        self,
+        agent: Agent,
+        history: List,
+        context_variables: dict,
+        model_override: str,
+        stream: bool,
+        debug: bool,
+        limits: RunLimits = None,
+    ) -> ChatCompletionMessage:
+        create_params = self.build_create_params(
+            agent, history, context_variables, model_override, stream, debug
+        )
+        return await self.create_completion(create_params, limits)
+
+    async def create_completion(self, create_params: dict, limits: RunLimits = None):
+        cache_key, cached = self.cached_completion(create_params)
+        if cached is not None:
+            return cached
+        completion = await self.request_completion(create_params, limits)
+        if cache_key is not None:
+            self.cache.set(cache_key, completion.model_dump_json())
+        return completion
+
+    async def request_completion(self, create_params: dict, limits: RunLimits = None):
+        limiter = self.rate_limiter
+        reserved = (
+            estimate_tokens(create_params)
+            if limiter and limiter.tokens_per_minute
+            else 0
+        )
+        attempt = 0
+        while True:
+            if limiter:
+                await limiter.acquire_async(reserved)
+            try:
+                if limits:
+                    # a task, so a cancel or deadline can abandon the request
+                    completion = await limits.wait_async(
+                        asyncio.ensure_future(
+                            self.client.chat.completions.create(**create_params)
+                        )
+                    )
+                else:
+                    completion = await self.client.chat.completions.create(
+                        **create_params
+                    )
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient_error(e):
+                    raise
+                delay = backoff_delay(attempt, e)
+                if limits:
+                    await limits.sleep_async(delay)
+                    if reason := limits.check():
+                        raise RunInterrupted(reason) from e
+                else:
+                    await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            if limiter:
+                limiter.record(reserved, getattr(completion, "usage", None))
+            return completion
+
+    async def stream_chunks(self, completion, limits: RunLimits = None):
+        """
+        Yields the chunks of a streamed completion. Under `limits`, each
+        chunk is awaited as a task, so a stalled stream still trips a
+        limit.
+        """
+        if limits is None:
+            async for chunk in completion:
+                yield chunk
+            return
+        chunks = completion.__aiter__()
+        while True:
+            try:
+                chunk = await limits.wait_async(asyncio.ensure_future(chunks.__anext__()))
+            except StopAsyncIteration:
+                return
+            except RunInterrupted:
+                raise
+            except Exception as e:
+                if _is_timeout(e):
+                    raise RunInterrupted(limits.check() or "turn_timeout") from e
+                raise
+            yield chunk
+
+    def can_start_early(self, compiled: CompiledTools) -> bool:
+        return bool(compiled.streaming_safe)
+
+    def submit_early(
+        self,
+        name: str,
+        func: AgentFunction,
+        args: dict,
+        debug: bool,
+        trace: Trace = None,
+    ):
+        return self.start_tool(name, func, args, debug, trace)
+
+    def start_tool(
+        self,
+        name: str,
+        func: AgentFunction,
+        args: dict,
+        debug: bool,
+        trace: Trace = None,
+    ):
+        """
+        Starts one tool call and returns (future, clock): coroutine functions
+        as a task on the event loop, regular functions on
+        `background_executor`, so a blocking tool doesn't stall every other
+        conversation on the loop.
+        """
+        if inspect.iscoroutinefunction(func):
+            clock = ToolClock(time.monotonic())
+            future = asyncio.ensure_future(
+                _async_timed_call(name, func, args, debug, trace)
             )
-        }
+        else:
+            clock = ToolClock()
+            future = asyncio.get_running_loop().run_in_executor(
+                self.background_executor,
+                clock.call,
+                _timed_call,
+                name,
+                func,
+                args,
+                debug,
+                trace,
+            )
+        return future, clock
 
-    def run(
+    async def call_tool(
+        self,
+        name: str,
+        func: AgentFunction,
+        args: dict,
+        debug: bool,
+        trace: Trace = None,
+        limits: RunLimits = None,
+    ):
+        """Runs one tool call, see `start_tool`."""
+        future, clock = self.start_tool(name, func, args, debug, trace)
+        if limits:
+            return await limits.wait_async(future, clock)
+        return await future
+
+    async def call_tools_concurrently(
+        self, calls: List, debug: bool, trace: Trace = None, limits: RunLimits = None
+    ) -> List:
+        """
+        Runs (name, func, args) calls at once with `call_tool`. Waits for
+        every call, then returns raw results in the order given, raising the
+        first error (in that order) if any call failed.
+        """
+        values = await asyncio.gather(
+            *(
+                self.call_tool(name, func, args, debug, trace, limits)
+                for name, func, args in calls
+            ),
+            return_exceptions=True,
+        )
+        return _raise_first_error(
+            [(not isinstance(value, BaseException), value) for value in values]
+        )
+
+    async def handle_tool_calls(
+        self,
+        tool_calls: List[ChatCompletionMessageToolCall],
+        functions: List[AgentFunction],
+        context_variables: dict,
+        debug: bool,
+        parallel: bool = False,
+        trace: Trace = None,
+        early_calls: dict = None,
+        limits: RunLimits = None,
+        partial: bool = False,
+    ) -> Union[Response, PartialResponse]:
+        prepared = self.prepare_tool_calls(
+            tool_calls, functions, context_variables, debug
+        )
+        # tool_call id -> (task, clock) of a call started while streaming
+        early_calls = early_calls or {}
+        raw_results = None
+        # coroutines need no pool to overlap, and sync tools already run on
+        # background_executor, so any parallel batch is gathered
+        if parallel and len(tool_calls) > 1:
+            raw_results = iter(
+                await self.call_tools_concurrently(
+                    _deferred_calls(tool_calls, prepared, early_calls),
+                    debug,
+                    trace,
+                    limits,
+                )
+            )
+
+        partial_response = PartialResponse()
+        for tool_call, p in zip(tool_calls, prepared):
+            if p is None:
+                partial_response.messages.append(
+                    _missing_tool_message(tool_call))
+                continue
+            if tool_call.id in early_calls:
+                future, clock = early_calls[tool_call.id]
+                raw_result = await (
+                    limits.wait_async(future, clock) if limits else future
+                )
+            elif raw_results is not None:
+                raw_result = next(raw_results)
+            else:
+                raw_result = await self.call_tool(
+                    tool_call.function.name, *p, debug, trace, limits
+                )
+            self.merge_tool_result(tool_call, raw_result, partial_response, debug)
+        return partial_response if partial else partial_response.to_response()
+
+    async def run_and_stream(
+        self,
+        agent: Agent,
+        messages: List,
+        context_variables: dict = {},
+        model_override: str = None,
+        debug: bool = False,
+        max_turns: int = float("inf"),
+        execute_tools: bool = True,
+        stream_arguments: bool = False,
+        cancel: CancellationToken = None,
+        turn_timeout: float = None,
+        tool_timeout: float = None,
+        run_id: str = None,
+    ):
+        state = RunState(
+            self,
+            agent,
+            messages,
+            context_variables,
+            model_override,
+            debug,
+            max_turns,
+            execute_tools,
+            stream_arguments,
+            cancel,
+            turn_timeout,
+            tool_timeout,
+            run_id,
+        )
+        while state.next_turn():
+            state.start_stream()
+            try:
+                completion = await self.get_chat_completion(
+                    **state.completion_args(True)
+                )
+            except RunInterrupted as interrupted:
+                state.interrupt(interrupted.reason)
+                break
+
+            yield {"delim": "start"}
+            try:
+                async for chunk in self.stream_chunks(completion, state.limits):
+                    events = state.add_chunk(chunk)
+                    if events is None:
+                        break
+                    for event in events:
+                        yield event
+            except RunInterrupted as interrupted:
+                state.stop_reason = interrupted.reason
+            yield {"delim": "end"}
+            if state.stop_reason:
+                closed = _close_stream(completion)
+                if inspect.isawaitable(closed):
+                    await closed
+            if not state.end_stream():
+                break
+
+            try:
+                partial_response = await self.handle_tool_calls(
+                    **state.tool_call_args()
+                )
+            except RunInterrupted as interrupted:
+                state.interrupt_tools(interrupted.reason)
+                break
+            state.add_tool_results(partial_response)
+
+        yield {"response": state.response()}
+
+    async def run(
         self,
         agent: Agent,
         messages: List,
@@ -238,6 +1506,11 @@ class Swarm:
         debug: bool = False,
         max_turns: int = float("inf"),
         execute_tools: bool = True,
+        stream_arguments: bool = False,
+        cancel: CancellationToken = None,
+        turn_timeout: float = None,
+        tool_timeout: float = None,
+        run_id: str = None,
     ) -> Response:
         if stream:
             return self.run_and_stream(
@@ -248,45 +1521,138 @@ class Swarm:
                 debug=debug,
                 max_turns=max_turns,
                 execute_tools=execute_tools,
+                stream_arguments=stream_arguments,
+                cancel=cancel,
+                turn_timeout=turn_timeout,
+                tool_timeout=tool_timeout,
+                run_id=run_id,
             )
-        active_agent = agent
-        context_variables = copy.deepcopy(context_variables)
-        history = copy.deepcopy(messages)
-        init_len = len(messages)
-
-        while len(history) - init_len < max_turns and active_agent:
+        state = RunState(
+            self,
+            agent,
+            messages,
+            context_variables,
+            model_override,
+            debug,
+            max_turns,
+            execute_tools,
+            stream_arguments,
+            cancel,
+            turn_timeout,
+            tool_timeout,
+            run_id,
+        )
+        while state.next_turn():
+            try:
+                completion = await self.get_chat_completion(
+                    **state.completion_args(False)
+                )
+            except RunInterrupted as interrupted:
+                state.interrupt(interrupted.reason)
+                break
+            if not state.add_completion(completion):
+                break
 
-            # get completion with current history, agent
-            completion = self.get_chat_completion(
-                agent=active_agent,
-                history=history,
-                context_variables=context_variables,
-                model_override=model_override,
-                stream=stream,
-                debug=debug,
-            )
-            message = completion.choices[0].message
-            debug_print(debug, "Received completion:", message)
-            message.sender = active_agent.name
-            history.append(
-                json.loads(message.model_dump_json())
-            )  # to avoid OpenAI types (?)
-
-            if not message.tool_calls or not execute_tools:
-                debug_print(debug, "Ending turn.")
+            try:
+                partial_response = await self.handle_tool_calls(
+                    **state.tool_call_args()
+                )
+            except RunInterrupted as interrupted:
+                state.interrupt_tools(interrupted.reason)
                 break
+            state.add_tool_results(partial_response)
 
-            # handle function calls, updating context_variables, and switching agents
-            partial_response = self.handle_tool_calls(
-                message.tool_calls, active_agent.functions, context_variables, debug
+        return state.response()
+
+    async def resume(self, run_id: str, agents, **run_kwargs) -> Response:
+        """Like `Swarm.resume`, awaiting tools and the run."""
+        checkpoint, agent, pending = self.load_resume(run_id, agents, run_kwargs)
+        finished = self.finished_response(checkpoint, agent, pending)
+        if finished is not None:
+            return finished
+        messages = checkpoint.messages
+        context_variables = checkpoint.context_variables
+        if pending:
+            partial_response = await self.handle_tool_calls(
+                pending,
+                agent.functions,
+                context_variables,
+                run_kwargs.get("debug", False),
+                parallel=agent.parallel_tool_calls,
+                partial=True,
             )
-            history.extend(partial_response.messages)
+            messages = messages + partial_response.messages
             context_variables.update(partial_response.context_variables)
-            if partial_response.agent:
-                active_agent = partial_response.agent
-
-        return Response(
-            messages=history[init_len:],
-            agent=active_agent,
+            agent = partial_response.agent or agent
+        response = await self.run(
+            agent=agent,
+            messages=messages,
             context_variables=context_variables,
+            run_id=run_id,
+            **run_kwargs,
         )
+        response.messages = messages[checkpoint.start:] + response.messages
+        return response
+
+    async def run_many(
+        self,
+        agent: Agent,
+        conversations: Iterable,
+        max_concurrency: int = 8,
+        rate_limit: RateLimiter = None,
+        max_retries: int = 3,
+        ordered: bool = False,
+        return_exceptions: bool = False,
+        **run_kwargs,
+    ):
+        """
+        Async version of `Swarm.run_many`: runs at most `max_concurrency`
+        conversations at once on the event loop, and is consumed with
+        `async for index, response in client.run_many(...)`.
+        """
+        worker = copy.copy(self)
+        worker.rate_limiter = rate_limit or self.rate_limiter
+        worker.max_retries = max_retries
+        run_kwargs.pop("stream", None)
+
+        conversations = enumerate(conversations)
+        pending = {}
+        finished = {}
+        next_index = 0
+
+        def submit_next() -> None:
+            for index, conversation in conversations:
+                kwargs = _conversation_kwargs(conversation, run_kwargs)
+                kwargs.setdefault("agent", agent)
+                pending[asyncio.ensure_future(worker.run(**kwargs))] = index
+                return
+
+        for _ in range(max_concurrency):
+            submit_next()
+
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for index, task in sorted(
+                    ((pending.pop(task), task) for task in done),
+                    key=lambda item: item[0],
+                ):
+                    submit_next()
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        if not return_exceptions:
+                            raise
+                        result = e
+                    if not ordered:
+                        yield index, result
+                        continue
+                    finished[index] = result
+                    while next_index in finished:
+                        yield next_index, finished.pop(next_index)
+                        next_index += 1
+        finally:
+            for task in pending:
+                task.cancel()
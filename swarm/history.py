@@ -0,0 +1,43 @@
+from collections.abc import Sequence
+from itertools import chain
+from typing import List
+
+
+class History(Sequence):
+    """
+    Conversation history for a single run, built without copying the
+    caller's messages.
+
+    The messages passed in are kept as a shared, read-only prefix. Messages
+    produced during the run are appended to `new_messages`, which is all that
+    ends up in `Response.messages`. Resending a growing transcript every turn
+    (as `run_demo_loop` does) therefore costs nothing per message already
+    seen, instead of a deep copy of the whole transcript.
+    """
+
+    __slots__ = ("prefix", "new_messages")
+
+    def __init__(self, messages: Sequence):
+        self.prefix = messages
+        self.new_messages: List = []
+
+    def __len__(self) -> int:
+        return len(self.prefix) + len(self.new_messages)
+
+    def __iter__(self):
+        return chain(self.prefix, self.new_messages)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if 0 <= index < len(self.prefix):
+            return self.prefix[index]
+        return self.new_messages[index - len(self.prefix)]
+
+    def append(self, message: dict) -> None:
+        self.new_messages.append(message)
+
+    def extend(self, messages) -> None:
+        self.new_messages.extend(messages)
@@ -0,0 +1,182 @@
+import json
+import re
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Tuple, Union
+
+from .types import Agent, Result
+from .util import compile_tools
+
+
+def transfer_name(agent_name: str) -> str:
+    """The name of the transfer function to an agent: "Sales Agent" -> "transfer_to_sales_agent"."""
+    return "transfer_to_" + (re.sub(r"[^0-9a-zA-Z]+", "_", agent_name).strip("_").lower() or "agent")
+
+
+def make_transfer(target: Agent, description: str = None):
+    """
+    Builds the function that hands off to `target`. Its result is created
+    once and returned on every call, so a handoff costs no serialization.
+    """
+    result = Result(value=json.dumps({"assistant": target.name}), agent=target)
+
+    def transfer():
+        return result
+
+    transfer.__name__ = transfer_name(target.name)
+    transfer.__doc__ = description or f"Transfer the conversation to {target.name}."
+    transfer.handoff_target = target.name
+    return transfer
+
+
+class AgentRegistry(Mapping):
+    """
+    Agents by name, plus the handoffs between them.
+
+    Declare each agent with the agents it can hand off to, then `build()`
+    once at startup: it checks the graph, gives every agent a generated
+    `transfer_to_<name>` function per handoff and compiles each agent's tool
+    schemas, so nothing is resolved or serialized at run time.
+
+        registry = AgentRegistry()
+        registry.add(triage, handoffs=[sales, refunds])
+        registry.add(sales, handoffs=[triage])
+        registry.add(refunds, handoffs=[triage])
+        registry.build(entry=triage)
+
+    The registry is a read-only mapping of name to agent, e.g. for
+    `Swarm.resume(run_id, agents=registry)`.
+    """
+
+    def __init__(self):
+        self._agents: Dict[str, Agent] = {}
+        self._handoffs: Dict[str, List[Tuple[str, str]]] = {}
+
+    def __getitem__(self, name: str) -> Agent:
+        return self._agents[name]
+
+    def __iter__(self):
+        return iter(self._agents)
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def add(
+        self,
+        agent: Agent,
+        handoffs: Iterable[Union[Agent, str]] = (),
+        descriptions: Dict[str, str] = None,
+    ) -> Agent:
+        """
+        Registers an agent and the agents (or agent names) it can hand off to.
+        `descriptions` optionally maps a target name to the docstring of its
+        transfer function, which the model sees as the tool description.
+        """
+        if agent.name in self._agents and self._agents[agent.name] is not agent:
+            raise ValueError(f"Another agent is already registered as {agent.name!r}")
+        descriptions = descriptions or {}
+        self._agents[agent.name] = agent
+        self._handoffs[agent.name] = [
+            (name, descriptions.get(name))
+            for name in (
+                target.name if isinstance(target, Agent) else target
+                for target in handoffs
+            )
+        ]
+        return agent
+
+    @property
+    def graph(self) -> Dict[str, Tuple[str, ...]]:
+        """Agent name -> names of the agents it hands off to."""
+        return {
+            name: tuple(target for target, _ in handoffs)
+            for name, handoffs in self._handoffs.items()
+        }
+
+    def reachable(self, entry: str) -> set:
+        """Names of the agents a conversation starting at `entry` can reach."""
+        graph = self.graph
+        seen = {entry}
+        stack = [entry]
+        while stack:
+            for target in graph.get(stack.pop(), ()):
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return seen
+
+    def cycles(self) -> List[List[str]]:
+        """Handoff cycles, each as the list of agent names along it."""
+        graph = self.graph
+        state = {}  # name -> 1 while on the current path, 2 when done
+        path = []
+        found = []
+
+        def visit(name):
+            state[name] = 1
+            path.append(name)
+            for target in graph.get(name, ()):
+                if state.get(target) == 1:
+                    found.append(path[path.index(target):] + [target])
+                elif target not in state:
+                    visit(target)
+            path.pop()
+            state[name] = 2
+
+        for name in graph:
+            if name not in state:
+                visit(name)
+        return found
+
+    def validate(self, entry: Union[Agent, str] = None, allow_cycles: bool = True) -> None:
+        """
+        Raises ValueError for a handoff to an unregistered agent, an agent
+        handing off to itself, an agent not reachable from `entry` (the first
+        agent added by default), or any cycle when `allow_cycles` is False.
+        Cycles are allowed by default, since agents usually hand back to a
+        triage agent.
+        """
+        if not self._agents:
+            raise ValueError("No agents registered")
+        problems = []
+        for name, targets in self.graph.items():
+            for target in targets:
+                if target not in self._agents:
+                    problems.append(f"{name!r} hands off to unknown agent {target!r}")
+                elif target == name:
+                    problems.append(f"{name!r} hands off to itself")
+        entry = entry.name if isinstance(entry, Agent) else entry
+        entry = entry or next(iter(self._agents))
+        if entry not in self._agents:
+            problems.append(f"Entry agent {entry!r} is not registered")
+        else:
+            reachable = self.reachable(entry)
+            unreachable = [name for name in self._agents if name not in reachable]
+            if unreachable:
+                problems.append(f"Unreachable from {entry!r}: {', '.join(map(repr, unreachable))}")
+        if not allow_cycles:
+            for cycle in self.cycles():
+                problems.append("Handoff cycle: " + " -> ".join(map(repr, cycle)))
+        if problems:
+            raise ValueError("Invalid agent graph:\n  " + "\n  ".join(problems))
+
+    def build(self, entry: Union[Agent, str] = None, allow_cycles: bool = True) -> "AgentRegistry":
+        """
+        Validates the graph, then sets each agent's transfer functions and
+        compiles its tools. Building again replaces the transfer functions
+        generated before, so agents can be re-declared and rebuilt.
+        """
+        self.validate(entry, allow_cycles)
+        transfers = {}  # (target, description) -> transfer function, shared by sources
+        for name, agent in self._agents.items():
+            functions = [
+                func
+                for func in agent.functions
+                if getattr(func, "handoff_target", None) is None
+            ]
+            for handoff in self._handoffs[name]:
+                if handoff not in transfers:
+                    transfers[handoff] = make_transfer(self._agents[handoff[0]], handoff[1])
+                functions.append(transfers[handoff])
+            agent.functions = functions
+            compile_tools(agent.functions)
+        return self
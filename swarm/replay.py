@@ -0,0 +1,298 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import List, Optional
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from .util import request_hash
+
+# per-request client options, not part of the recorded request
+REQUEST_OPTIONS = ("timeout", "extra_headers", "extra_query", "extra_body")
+
+
+def _request(create_params: dict) -> dict:
+    return {k: v for k, v in create_params.items() if k not in REQUEST_OPTIONS}
+
+
+class ReplayMismatch(LookupError):
+    """
+    A request that has no recorded completion in the cassette.
+
+    Attributes:
+        key (str): The request hash.
+        request (dict): The request parameters.
+        closest (dict): The most similar recorded request, if any.
+        difference (str): Where the request first differs from `closest`.
+    """
+
+    def __init__(self, key: str, request: dict, closest: dict = None, difference: str = None):
+        self.key = key
+        self.request = request
+        self.closest = closest
+        self.difference = difference
+        message = f"No recorded completion for request {key[:12]}"
+        if difference:
+            message += f"; closest recording differs at {difference}"
+        super().__init__(message)
+
+
+def _short(value, limit: int = 80) -> str:
+    text = json.dumps(value, default=str)
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def first_difference(a, b, path: str = "request") -> Optional[str]:
+    """Describes the first place two JSON-like values differ, or None."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in sorted(set(a) | set(b), key=str):
+            if key not in b:
+                return f"{path}.{key}: {_short(a[key])} (not recorded)"
+            if key not in a:
+                return f"{path}.{key}: missing, recorded {_short(b[key])}"
+            difference = first_difference(a[key], b[key], f"{path}.{key}")
+            if difference:
+                return difference
+        return None
+    if isinstance(a, list) and isinstance(b, list):
+        for i, (x, y) in enumerate(zip(a, b)):
+            difference = first_difference(x, y, f"{path}[{i}]")
+            if difference:
+                return difference
+        if len(a) != len(b):
+            return f"{path}: {len(a)} items, recorded {len(b)}"
+        return None
+    if a != b:
+        return f"{path}: {_short(a)}, recorded {_short(b)}"
+    return None
+
+
+def _canonical(create_params: dict) -> dict:
+    # the request as it is hashed, so recorded and live requests compare equal
+    return json.loads(json.dumps(create_params, default=str))
+
+
+class Cassette:
+    """
+    Recorded completions in a JSON Lines file, one line per request:
+    `{"key", "stream", "request", "response"}`, where `response` is a
+    ChatCompletion, or the list of chunks of a streamed completion.
+
+    Lines are indexed by request hash on load. A request recorded several
+    times replays its completions in recorded order, then keeps returning
+    the last one.
+
+    Attributes:
+        path (str): The cassette file; created on first record.
+        store_requests (bool): Keep request parameters in the file, for
+            mismatch reports. Without them, only hashes are stored.
+    """
+
+    def __init__(self, path: str, store_requests: bool = True):
+        self.path = path
+        self.store_requests = store_requests
+        self._entries = defaultdict(list)
+        self._cursors = defaultdict(int)
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]].append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def record(self, key: str, request: dict, stream: bool, response) -> None:
+        entry = {"key": key, "stream": stream, "response": response}
+        if self.store_requests:
+            entry["request"] = _canonical(request)
+        line = json.dumps(entry, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            self._entries[key].append(entry)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def play(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            index = min(self._cursors[key], len(entries) - 1)
+            self._cursors[key] += 1
+            return entries[index]
+
+    def rewind(self) -> None:
+        with self._lock:
+            self._cursors.clear()
+
+    def mismatch(self, key: str, request: dict) -> ReplayMismatch:
+        """Builds the error for an unrecorded request, finding the closest recording."""
+        request = _canonical(request)
+        messages = request.get("messages", [])
+        closest, best = None, (-1, False)
+        for entries in self._entries.values():
+            recorded = entries[0].get("request")
+            if recorded is None:
+                continue
+            shared = 0
+            for mine, theirs in zip(messages, recorded.get("messages", [])):
+                if mine != theirs:
+                    break
+                shared += 1
+            score = (shared, recorded.get("model") == request.get("model"))
+            if score > best:
+                closest, best = recorded, score
+        difference = first_difference(request, closest) if closest else None
+        return ReplayMismatch(key, request, closest, difference)
+
+
+class _Completions:
+    def __init__(self, create):
+        self.create = create
+
+
+class _Chat:
+    def __init__(self, create):
+        self.completions = _Completions(create)
+
+
+class ReplayStream:
+    """Replayed chunks of a streamed completion, iterable sync or async."""
+
+    def __init__(self, chunks: List[ChatCompletionChunk]):
+        self._chunks = iter(chunks)
+
+    def __iter__(self):
+        return self._chunks
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    def close(self) -> None:
+        self._chunks = iter(())
+
+
+class ReplayClient:
+    """
+    Stands in for `OpenAI()`, returning completions from a cassette instead
+    of calling the API: `Swarm(client=ReplayClient("tests/cassette.jsonl"))`.
+
+    Requests are matched by `request_hash`. A request with no recording
+    raises `ReplayMismatch`, which is also kept in `mismatches`.
+    """
+
+    def __init__(self, cassette):
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+        self.mismatches: List[ReplayMismatch] = []
+        self._lock = threading.Lock()
+        self.chat = _Chat(self.create)
+
+    def replay(self, create_params: dict):
+        key = request_hash(create_params)
+        entry = self.cassette.play(key)
+        if entry is None:
+            error = self.cassette.mismatch(key, create_params)
+            with self._lock:
+                self.mismatches.append(error)
+            raise error
+        if entry["stream"]:
+            return ReplayStream(
+                [ChatCompletionChunk.model_validate(chunk) for chunk in entry["response"]]
+            )
+        return ChatCompletion.model_validate(entry["response"])
+
+    def create(self, **create_params):
+        return self.replay(_request(create_params))
+
+    def report(self) -> str:
+        """One line per unmatched request, for test failure messages."""
+        return "\n".join(str(error) for error in self.mismatches)
+
+
+class AsyncReplayClient(ReplayClient):
+    """`ReplayClient` for `AsyncSwarm`."""
+
+    async def create(self, **create_params):
+        return self.replay(_request(create_params))
+
+
+def _dump(model) -> dict:
+    return model.model_dump(mode="json", exclude_unset=True)
+
+
+class _RecordingStream:
+    def __init__(self, stream, on_done):
+        self.stream = stream
+        self.on_done = on_done
+        self.chunks = []
+
+    def __iter__(self):
+        for chunk in self.stream:
+            self.chunks.append(_dump(chunk))
+            yield chunk
+        self.on_done(self.chunks)
+
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            self.chunks.append(_dump(chunk))
+            yield chunk
+        self.on_done(self.chunks)
+
+    def close(self):
+        close = getattr(self.stream, "close", None)
+        return close() if close else None
+
+
+class RecordingClient:
+    """
+    Wraps a real client and records every completion it returns into a
+    cassette, for later replay with `ReplayClient`. Streamed completions are
+    recorded once fully consumed.
+    """
+
+    def __init__(self, client, cassette, store_requests: bool = True):
+        self.client = client
+        self.cassette = (
+            cassette
+            if isinstance(cassette, Cassette)
+            else Cassette(cassette, store_requests)
+        )
+        self.chat = _Chat(self.create)
+
+    def record(self, create_params: dict, completion):
+        key = request_hash(create_params)
+        if create_params.get("stream"):
+            return _RecordingStream(
+                completion,
+                lambda chunks: self.cassette.record(key, create_params, True, chunks),
+            )
+        self.cassette.record(key, create_params, False, _dump(completion))
+        return completion
+
+    def create(self, **create_params):
+        return self.record(
+            _request(create_params),
+            self.client.chat.completions.create(**create_params),
+        )
+
+
+class AsyncRecordingClient(RecordingClient):
+    """`RecordingClient` for `AsyncSwarm`, wrapping an `AsyncOpenAI` client."""
+
+    async def create(self, **create_params):
+        return self.record(
+            _request(create_params),
+            await self.client.chat.completions.create(**create_params),
+        )
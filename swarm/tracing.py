@@ -0,0 +1,125 @@
+import json
+import threading
+import time
+import uuid
+
+
+class Tracer:
+    """
+    Hooks called during a run. Every hook is a no-op; subclass and override
+    the ones you need. Durations are in seconds, measured with a monotonic
+    clock, and `run_id` groups the calls of a single run.
+
+    Tool hooks may be called from worker threads when tool calls run
+    concurrently, so implementations must be thread-safe.
+    """
+
+    def on_turn_start(self, run_id: str, turn: int, agent: str, message_count: int) -> None:
+        pass
+
+    def on_completion(self, run_id: str, turn: int, agent: str, model: str, duration: float, usage: dict) -> None:
+        pass
+
+    def on_tool_start(self, run_id: str, turn: int, agent: str, name: str, arguments: dict) -> None:
+        pass
+
+    def on_tool_end(self, run_id: str, turn: int, agent: str, name: str, duration: float, error: Exception = None) -> None:
+        pass
+
+    def on_handoff(self, run_id: str, turn: int, from_agent: str, to_agent: str) -> None:
+        pass
+
+    def on_turn_end(self, run_id: str, turn: int, agent: str, duration: float, message_count: int) -> None:
+        pass
+
+
+class Trace:
+    """A tracer bound to a single run: numbers its turns and times them."""
+
+    __slots__ = ("tracer", "run_id", "turn", "turn_started", "agent")
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+        self.run_id = uuid.uuid4().hex
+        self.turn = 0
+        self.turn_started = 0.0
+        self.agent = None
+
+    def turn_start(self, agent, history) -> None:
+        self.turn += 1
+        self.turn_started = time.perf_counter()
+        self.agent = agent.name
+        self.tracer.on_turn_start(self.run_id, self.turn, agent.name, len(history))
+
+    def completion(self, agent, model: str, started: float, usage) -> None:
+        self.tracer.on_completion(
+            self.run_id,
+            self.turn,
+            agent.name,
+            model,
+            time.perf_counter() - started,
+            usage.model_dump() if usage is not None else None,
+        )
+
+    def tool_start(self, name: str, args: dict) -> None:
+        self.tracer.on_tool_start(self.run_id, self.turn, self.agent, name, args)
+
+    def tool_end(self, name: str, duration: float, error: Exception = None) -> None:
+        self.tracer.on_tool_end(self.run_id, self.turn, self.agent, name, duration, error)
+
+    def handoff(self, from_agent, to_agent) -> None:
+        self.tracer.on_handoff(self.run_id, self.turn, from_agent.name, to_agent.name)
+
+    def turn_end(self, history) -> None:
+        self.tracer.on_turn_end(
+            self.run_id,
+            self.turn,
+            self.agent,
+            time.perf_counter() - self.turn_started,
+            len(history),
+        )
+
+
+class JSONLTracer(Tracer):
+    """
+    Writes one JSON object per line for every completion, tool call, handoff
+    and turn, so slow tools and agents can be found with e.g. `jq` or pandas.
+
+    Each span has `span`, `run_id`, `turn`, `agent`, a wall-clock `start`
+    (Unix time) and a `duration`, plus span-specific fields.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, span: str, duration: float, **fields) -> None:
+        record = {"span": span, "start": time.time() - duration, "duration": duration, **fields}
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def on_completion(self, run_id, turn, agent, model, duration, usage):
+        self.write("completion", duration, run_id=run_id, turn=turn, agent=agent, model=model, usage=usage)
+
+    def on_tool_end(self, run_id, turn, agent, name, duration, error=None):
+        self.write(
+            "tool",
+            duration,
+            run_id=run_id,
+            turn=turn,
+            agent=agent,
+            name=name,
+            error=repr(error) if error else None,
+        )
+
+    def on_handoff(self, run_id, turn, from_agent, to_agent):
+        self.write("handoff", 0.0, run_id=run_id, turn=turn, agent=from_agent, to_agent=to_agent)
+
+    def on_turn_end(self, run_id, turn, agent, duration, message_count):
+        self.write("turn", duration, run_id=run_id, turn=turn, agent=agent, message_count=message_count)
+
+    def close(self) -> None:
+        self._file.close()
@@ -0,0 +1,180 @@
+import asyncio
+import importlib.util
+import threading
+from typing import NamedTuple
+
+import httpx
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+
+# events emitted by httpcore when it opens a new connection
+_CONNECT_EVENTS = frozenset(
+    {"connection.connect_tcp.complete", "connection.connect_unix_socket.complete"}
+)
+
+
+class TransportConfig(NamedTuple):
+    """
+    Connection pool settings of a shared HTTP client.
+
+    Attributes:
+        max_connections (int): Open connections across all hosts.
+        max_keepalive_connections (int): Idle connections kept for reuse.
+        keepalive_expiry (float): Seconds an idle connection is kept.
+        http2 (bool): Multiplex requests over HTTP/2 connections. None enables
+            it when the optional `h2` package is installed.
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = None
+
+    def resolved(self) -> "TransportConfig":
+        if self.http2 is not None:
+            return self
+        return self._replace(http2=importlib.util.find_spec("h2") is not None)
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+class TransportStats:
+    """
+    Request and connection counters of a shared client. Every request either
+    opens a new connection or reuses a pooled one, so
+    `reused = requests - connections`.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def reused(self) -> int:
+        return self.requests - self.connections
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "connections": self.connections,
+            "reused": self.reused,
+        }
+
+    def _request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def _connection(self, event: str) -> None:
+        if event in _CONNECT_EVENTS:
+            with self._lock:
+                self.connections += 1
+
+
+def _counting_hook(stats: TransportStats):
+    # a request event hook rather than a wrapped transport, so httpx still
+    # mounts the proxies configured in the environment
+    def on_request(request: httpx.Request) -> None:
+        stats._request()
+        trace = request.extensions.get("trace")
+
+        def on_event(event, info):
+            stats._connection(event)
+            if trace:
+                trace(event, info)
+
+        request.extensions["trace"] = on_event
+
+    return on_request
+
+
+def _async_counting_hook(stats: TransportStats):
+    async def on_request(request: httpx.Request) -> None:
+        stats._request()
+        trace = request.extensions.get("trace")
+
+        async def on_event(event, info):
+            stats._connection(event)
+            if trace:
+                await trace(event, info)
+
+        request.extensions["trace"] = on_event
+
+    return on_request
+
+
+_lock = threading.Lock()
+# (kind, event loop, config) -> (client, stats)
+_clients = {}
+
+
+def _shared(kind: str, loop, config: TransportConfig):
+    key = (kind, loop, config)
+    with _lock:
+        for stale in [k for k in _clients if k[1] is not None and k[1].is_closed()]:
+            del _clients[stale]
+        entry = _clients.get(key)
+        if entry is None or entry[0].is_closed:
+            stats = TransportStats()
+            if kind == "sync":
+                client = DefaultHttpxClient(
+                    limits=config.limits(),
+                    http2=config.http2,
+                    event_hooks={"request": [_counting_hook(stats)]},
+                )
+            else:
+                client = DefaultAsyncHttpxClient(
+                    limits=config.limits(),
+                    http2=config.http2,
+                    event_hooks={"request": [_async_counting_hook(stats)]},
+                )
+            entry = _clients[key] = (client, stats)
+        return entry[0]
+
+
+def shared_http_client(**config) -> httpx.Client:
+    """
+    Returns the process-wide `httpx.Client` for the given `TransportConfig`
+    settings, creating it on first use. Pass it to `OpenAI(http_client=...)`
+    so every client in the process reuses the same connections and TLS
+    sessions. `Swarm()` does this by default.
+    """
+    return _shared("sync", None, TransportConfig(**config).resolved())
+
+
+def shared_async_http_client(**config) -> httpx.AsyncClient:
+    """
+    Async counterpart of `shared_http_client`. Connections belong to an event
+    loop, so one client is shared per running loop (or a single one when
+    called outside a loop).
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    return _shared("async", loop, TransportConfig(**config).resolved())
+
+
+def transport_stats() -> dict:
+    """Connection reuse counters of every shared client, summed."""
+    total = {"requests": 0, "connections": 0, "reused": 0}
+    with _lock:
+        entries = list(_clients.values())
+    for _, stats in entries:
+        for name, value in stats.as_dict().items():
+            total[name] += value
+    return total
+
+
+def close_shared_clients() -> None:
+    """Closes the shared sync clients and forgets all shared clients."""
+    with _lock:
+        entries = list(_clients.items())
+        _clients.clear()
+    for (kind, _, _), (client, _) in entries:
+        if kind == "sync":
+            client.close()
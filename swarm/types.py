@@ -1,8 +1,3 @@
-from openai.types.chat import ChatCompletionMessage
-from openai.types.chat.chat_completion_message_tool_call import (
-    ChatCompletionMessageToolCall,
-    Function,
-)
 from typing import List, Callable, Union, Optional
 
 # Third-party imports
@@ -10,6 +5,23 @@ from pydantic import BaseModel
 
 AgentFunction = Callable[[], Union[str, "Agent", dict]]
 
+# OpenAI types re-exported from here, imported on first access since
+# `openai.types` is the bulk of the package's import time
+_OPENAI_TYPES = {
+    "ChatCompletion": "openai.types.chat",
+    "ChatCompletionMessage": "openai.types.chat",
+    "ChatCompletionMessageToolCall": "openai.types.chat.chat_completion_message_tool_call",
+    "Function": "openai.types.chat.chat_completion_message_tool_call",
+}
+
+
+def __getattr__(name):
+    if name not in _OPENAI_TYPES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(__import__(_OPENAI_TYPES[name], fromlist=(name,)), name)
+    globals()[name] = value
+    return value
+
 
 class Agent(BaseModel):
     name: str = "Agent"
@@ -18,12 +30,49 @@ class Agent(BaseModel):
     functions: List[AgentFunction] = []
     tool_choice: str = None
     parallel_tool_calls: bool = True
+    # reuse rendered callable instructions while the context variables they
+    # read are unchanged
+    cache_instructions: bool = False
 
 
 class Response(BaseModel):
     messages: List = []
     agent: Optional[Agent] = None
     context_variables: dict = {}
+    # why the run stopped early ("cancelled", "deadline", "turn_timeout",
+    # "tool_timeout"), or None if it finished
+    stop_reason: Optional[str] = None
+
+
+class PartialResponse:
+    """
+    The messages, handoff and context updates from one turn's tool calls.
+
+    Built on every tool-calling turn, so it is a plain object with the
+    fields of `Response` and no validation. `to_response()` (or
+    `model_dump()`) gives the pydantic view.
+    """
+
+    __slots__ = ("messages", "agent", "context_variables")
+
+    def __init__(self, messages: List = None, agent: Agent = None, context_variables: dict = None):
+        self.messages = [] if messages is None else messages
+        self.agent = agent
+        self.context_variables = {} if context_variables is None else context_variables
+
+    def to_response(self) -> Response:
+        return Response(
+            messages=self.messages,
+            agent=self.agent,
+            context_variables=self.context_variables,
+        )
+
+    def model_dump(self, **kwargs) -> dict:
+        return self.to_response().model_dump(**kwargs)
+
+    def __repr__(self) -> str:
+        agent = self.agent.name if self.agent else None
+        return f"PartialResponse(messages={self.messages!r}, agent={agent!r}, context_variables={self.context_variables!r})"
 
 
 class Result(BaseModel):
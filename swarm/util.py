@@ -1,5 +1,14 @@
+import functools
+import hashlib
 import inspect
+import json
+import threading
+import weakref
+from collections import defaultdict
 from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+
+__CTX_VARS_NAME__ = "context_variables"
 
 
 def debug_print(debug: bool, *args: str) -> None:
@@ -22,10 +31,212 @@ def merge_chunk(final_response: dict, delta: dict) -> None:
     delta.pop("role", None)
     merge_fields(final_response, delta)
 
-    tool_calls = delta.get("tool_calls")
-    if tool_calls and len(tool_calls) > 0:
-        index = tool_calls[0].pop("index")
-        merge_fields(final_response["tool_calls"][index], tool_calls[0])
+    # a delta may carry fragments of several tool calls
+    for tool_call in delta.get("tool_calls") or ():
+        index = tool_call.pop("index")
+        merge_fields(final_response["tool_calls"][index], tool_call)
+
+
+def request_hash(create_params: dict) -> str:
+    """
+    Stable hash of a chat completion request: identical model, messages,
+    tools and options always give the same key, regardless of dict order.
+    """
+    canonical = json.dumps(
+        create_params, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def delta_to_dict(delta) -> dict:
+    """
+    Converts a streamed ChoiceDelta into the plain dict yielded by
+    `run_and_stream`, reading the typed fields directly instead of
+    serializing to JSON and parsing it back.
+    """
+    function_call = delta.function_call
+    tool_calls = delta.tool_calls
+    return {
+        "content": delta.content,
+        "function_call": (
+            None
+            if function_call is None
+            else {"arguments": function_call.arguments, "name": function_call.name}
+        ),
+        "refusal": getattr(delta, "refusal", None),
+        "role": delta.role,
+        "tool_calls": (
+            None
+            if tool_calls is None
+            else [
+                {
+                    "index": tool_call.index,
+                    "id": tool_call.id,
+                    "function": (
+                        None
+                        if tool_call.function is None
+                        else {
+                            "arguments": tool_call.function.arguments,
+                            "name": tool_call.function.name,
+                        }
+                    ),
+                    "type": tool_call.type,
+                }
+                for tool_call in tool_calls
+            ]
+        ),
+    }
+
+
+class ArgumentsParser:
+    """
+    Scans the streamed JSON arguments of one tool call as fragments arrive.
+
+    `feed` returns the arguments parsed so far each time a top-level field
+    is complete, so a value is never seen half-written (e.g. `{"user_id": 42}`
+    while later arguments are still streaming). `done` is set once the
+    arguments object closes. Every character is scanned once, and the text
+    is only parsed when a field completes.
+    """
+
+    __slots__ = ("parts", "length", "depth", "in_string", "escape", "done")
+
+    def __init__(self):
+        self.parts = []
+        self.length = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.done = False
+
+    def feed(self, fragment: str) -> Optional[dict]:
+        if self.done:
+            return None
+        start = self.length
+        self.parts.append(fragment)
+        self.length += len(fragment)
+        boundary = None
+        for offset, char in enumerate(fragment):
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    boundary = start + offset + 1
+                    self.done = True
+                    break
+            elif char == "," and self.depth == 1:
+                boundary = start + offset
+        if boundary is None:
+            return None
+        text = "".join(self.parts)[:boundary]
+        try:
+            value = json.loads(text if self.done else text + "}")
+        except ValueError:
+            return None
+        return value if isinstance(value, dict) else None
+
+
+class StreamedMessage:
+    """
+    Accumulates streamed ChoiceDeltas into an assistant message.
+
+    Fragments are collected in lists and joined once in `to_dict`, rather
+    than growing strings with `+=` on every token. With `parse_arguments`,
+    tool-call arguments are also parsed as they stream, and each update is
+    queued in `updates` as a dict with the call's `index`, `id`, `name`,
+    parsed `arguments` so far and whether they are `done`.
+    """
+
+    def __init__(self, sender: str, parse_arguments: bool = False):
+        self.sender = sender
+        self.content = []
+        # index -> fragment lists, in order of first appearance
+        self.tool_calls = {}
+        self.parsers = {} if parse_arguments else None
+        self.updates = []
+
+    def add(self, delta) -> None:
+        if delta.content:
+            self.content.append(delta.content)
+        for tool_call in delta.tool_calls or ():
+            parts = self.tool_calls.get(tool_call.index)
+            if parts is None:
+                parts = self.tool_calls[tool_call.index] = {
+                    "id": [],
+                    "type": [],
+                    "name": [],
+                    "arguments": [],
+                }
+            if tool_call.id:
+                parts["id"].append(tool_call.id)
+            if tool_call.type:
+                parts["type"].append(tool_call.type)
+            function = tool_call.function
+            if function is not None:
+                if function.name:
+                    parts["name"].append(function.name)
+                if function.arguments:
+                    parts["arguments"].append(function.arguments)
+                    if self.parsers is not None:
+                        self.parse(tool_call.index, function.arguments)
+
+    def parse(self, index: int, fragment: str) -> None:
+        parser = self.parsers.get(index)
+        if parser is None:
+            parser = self.parsers[index] = ArgumentsParser()
+        arguments = parser.feed(fragment)
+        if arguments is not None:
+            parts = self.tool_calls[index]
+            self.updates.append(
+                {
+                    "index": index,
+                    "id": "".join(parts["id"]),
+                    "name": "".join(parts["name"]),
+                    "arguments": arguments,
+                    "done": parser.done,
+                }
+            )
+
+    def to_dict(self) -> dict:
+        tool_calls = [
+            {
+                "function": {
+                    "arguments": "".join(parts["arguments"]),
+                    "name": "".join(parts["name"]),
+                },
+                "id": "".join(parts["id"]),
+                "type": "".join(parts["type"]),
+            }
+            for parts in self.tool_calls.values()
+        ]
+        return {
+            "content": "".join(self.content),
+            "sender": self.sender,
+            "role": "assistant",
+            "function_call": None,
+            "tool_calls": tool_calls or None,
+        }
+
+
+def streaming_safe(func):
+    """
+    Marks an agent function as safe to start while the completion is still
+    streaming, as soon as its own arguments are complete. Use it for
+    functions whose effect doesn't depend on the rest of the model's output,
+    such as lookups.
+    """
+    func.streaming_safe = True
+    return func
 
 
 def function_to_json(func) -> dict:
@@ -85,3 +296,195 @@ def function_to_json(func) -> dict:
             },
         },
     }
+
+
+class CompiledTools(NamedTuple):
+    """
+    Tool definitions for a list of agent functions, ready for a request.
+
+    Attributes:
+        tools (list): JSON schemas with `context_variables` hidden from the model.
+        function_map (dict): Function name to callable.
+        context_aware (frozenset): Names of functions taking `context_variables`.
+        streaming_safe (frozenset): Names of functions marked `streaming_safe`.
+    """
+
+    tools: list
+    function_map: dict
+    context_aware: frozenset
+    streaming_safe: frozenset = frozenset()
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_tools(functions: tuple) -> CompiledTools:
+    tools = []
+    context_aware = set()
+    for func in functions:
+        tool = function_to_json(func)
+        # hide context_variables from model
+        params = tool["function"]["parameters"]
+        if __CTX_VARS_NAME__ in params["properties"]:
+            params["properties"].pop(__CTX_VARS_NAME__)
+            context_aware.add(func.__name__)
+        if __CTX_VARS_NAME__ in params["required"]:
+            params["required"].remove(__CTX_VARS_NAME__)
+        tools.append(tool)
+    return CompiledTools(
+        tools=tools,
+        function_map={f.__name__: f for f in functions},
+        context_aware=frozenset(context_aware),
+        streaming_safe=frozenset(
+            f.__name__ for f in functions if getattr(f, "streaming_safe", False)
+        ),
+    )
+
+
+def compile_tools(functions) -> CompiledTools:
+    """
+    Returns the CompiledTools for a list of agent functions, reusing the
+    previous result while the same function objects are passed in.
+
+    The cache is keyed on the functions themselves, so adding, removing or
+    replacing an entry of `Agent.functions` compiles a fresh set. The result
+    is shared between calls and must be treated as read-only.
+    """
+    functions = tuple(functions)
+    try:
+        return _compile_tools(functions)
+    except TypeError:  # unhashable callables can't be cached
+        return _compile_tools.__wrapped__(functions)
+
+
+class TrackingContext(defaultdict):
+    """
+    The context_variables mapping handed to instructions functions, recording
+    which keys they read. Looking at the mapping as a whole (iterating,
+    `keys()`, `items()`, printing, comparing, copying) sets `read_all`.
+    Printed and copied, it is the plain defaultdict instructions functions
+    got before.
+    """
+
+    def __init__(self, context_variables: dict):
+        super().__init__(str, context_variables)
+        self.keys_read = set()
+        self.read_all = False
+
+    def __getitem__(self, key):
+        self.keys_read.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.keys_read.add(key)
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        self.keys_read.add(key)
+        return super().__contains__(key)
+
+    def __iter__(self):
+        self.read_all = True
+        return super().__iter__()
+
+    def __len__(self):
+        self.read_all = True
+        return super().__len__()
+
+    def keys(self):
+        self.read_all = True
+        return super().keys()
+
+    def values(self):
+        self.read_all = True
+        return super().values()
+
+    def items(self):
+        self.read_all = True
+        return super().items()
+
+    def _plain(self) -> defaultdict:
+        self.read_all = True
+        return defaultdict(self.default_factory, dict.items(self))
+
+    def __repr__(self):
+        return repr(self._plain())
+
+    __str__ = __repr__
+
+    def __eq__(self, other):
+        self.read_all = True
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        self.read_all = True
+        return super().__ne__(other)
+
+    __hash__ = None
+
+    def copy(self):
+        return self._plain()
+
+    __copy__ = copy
+
+    def __reduce__(self):
+        # copy.deepcopy and pickle rebuild a plain defaultdict
+        return self._plain().__reduce__()
+
+
+_MISSING = object()
+
+
+class InstructionsCache:
+    """
+    Remembers rendered instructions per instructions function, keyed on the
+    values of the context variables it read. A cached prompt is reused as
+    long as every key it read still holds an equal value, so changing an
+    unrelated context variable doesn't re-render it.
+
+    Values are compared with `==` against the objects seen when rendering,
+    so mutating a context value in place is not detected; assign a new
+    value instead.
+    """
+
+    def __init__(self, maxsize: int = 8):
+        self.maxsize = maxsize
+        # function -> [(snapshot, instructions)], most recent first; a
+        # snapshot is ((key, value), ...) of the keys read, or a copy of the
+        # whole context if the function looked at all of it
+        self._entries = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _matches(snapshot, context_variables: dict) -> bool:
+        if isinstance(snapshot, dict):
+            return snapshot == context_variables
+        return all(
+            context_variables.get(key, _MISSING) == value for key, value in snapshot
+        )
+
+    def render(self, instructions: Callable, context_variables: dict) -> str:
+        try:
+            with self._lock:
+                entries = list(self._entries.get(instructions, ()))
+        except TypeError:  # not weak-referenceable, render every time
+            return instructions(defaultdict(str, context_variables))
+        for snapshot, rendered in entries:
+            if self._matches(snapshot, context_variables):
+                return rendered
+
+        context = TrackingContext(context_variables)
+        rendered = instructions(context)
+        if context.read_all:
+            snapshot = dict(context_variables)
+        else:
+            snapshot = tuple(
+                (key, context_variables.get(key, _MISSING))
+                for key in context.keys_read
+            )
+        with self._lock:
+            cached = self._entries.setdefault(instructions, [])
+            cached.insert(0, (snapshot, rendered))
+            del cached[self.maxsize:]
+        return rendered
+
+
+instructions_cache = InstructionsCache()
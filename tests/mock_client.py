@@ -1,7 +1,8 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from swarm.types import ChatCompletionMessage, ChatCompletionMessageToolCall, Function
 from openai import OpenAI
 from openai.types.chat.chat_completion import ChatCompletion, Choice
+from openai.types.chat.chat_completion_chunk import ChatCompletionChunk
 import json
 
 
@@ -41,6 +42,41 @@ def create_mock_response(message, function_calls=[], model="gpt-4o"):
     )
 
 
+def create_mock_stream(content="", function_calls=[], model="gpt-4o"):
+    """
+    Build the list of ChatCompletionChunk objects a streamed completion would
+    yield: one chunk per character of `content`, then one chunk per call.
+    """
+    deltas = [{"role": "assistant", "content": ""}]
+    deltas += [{"content": char} for char in content]
+    for index, call in enumerate(function_calls):
+        deltas.append(
+            {
+                "tool_calls": [
+                    {
+                        "index": index,
+                        "id": f"mock_tc_id_{index}",
+                        "type": "function",
+                        "function": {
+                            "name": call.get("name", ""),
+                            "arguments": json.dumps(call.get("args", {})),
+                        },
+                    }
+                ]
+            }
+        )
+    return [
+        ChatCompletionChunk(
+            id="mock_cc_id",
+            created=1234567890,
+            model=model,
+            object="chat.completion.chunk",
+            choices=[{"index": 0, "delta": delta}],
+        )
+        for delta in deltas
+    ]
+
+
 class MockOpenAIClient:
     def __init__(self):
         self.chat = MagicMock()
@@ -64,6 +100,27 @@ class MockOpenAIClient:
         self.chat.completions.create.assert_called_with(**kwargs)
 
 
+class MockAsyncStream:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MockAsyncOpenAIClient(MockOpenAIClient):
+    def __init__(self):
+        self.chat = MagicMock()
+        self.chat.completions = MagicMock()
+        self.chat.completions.create = AsyncMock()
+
+
 # Initialize the mock client
 client = MockOpenAIClient()
 
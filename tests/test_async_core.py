@@ -0,0 +1,258 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from swarm import AsyncSwarm, Agent
+from tests.mock_client import (
+    MockAsyncOpenAIClient,
+    MockAsyncStream,
+    create_mock_response,
+    create_mock_stream,
+)
+from unittest.mock import Mock
+
+DEFAULT_RESPONSE_CONTENT = "sample response content"
+
+
+@pytest.fixture
+def mock_async_openai_client():
+    m = MockAsyncOpenAIClient()
+    m.set_response(
+        create_mock_response({"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT})
+    )
+    return m
+
+
+def test_run_with_simple_message(mock_async_openai_client: MockAsyncOpenAIClient):
+    agent = Agent()
+    client = AsyncSwarm(client=mock_async_openai_client)
+    messages = [{"role": "user", "content": "Hello, how are you?"}]
+    response = asyncio.run(client.run(agent=agent, messages=messages))
+
+    assert response.messages[-1]["role"] == "assistant"
+    assert response.messages[-1]["content"] == DEFAULT_RESPONSE_CONTENT
+
+
+def test_async_tool_call_and_handoff(mock_async_openai_client: MockAsyncOpenAIClient):
+    get_weather_mock = Mock()
+
+    async def get_weather(location):
+        get_weather_mock(location=location)
+        return "It's sunny today."
+
+    def transfer_to_agent2():
+        return agent2
+
+    agent1 = Agent(name="Test Agent 1", functions=[get_weather, transfer_to_agent2])
+    agent2 = Agent(name="Test Agent 2")
+
+    mock_async_openai_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[
+                    {"name": "get_weather", "args": {"location": "San Francisco"}},
+                    {"name": "transfer_to_agent2"},
+                ],
+            ),
+            create_mock_response(
+                {"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT}
+            ),
+        ]
+    )
+
+    client = AsyncSwarm(client=mock_async_openai_client)
+    messages = [{"role": "user", "content": "Weather, then agent 2 please"}]
+    response = asyncio.run(client.run(agent=agent1, messages=messages))
+
+    get_weather_mock.assert_called_once_with(location="San Francisco")
+    assert response.messages[1]["content"] == "It's sunny today."
+    assert response.agent == agent2
+    assert response.messages[-1]["content"] == DEFAULT_RESPONSE_CONTENT
+
+
+def test_run_and_stream(mock_async_openai_client: MockAsyncOpenAIClient):
+    mock_async_openai_client.set_response(
+        MockAsyncStream(create_mock_stream(content=DEFAULT_RESPONSE_CONTENT))
+    )
+    client = AsyncSwarm(client=mock_async_openai_client)
+    messages = [{"role": "user", "content": "Hello, how are you?"}]
+
+    async def collect():
+        stream = await client.run(agent=Agent(), messages=messages, stream=True)
+        chunks, senders = [], []
+        async for chunk in stream:
+            chunks.append(chunk)
+            if "sender" in chunk:
+                senders.append(chunk["sender"])
+        return chunks, senders
+
+    chunks, senders = asyncio.run(collect())
+
+    assert chunks[0] == {"delim": "start"}
+    assert senders == ["Agent"]
+    assert chunks[-2] == {"delim": "end"}
+    response = chunks[-1]["response"]
+    assert response.messages[-1]["content"] == DEFAULT_RESPONSE_CONTENT
+    assert response.messages[-1]["tool_calls"] is None
+
+
+def test_concurrent_runs(mock_async_openai_client: MockAsyncOpenAIClient):
+    client = AsyncSwarm(client=mock_async_openai_client)
+
+    async def run_all():
+        return await asyncio.gather(
+            *(
+                client.run(
+                    agent=Agent(),
+                    messages=[{"role": "user", "content": f"Hello {i}"}],
+                )
+                for i in range(10)
+            )
+        )
+
+    responses = asyncio.run(run_all())
+
+    assert len(responses) == 10
+    assert all(
+        r.messages[-1]["content"] == DEFAULT_RESPONSE_CONTENT for r in responses
+    )
+
+
+def test_parallel_tool_calls(mock_async_openai_client: MockAsyncOpenAIClient):
+    started = []
+
+    async def slow_tool(name):
+        started.append(name)
+        while len(started) < 2:  # only finishes if both tools run at once
+            await asyncio.sleep(0.01)
+        return f"done {name}"
+
+    def sync_tool(name):
+        return f"sync {name}"
+
+    agent = Agent(functions=[slow_tool, sync_tool])
+    mock_async_openai_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[
+                    {"name": "slow_tool", "args": {"name": "a"}},
+                    {"name": "sync_tool", "args": {"name": "b"}},
+                    {"name": "slow_tool", "args": {"name": "c"}},
+                ],
+            ),
+            create_mock_response(
+                {"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT}
+            ),
+        ]
+    )
+
+    client = AsyncSwarm(client=mock_async_openai_client, max_tool_workers=2)
+    messages = [{"role": "user", "content": "Run the tools"}]
+    response = asyncio.run(
+        asyncio.wait_for(client.run(agent=agent, messages=messages), timeout=5)
+    )
+
+    assert [m["content"] for m in response.messages[1:4]] == [
+        "done a",
+        "sync b",
+        "done c",
+    ]
+
+
+def test_run_many(mock_async_openai_client: MockAsyncOpenAIClient):
+    async def echo(**create_params):
+        await asyncio.sleep(0.01 * (5 - len(create_params["messages"][-1]["content"])))
+        return create_mock_response(
+            {"role": "assistant", "content": create_params["messages"][-1]["content"]}
+        )
+
+    mock_async_openai_client.chat.completions.create.side_effect = echo
+    client = AsyncSwarm(client=mock_async_openai_client)
+    conversations = [[{"role": "user", "content": "x" * i}] for i in range(1, 5)]
+
+    async def collect(ordered):
+        return [
+            (index, response.messages[-1]["content"])
+            async for index, response in client.run_many(
+                Agent(), conversations, max_concurrency=4, ordered=ordered
+            )
+        ]
+
+    # shorter messages take longer, so completion order is reversed
+    assert asyncio.run(collect(ordered=False)) == [(3, "xxxx"), (2, "xxx"), (1, "xx"), (0, "x")]
+    assert asyncio.run(collect(ordered=True)) == [(0, "x"), (1, "xx"), (2, "xxx"), (3, "xxxx")]
+
+
+def test_sync_tool_does_not_block_the_loop():
+    released = threading.Event()
+
+    def wait_for_release():
+        # blocks its thread until the other conversation's tool has run
+        return "released" if released.wait(2) else "stalled"
+
+    async def release():
+        released.set()
+        return "done"
+
+    def run(function):
+        mock_client = MockAsyncOpenAIClient()
+        mock_client.set_sequential_responses(
+            [
+                create_mock_response(
+                    message={"role": "assistant", "content": ""},
+                    function_calls=[{"name": function.__name__}],
+                ),
+                create_mock_response(
+                    {"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT}
+                ),
+            ]
+        )
+        return AsyncSwarm(client=mock_client).run(
+            agent=Agent(functions=[function]),
+            messages=[{"role": "user", "content": "Hi"}],
+        )
+
+    async def run_both():
+        return await asyncio.gather(run(wait_for_release), run(release))
+
+    waiting, releasing = asyncio.run(run_both())
+
+    assert waiting.messages[1]["content"] == "released"
+    assert releasing.messages[1]["content"] == "done"
+
+
+def test_async_tools_gathered_without_tool_workers(
+    mock_async_openai_client: MockAsyncOpenAIClient,
+):
+    async def slow_tool(name):
+        await asyncio.sleep(0.3)
+        return f"done {name}"
+
+    mock_async_openai_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[
+                    {"name": "slow_tool", "args": {"name": "a"}},
+                    {"name": "slow_tool", "args": {"name": "b"}},
+                ],
+            ),
+            create_mock_response(
+                {"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT}
+            ),
+        ]
+    )
+    client = AsyncSwarm(client=mock_async_openai_client)
+    started = time.perf_counter()
+    response = asyncio.run(
+        client.run(
+            agent=Agent(functions=[slow_tool]),
+            messages=[{"role": "user", "content": "Run the tools"}],
+        )
+    )
+
+    assert time.perf_counter() - started < 0.5
+    assert [m["content"] for m in response.messages[1:3]] == ["done a", "done b"]
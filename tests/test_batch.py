@@ -0,0 +1,84 @@
+import httpx
+import openai
+import pytest
+from swarm import Swarm, Agent
+from swarm.batch import RateLimiter
+from tests.mock_client import MockOpenAIClient, create_mock_response
+
+
+def echo_responses(**create_params):
+    # answer each conversation with its own last user message
+    return create_mock_response(
+        {"role": "assistant", "content": create_params["messages"][-1]["content"]}
+    )
+
+
+def test_run_many_ordered():
+    mock_client = MockOpenAIClient()
+    mock_client.chat.completions.create.side_effect = echo_responses
+    client = Swarm(client=mock_client)
+    conversations = [[{"role": "user", "content": f"conversation {i}"}] for i in range(20)]
+    conversations.append(
+        {
+            "messages": [{"role": "user", "content": "with context"}],
+            "context_variables": {"user": "John"},
+        }
+    )
+
+    results = list(
+        client.run_many(Agent(), conversations, max_concurrency=4, ordered=True)
+    )
+
+    assert [index for index, _ in results] == list(range(21))
+    assert [r.messages[-1]["content"] for _, r in results[:20]] == [
+        f"conversation {i}" for i in range(20)
+    ]
+    assert results[-1][1].context_variables == {"user": "John"}
+
+
+def test_run_many_retries_transient_errors(monkeypatch):
+    monkeypatch.setattr("swarm.core.backoff_delay", lambda attempt, error: 0)
+    mock_client = MockOpenAIClient()
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    mock_client.set_sequential_responses(
+        [
+            openai.APIConnectionError(request=request),
+            create_mock_response({"role": "assistant", "content": "recovered"}),
+        ]
+    )
+    client = Swarm(client=mock_client)
+
+    [(index, response)] = client.run_many(
+        Agent(), [[{"role": "user", "content": "Hi"}]], max_retries=1
+    )
+
+    assert index == 0
+    assert response.messages[-1]["content"] == "recovered"
+
+
+def test_run_many_return_exceptions():
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses([ValueError("boom")])
+    client = Swarm(client=mock_client)
+    conversations = [[{"role": "user", "content": "Hi"}]]
+
+    [(_, error)] = client.run_many(Agent(), conversations, return_exceptions=True)
+    assert isinstance(error, ValueError)
+
+    mock_client.set_sequential_responses([ValueError("boom")])
+    with pytest.raises(ValueError):
+        list(client.run_many(Agent(), conversations))
+
+
+def test_rate_limiter_budget():
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=600)
+
+    assert limiter.reserve(100) == 0
+    assert limiter.reserve(100) == 0
+    # out of requests: a third one waits about half a minute
+    assert 25 < limiter.reserve(100) <= 30
+
+    limiter = RateLimiter(tokens_per_minute=600)
+    assert limiter.reserve(500) == 0
+    # 400 tokens short at 10 tokens per second
+    assert 35 < limiter.reserve(500) <= 40
@@ -0,0 +1,51 @@
+import time
+from swarm import Swarm, Agent
+from swarm.cache import MemoryCache, SQLiteCache
+from tests.mock_client import MockOpenAIClient, create_mock_response
+
+
+def test_memory_cache_lru_and_ttl():
+    cache = MemoryCache(maxsize=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 2}
+
+    cache = MemoryCache(ttl=0.01)
+    cache.set("a", "1")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_sqlite_cache(tmp_path):
+    path = str(tmp_path / "completions.db")
+    cache = SQLiteCache(path, maxsize=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.set("c", "3")
+    cache.close()
+
+    reopened = SQLiteCache(path, maxsize=2)
+    assert len(reopened) == 2
+    assert reopened.get("c") == "3"
+    assert reopened.get("a") is None
+
+
+def test_swarm_reuses_cached_completions(tmp_path):
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(
+        create_mock_response({"role": "assistant", "content": "cached content"})
+    )
+    cache = SQLiteCache(str(tmp_path / "completions.db"))
+    client = Swarm(client=mock_client, cache=cache)
+    messages = [{"role": "user", "content": "Hello"}]
+
+    first = client.run(agent=Agent(), messages=messages)
+    second = client.run(agent=Agent(), messages=messages)
+    other = client.run(agent=Agent(), messages=[{"role": "user", "content": "Bye"}])
+
+    assert mock_client.chat.completions.create.call_count == 2
+    assert first.messages == second.messages == other.messages
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 2}
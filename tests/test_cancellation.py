@@ -0,0 +1,345 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from openai import OpenAI, RateLimitError
+
+from swarm import AsyncSwarm, Swarm, Agent
+from swarm.cancellation import CancellationToken
+from swarm.util import streaming_safe
+from tests.mock_client import (
+    MockAsyncOpenAIClient,
+    MockOpenAIClient,
+    create_mock_response,
+    create_mock_stream,
+)
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+def tool_call_response(name):
+    return create_mock_response(
+        message={"role": "assistant", "content": ""},
+        function_calls=[{"name": name}],
+    )
+
+
+def test_cancelled_before_start():
+    mock_client = MockOpenAIClient()
+    token = CancellationToken()
+    token.cancel()
+
+    response = Swarm(client=mock_client).run(agent=Agent(), messages=MESSAGES, cancel=token)
+
+    assert response.stop_reason == "cancelled"
+    assert response.messages == []
+    mock_client.chat.completions.create.assert_not_called()
+
+
+def test_turn_timeout_bounds_the_request():
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(create_mock_response({"role": "assistant", "content": "ok"}))
+
+    response = Swarm(client=mock_client).run(agent=Agent(), messages=MESSAGES, turn_timeout=30)
+
+    assert response.stop_reason is None
+    assert 0 < mock_client.chat.completions.create.call_args.kwargs["timeout"] <= 30
+
+
+def test_tool_timeout_returns_partial_response():
+    release = threading.Event()
+
+    def slow_lookup():
+        release.wait(5)
+        return "late"
+
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(tool_call_response("slow_lookup"))
+    start = time.monotonic()
+    response = Swarm(client=mock_client).run(
+        agent=Agent(functions=[slow_lookup]), messages=MESSAGES, tool_timeout=0.1
+    )
+    release.set()
+
+    assert time.monotonic() - start < 2
+    assert response.stop_reason == "tool_timeout"
+    assert response.messages[0]["tool_calls"][0]["function"]["name"] == "slow_lookup"
+    assert response.messages[1]["role"] == "tool"
+    assert response.messages[1]["tool_call_id"] == "mock_tc_id"
+    assert response.messages[1]["content"] == "Error: interrupted (tool_timeout)."
+
+
+def test_tool_timeout_error_is_raised():
+    def lookup():
+        raise TimeoutError("upstream timed out")
+
+    for limits in ({"cancel": CancellationToken()}, {"tool_timeout": 5}):
+        mock_client = MockOpenAIClient()
+        mock_client.set_response(tool_call_response("lookup"))
+        with pytest.raises(TimeoutError, match="upstream timed out"):
+            Swarm(client=mock_client).run(
+                agent=Agent(functions=[lookup]), messages=MESSAGES, **limits
+            )
+
+
+def test_cancel_token_runs_tools_inline():
+    threads = []
+
+    def lookup():
+        threads.append(threading.current_thread())
+        return "found"
+
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses(
+        [tool_call_response("lookup"), create_mock_response({"role": "assistant", "content": "ok"})]
+    )
+    response = Swarm(client=mock_client).run(
+        agent=Agent(functions=[lookup]), messages=MESSAGES, cancel=CancellationToken()
+    )
+
+    assert response.stop_reason is None
+    assert threads == [threading.current_thread()]
+
+
+def test_tool_timeout_excludes_time_queued():
+    release = threading.Event()
+
+    def hung():
+        release.wait(5)
+        return "late"
+
+    def quick():
+        return "found"
+
+    client = Swarm(client=MockOpenAIClient(), max_background_tools=1)
+    client.client.set_response(tool_call_response("hung"))
+    response = client.run(agent=Agent(functions=[hung]), messages=MESSAGES, tool_timeout=0.1)
+    assert response.stop_reason == "tool_timeout"
+
+    # the only background thread is still busy with `hung` for a while
+    threading.Timer(0.3, release.set).start()
+    client.client.set_sequential_responses(
+        [tool_call_response("quick"), create_mock_response({"role": "assistant", "content": "ok"})]
+    )
+    response = client.run(agent=Agent(functions=[quick]), messages=MESSAGES, tool_timeout=0.1)
+
+    assert response.stop_reason is None
+    assert response.messages[1]["content"] == "found"
+
+
+def test_deadline():
+    def slow_lookup():
+        time.sleep(0.5)
+        return "late"
+
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(tool_call_response("slow_lookup"))
+    response = Swarm(client=mock_client).run(
+        agent=Agent(functions=[slow_lookup]),
+        messages=MESSAGES,
+        cancel=CancellationToken(timeout=0.1),
+    )
+
+    assert response.stop_reason == "deadline"
+
+
+class ClosableStream:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.closed = False
+
+    def __iter__(self):
+        return self.chunks
+
+    def close(self):
+        self.closed = True
+
+
+def test_cancel_mid_stream():
+    stream = ClosableStream(create_mock_stream(content="Hello world"))
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(stream)
+    token = CancellationToken()
+
+    chunks = []
+    for chunk in Swarm(client=mock_client).run(
+        agent=Agent(), messages=MESSAGES, stream=True, cancel=token
+    ):
+        chunks.append(chunk)
+        if chunk.get("content") == "o":
+            token.cancel()
+
+    response = chunks[-1]["response"]
+    assert response.stop_reason == "cancelled"
+    assert response.messages[-1]["content"] == "Hello"
+    assert response.messages[-1]["tool_calls"] is None
+    assert chunks[-2] == {"delim": "end"}
+    assert stream.closed
+
+
+def test_async_tool_timeout():
+    async def slow_lookup():
+        await asyncio.sleep(5)
+        return "late"
+
+    mock_client = MockAsyncOpenAIClient()
+    mock_client.set_response(tool_call_response("slow_lookup"))
+    start = time.monotonic()
+    response = asyncio.run(
+        AsyncSwarm(client=mock_client).run(
+            agent=Agent(functions=[slow_lookup]), messages=MESSAGES, tool_timeout=0.1
+        )
+    )
+
+    assert time.monotonic() - start < 2
+    assert response.stop_reason == "tool_timeout"
+    assert response.messages[-1]["content"] == "Error: interrupted (tool_timeout)."
+
+
+class StallingHandler(BaseHTTPRequestHandler):
+    """Answers a streamed request with one chunk and then stalls; stalls other requests outright."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests += 1
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            chunk = create_mock_stream(content="Hel")[1]
+            self.wfile.write(f"data: {chunk.model_dump_json()}\n\n".encode())
+            self.wfile.flush()
+        time.sleep(3)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stalling_client():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StallingHandler)
+    server.daemon_threads = True
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = OpenAI(base_url=f"http://127.0.0.1:{server.server_port}/v1", api_key="test")
+    yield server, client
+    server.shutdown()
+    server.server_close()
+
+
+def test_turn_timeout_stops_a_stalled_stream(stalling_client):
+    _, client = stalling_client
+    start = time.monotonic()
+    chunks = list(
+        Swarm(client=client).run(
+            agent=Agent(), messages=MESSAGES, stream=True, turn_timeout=0.5
+        )
+    )
+
+    response = chunks[-1]["response"]
+    assert time.monotonic() - start < 2
+    assert response.stop_reason == "turn_timeout"
+    assert response.messages[-1]["content"] == "H"
+
+
+def test_turn_timeout_skips_client_retries(stalling_client):
+    server, client = stalling_client
+    start = time.monotonic()
+    response = Swarm(client=client).run(agent=Agent(), messages=MESSAGES, turn_timeout=0.5)
+
+    assert time.monotonic() - start < 1.5
+    assert response.stop_reason == "turn_timeout"
+    assert server.requests == 1
+
+
+def test_retry_backoff_stops_at_the_turn_timeout():
+    rate_limited = RateLimitError(
+        "rate limited",
+        response=httpx.Response(
+            429,
+            headers={"retry-after": "10"},
+            request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"),
+        ),
+        body=None,
+    )
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses([rate_limited] * 4)
+    start = time.monotonic()
+    response = Swarm(client=mock_client, max_retries=3).run(
+        agent=Agent(), messages=MESSAGES, turn_timeout=0.3
+    )
+
+    assert time.monotonic() - start < 2
+    assert response.stop_reason == "turn_timeout"
+    assert mock_client.chat.completions.create.call_count == 1
+
+
+def test_tool_timeout_applies_to_streaming_safe_tools():
+    release = threading.Event()
+
+    @streaming_safe
+    def lookup():
+        release.wait(5)
+        return "late"
+
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(iter(create_mock_stream(function_calls=[{"name": "lookup"}])))
+    start = time.monotonic()
+    chunks = list(
+        Swarm(client=mock_client, max_tool_workers=2).run(
+            agent=Agent(functions=[lookup]),
+            messages=MESSAGES,
+            stream=True,
+            tool_timeout=0.2,
+        )
+    )
+    release.set()
+
+    assert time.monotonic() - start < 2
+    assert chunks[-1]["response"].stop_reason == "tool_timeout"
+
+
+class StallingAsyncStream:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        for chunk in self.chunks:
+            return chunk
+        await asyncio.sleep(5)
+        raise StopAsyncIteration
+
+
+@pytest.mark.parametrize("limit", ["turn_timeout", "cancelled"])
+def test_async_stalled_stream(limit):
+    mock_client = MockAsyncOpenAIClient()
+    mock_client.set_response(StallingAsyncStream(create_mock_stream(content="Hel")[:2]))
+    token = CancellationToken()
+
+    async def collect():
+        if limit == "cancelled":
+            asyncio.get_running_loop().call_later(0.2, token.cancel)
+            kwargs = {"cancel": token}
+        else:
+            kwargs = {"turn_timeout": 0.2}
+        stream = await AsyncSwarm(client=mock_client).run(
+            agent=Agent(), messages=MESSAGES, stream=True, **kwargs
+        )
+        return [chunk async for chunk in stream]
+
+    start = time.monotonic()
+    chunks = asyncio.run(collect())
+
+    response = chunks[-1]["response"]
+    assert time.monotonic() - start < 2
+    assert response.stop_reason == limit
+    assert response.messages[-1]["content"] == "H"
@@ -0,0 +1,191 @@
+import asyncio
+import datetime
+
+import pytest
+
+from swarm import AsyncSwarm, Swarm, Agent
+from swarm.checkpoint import CheckpointStore
+from tests.mock_client import MockAsyncOpenAIClient, MockOpenAIClient, create_mock_response
+
+MESSAGES = [{"role": "user", "content": "I need a refund"}]
+
+
+def reply(content):
+    return create_mock_response({"role": "assistant", "content": content})
+
+
+def make_agents():
+    refunds = Agent(name="Refunds", functions=[lambda: "refund issued"])
+    refunds.functions[0].__name__ = "issue_refund"
+
+    def transfer_to_refunds():
+        return refunds
+
+    triage = Agent(name="Triage", functions=[transfer_to_refunds])
+    return triage, refunds
+
+
+def handoff():
+    return create_mock_response(
+        message={"role": "assistant", "content": ""},
+        function_calls=[{"name": "transfer_to_refunds"}],
+    )
+
+
+@pytest.mark.parametrize("codec", ["json", None])
+def test_store_appends_messages(codec):
+    store = CheckpointStore(":memory:", codec=codec)
+    messages = [{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}]
+
+    store.save("run", "Triage", messages, {"user_id": 1}, start=1)
+    messages.append({"role": "user", "content": "c"})
+    store.save("run", "Refunds", messages, {"user_id": 2}, start=3, done=True)
+
+    checkpoint = store.load("run")
+    assert checkpoint.messages == messages
+    assert checkpoint.agent == "Refunds"
+    assert checkpoint.context_variables == {"user_id": 2}
+    assert checkpoint.start == 1  # kept from the first save
+    assert checkpoint.done
+    (rows,) = store._conn.execute("SELECT COUNT(*) FROM messages").fetchone()
+    assert rows == 3
+    with pytest.raises(KeyError):
+        store.load("missing")
+
+
+def test_run_is_checkpointed_and_resumed(tmp_path):
+    path = str(tmp_path / "runs.db")
+    triage, refunds = make_agents()
+
+    # the first worker dies while requesting the second completion
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses([handoff(), RuntimeError("worker died")])
+    with pytest.raises(RuntimeError):
+        Swarm(client=mock_client, checkpoints=CheckpointStore(path)).run(
+            agent=triage, messages=MESSAGES, context_variables={"user_id": 7}, run_id="r1"
+        )
+
+    store = CheckpointStore(path)
+    assert store.unfinished() == ["r1"]
+    checkpoint = store.load("r1")
+    assert checkpoint.agent == "Refunds"
+    assert [m["role"] for m in checkpoint.messages] == ["user", "assistant", "tool"]
+
+    # another worker picks it up
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(reply("Your refund is on its way."))
+    response = Swarm(client=mock_client, checkpoints=store).resume(
+        "r1", [triage, refunds]
+    )
+
+    assert response.agent is refunds
+    assert response.context_variables == {"user_id": 7}
+    assert [m["role"] for m in response.messages] == ["assistant", "tool", "assistant"]
+    assert response.messages[-1]["content"] == "Your refund is on its way."
+    assert store.unfinished() == []
+    assert store.load("r1").start == 1
+
+
+def test_resume_runs_pending_tool_calls():
+    store = CheckpointStore(":memory:")
+    triage, refunds = make_agents()
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(
+        create_mock_response(
+            message={"role": "assistant", "content": ""},
+            function_calls=[{"name": "issue_refund"}],
+        )
+    )
+    client = Swarm(client=mock_client, checkpoints=store)
+    client.run(agent=refunds, messages=MESSAGES, execute_tools=False, run_id="r2")
+    assert len(store.load("r2").pending_tool_calls) == 1
+
+    # approved: execute the tool call and carry on
+    mock_client.set_response(reply("Done."))
+    response = client.resume("r2", {"Refunds": refunds, "Triage": triage})
+
+    assert [m["role"] for m in response.messages] == ["assistant", "tool", "assistant"]
+    assert response.messages[1]["content"] == "refund issued"
+    assert store.load("r2").pending_tool_calls == []
+
+
+def test_resume_unknown_agent():
+    store = CheckpointStore(":memory:")
+    store.save("r3", "Gone", MESSAGES, {}, start=1)
+    with pytest.raises(KeyError):
+        Swarm(client=MockOpenAIClient(), checkpoints=store).resume("r3", [])
+
+
+def test_async_resume():
+    store = CheckpointStore(":memory:")
+    triage, refunds = make_agents()
+    mock_client = MockAsyncOpenAIClient()
+    mock_client.set_sequential_responses([handoff(), RuntimeError("worker died")])
+    client = AsyncSwarm(client=mock_client, checkpoints=store)
+    with pytest.raises(RuntimeError):
+        asyncio.run(client.run(agent=triage, messages=MESSAGES, run_id="r4"))
+
+    mock_client.set_sequential_responses([reply("Refunded.")])
+    response = asyncio.run(client.resume("r4", [triage, refunds]))
+
+    assert response.agent is refunds
+    assert response.messages[-1]["content"] == "Refunded."
+
+
+@pytest.mark.parametrize("codec", ["json", None])
+def test_unencodable_context_is_an_error(codec):
+    store = CheckpointStore(":memory:", codec=codec)
+    context = {"since": datetime.date(2024, 5, 1)}
+
+    with pytest.raises(TypeError, match="context_variables of run 'run'"):
+        store.save("run", "Triage", MESSAGES, context, start=1)
+    with pytest.raises(KeyError):
+        store.load("run")
+
+
+@pytest.mark.parametrize("codec", ["json", None])
+def test_custom_encoding(codec):
+    def default(value):
+        if isinstance(value, datetime.date):
+            return {"__date__": value.isoformat()}
+        raise TypeError(type(value).__name__)
+
+    def object_hook(value):
+        if "__date__" in value:
+            return datetime.date.fromisoformat(value["__date__"])
+        return value
+
+    store = CheckpointStore(":memory:", codec=codec, default=default, object_hook=object_hook)
+    store.save("run", "Triage", MESSAGES, {"since": datetime.date(2024, 5, 1)}, start=1)
+
+    assert store.load("run").context_variables == {"since": datetime.date(2024, 5, 1)}
+
+
+@pytest.mark.parametrize("codec", ["json", None])
+@pytest.mark.parametrize(
+    "context, error",
+    [
+        ({"seats": {12: "A"}}, r"context_variables\['seats'\] has the non-string key 12"),
+        ({"ids": (1, 2)}, r"context_variables\['ids'\] is a tuple"),
+    ],
+)
+def test_lossy_context_is_an_error(codec, context, error):
+    store = CheckpointStore(":memory:", codec=codec)
+
+    with pytest.raises(TypeError, match=error):
+        store.save("run", "Triage", MESSAGES, context, start=1)
+
+
+def test_resume_finished_run():
+    store = CheckpointStore(":memory:")
+    triage, refunds = make_agents()
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(reply("Anything else?"))
+    client = Swarm(client=mock_client, checkpoints=store)
+    first = client.run(agent=triage, messages=MESSAGES, run_id="r5")
+
+    response = client.resume("r5", [triage, refunds])
+
+    assert mock_client.chat.completions.create.call_count == 1
+    assert response.messages == first.messages
+    assert response.agent is triage
@@ -0,0 +1,122 @@
+from swarm import Swarm, Agent
+from swarm.compaction import (
+    DropToolOutputs,
+    SlidingWindow,
+    Summarize,
+    TokenCounter,
+)
+from tests.mock_client import MockOpenAIClient, create_mock_response
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def tool_turn(i):
+    return [
+        {"role": "user", "content": f"question {i}"},
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{i}",
+                    "type": "function",
+                    "function": {"name": "lookup", "arguments": "{}"},
+                }
+            ],
+        },
+        {"role": "tool", "tool_call_id": f"call_{i}", "content": "result " * 20},
+        {"role": "assistant", "content": f"answer {i}"},
+    ]
+
+
+def test_token_counter_caches_per_message():
+    calls = []
+
+    def count_text(text):
+        calls.append(text)
+        return count_words(text)
+
+    counter = TokenCounter(count_text)
+    messages = [{"role": "user", "content": "one two three"}]
+    assert counter.count(messages) == 3 + TokenCounter.per_message
+    assert counter.count(messages) == 3 + TokenCounter.per_message
+    assert calls == ["one two three"]
+
+
+def test_counter_remembers_only_recent_messages():
+    counter = TokenCounter(count_words, maxsize=2)
+    messages = [{"role": "user", "content": f"message {i}"} for i in range(5)]
+    counter.count(messages)
+
+    assert len(counter._counts) == 2
+    assert SlidingWindow(10).counter is not SlidingWindow(10).counter
+
+
+def test_sliding_window_keeps_tool_calls_with_results():
+    messages = [m for i in range(5) for m in tool_turn(i)]
+    window = SlidingWindow(60, TokenCounter(count_words))
+    kept = window(messages)
+
+    assert kept[-1] == messages[-1]
+    assert len(kept) < len(messages)
+    call_ids = {c["id"] for m in kept for c in m.get("tool_calls") or ()}
+    result_ids = {m["tool_call_id"] for m in kept if m["role"] == "tool"}
+    assert call_ids == result_ids
+
+
+def test_drop_tool_outputs():
+    messages = [m for i in range(3) for m in tool_turn(i)]
+    compacted = DropToolOutputs(keep_turns=2)(messages)
+
+    tool_contents = [m["content"] for m in compacted if m["role"] == "tool"]
+    assert tool_contents[:2] == ["[tool output omitted]"] * 2
+    assert tool_contents[2] == "result " * 20
+    assert messages[2]["content"] == "result " * 20  # input untouched
+    # replaced messages are the same objects on every call
+    stage = DropToolOutputs(keep_turns=2)
+    assert stage(messages)[2] is stage(messages)[2]
+
+
+def test_summarize_is_incremental():
+    summaries = []
+
+    def summarize(messages):
+        summaries.append(messages)
+        return f"{len(messages)} messages"
+
+    summarizer = Summarize(summarize, max_tokens=60, keep_tokens=30, counter=TokenCounter(count_words))
+    messages = [{"role": "user", "content": f"message {i} " * 5} for i in range(10)]
+
+    compacted = summarizer(messages)
+    assert compacted[0]["role"] == "system"
+    assert len(summaries) == 1
+    assert compacted[1:] == messages[-2:]
+
+    # growing the same conversation reuses the summary until it overflows again
+    messages.append({"role": "user", "content": "short"})
+    assert summarizer(messages)[0] is compacted[0]
+    assert len(summaries) == 1
+
+    messages.extend({"role": "user", "content": f"more {i} " * 5} for i in range(5))
+    summarizer(messages)
+    assert len(summaries) == 2
+    assert summaries[1][0] is compacted[0]
+
+
+def test_run_with_compactor():
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(
+        create_mock_response({"role": "assistant", "content": "ok"})
+    )
+    client = Swarm(client=mock_client, compactor=SlidingWindow(10, TokenCounter(count_words)))
+    messages = [{"role": "user", "content": f"message {i} " * 3} for i in range(5)]
+
+    response = client.run(agent=Agent(), messages=messages)
+
+    sent = mock_client.chat.completions.create.call_args.kwargs["messages"]
+    assert sent[0]["role"] == "system"
+    assert sent[1:] == messages[-1:]
+    assert len(messages) == 5
+    assert response.messages[-1]["content"] == "ok"
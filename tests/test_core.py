@@ -1,6 +1,9 @@
+import threading
 import pytest
 from swarm import Swarm, Agent
-from tests.mock_client import MockOpenAIClient, create_mock_response
+from swarm.types import PartialResponse, Response, Result
+from swarm.util import streaming_safe
+from tests.mock_client import MockOpenAIClient, create_mock_response, create_mock_stream
 from unittest.mock import Mock
 import json
 
@@ -143,3 +146,255 @@ def test_handoff(mock_openai_client: MockOpenAIClient):
     assert response.agent == agent2
     assert response.messages[-1]["role"] == "assistant"
     assert response.messages[-1]["content"] == DEFAULT_RESPONSE_CONTENT
+
+
+def test_parallel_tool_calls(mock_openai_client: MockOpenAIClient):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def lookup_user(user_id):
+        barrier.wait()  # only passes if both tools run at the same time
+        return Result(value=f"user {user_id}", context_variables={"who": "user"})
+
+    def lookup_order(order_id):
+        barrier.wait()
+        return Result(
+            value=f"order {order_id}",
+            agent=agent2,
+            context_variables={"who": "order"},
+        )
+
+    agent1 = Agent(name="Test Agent 1", functions=[lookup_user, lookup_order])
+    agent2 = Agent(name="Test Agent 2")
+
+    mock_openai_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[
+                    {"name": "lookup_user", "args": {"user_id": "1"}},
+                    {"name": "lookup_order", "args": {"order_id": "2"}},
+                ],
+            ),
+            create_mock_response(
+                {"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT}
+            ),
+        ]
+    )
+
+    client = Swarm(client=mock_openai_client, max_tool_workers=4)
+    messages = [{"role": "user", "content": "Look up my user and order"}]
+    response = client.run(agent=agent1, messages=messages)
+
+    # tool messages keep tool_call order, later calls win context_variables
+    assert [m["content"] for m in response.messages[1:3]] == ["user 1", "order 2"]
+    assert response.context_variables == {"who": "order"}
+    assert response.agent == agent2
+    assert response.messages[-1]["content"] == DEFAULT_RESPONSE_CONTENT
+
+
+def test_run_leaves_inputs_untouched(mock_openai_client: MockOpenAIClient):
+    def set_language(context_variables):
+        context_variables["language"] = "spanish"
+        context_variables["cart"].append("tapas")
+        return Result(value="Done", context_variables={"greeted": True})
+
+    agent = Agent(functions=[set_language])
+    mock_openai_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[{"name": "set_language"}],
+            ),
+            create_mock_response(
+                {"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT}
+            ),
+        ]
+    )
+
+    client = Swarm(client=mock_openai_client)
+    messages = [{"role": "user", "content": "Hola"}]
+    context_variables = {"user_name": "John", "cart": []}
+    response = client.run(
+        agent=agent, messages=messages, context_variables=context_variables
+    )
+
+    assert messages == [{"role": "user", "content": "Hola"}]
+    assert context_variables == {"user_name": "John", "cart": []}
+    assert len(response.messages) == 3
+    assert response.context_variables == {
+        "user_name": "John",
+        "cart": ["tapas"],
+        "language": "spanish",
+        "greeted": True,
+    }
+
+
+def test_run_and_stream_handoff(mock_openai_client: MockOpenAIClient):
+    def transfer_to_agent2():
+        return agent2
+
+    agent1 = Agent(name="Test Agent 1", functions=[transfer_to_agent2])
+    agent2 = Agent(name="Test Agent 2")
+
+    mock_openai_client.set_sequential_responses(
+        [
+            iter(create_mock_stream(function_calls=[{"name": "transfer_to_agent2"}])),
+            iter(create_mock_stream(content=DEFAULT_RESPONSE_CONTENT)),
+        ]
+    )
+
+    client = Swarm(client=mock_openai_client)
+    messages = [{"role": "user", "content": "I want to talk to agent 2"}]
+    chunks = list(client.run(agent=agent1, messages=messages, stream=True))
+
+    senders = [chunk["sender"] for chunk in chunks if "sender" in chunk]
+    assert senders == ["Test Agent 1", "Test Agent 2"]
+    content = "".join(chunk.get("content") or "" for chunk in chunks)
+    assert content == DEFAULT_RESPONSE_CONTENT
+
+    response = chunks[-1]["response"]
+    assert response.agent == agent2
+    assert response.messages[0]["tool_calls"][0]["function"]["name"] == "transfer_to_agent2"
+    assert response.messages[-1]["sender"] == "Test Agent 2"
+    assert response.messages[-1]["content"] == DEFAULT_RESPONSE_CONTENT
+
+
+def test_cache_instructions(mock_openai_client: MockOpenAIClient):
+    renders = []
+
+    def instructions(context_variables):
+        renders.append(1)
+        return f"You help {context_variables['user']}."
+
+    def lookup(context_variables):
+        context_variables["calls"] = context_variables.get("calls", 0) + 1
+        return "done"
+
+    agent = Agent(instructions=instructions, functions=[lookup], cache_instructions=True)
+    mock_openai_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[{"name": "lookup", "args": {}}],
+            ),
+            create_mock_response(
+                {"role": "assistant", "content": DEFAULT_RESPONSE_CONTENT}
+            ),
+        ]
+    )
+    client = Swarm(client=mock_openai_client)
+    client.run(
+        agent=agent,
+        messages=[{"role": "user", "content": "Hello"}],
+        context_variables={"user": "Ana"},
+    )
+
+    assert len(renders) == 1
+    for call in mock_openai_client.chat.completions.create.call_args_list:
+        assert call.kwargs["messages"][0]["content"] == "You help Ana."
+
+
+def test_stream_arguments(mock_openai_client: MockOpenAIClient):
+    def lookup(user_id, note=""):
+        return f"user {user_id}"
+
+    agent = Agent(functions=[lookup])
+    mock_openai_client.set_sequential_responses(
+        [
+            iter(create_mock_stream(function_calls=[{"name": "lookup", "args": {"user_id": 42}}])),
+            iter(create_mock_stream(content=DEFAULT_RESPONSE_CONTENT)),
+        ]
+    )
+    client = Swarm(client=mock_openai_client)
+    chunks = list(
+        client.run(
+            agent=agent,
+            messages=[{"role": "user", "content": "Look up 42"}],
+            stream=True,
+            stream_arguments=True,
+        )
+    )
+
+    updates = [chunk["tool_call_arguments"] for chunk in chunks if "tool_call_arguments" in chunk]
+    assert updates == [
+        {
+            "index": 0,
+            "id": "mock_tc_id_0",
+            "name": "lookup",
+            "arguments": {"user_id": 42},
+            "done": True,
+        }
+    ]
+    assert chunks[-1]["response"].messages[1]["content"] == "user 42"
+
+
+def test_streaming_safe_tool_starts_before_stream_ends(mock_openai_client: MockOpenAIClient):
+    tool_started = threading.Event()
+
+    @streaming_safe
+    def lookup(user_id):
+        tool_started.set()
+        return f"user {user_id}"
+
+    def first_stream():
+        yield from create_mock_stream(function_calls=[{"name": "lookup", "args": {"user_id": 7}}])
+        # the model is still streaming when the tool starts
+        assert tool_started.wait(5)
+        yield create_mock_stream(content=".")[-1]
+
+    mock_openai_client.set_sequential_responses(
+        [first_stream(), iter(create_mock_stream(content=DEFAULT_RESPONSE_CONTENT))]
+    )
+    client = Swarm(client=mock_openai_client, max_tool_workers=2)
+    chunks = list(
+        client.run(
+            agent=Agent(functions=[lookup]),
+            messages=[{"role": "user", "content": "Look up 7"}],
+            stream=True,
+        )
+    )
+
+    response = chunks[-1]["response"]
+    assert [m["content"] for m in response.messages[1:]] == ["user 7", DEFAULT_RESPONSE_CONTENT]
+
+
+def test_handle_tool_calls_returns_partial_response(mock_openai_client: MockOpenAIClient):
+    sales_agent = Agent(name="Sales Agent")
+
+    def lookup():
+        return "found"
+
+    def transfer():
+        return sales_agent
+
+    def set_tier():
+        return Result(value="ok", context_variables={"tier": "gold"})
+
+    tool_calls = create_mock_response(
+        message={"role": "assistant", "content": ""},
+        function_calls=[{"name": "lookup"}, {"name": "transfer"}, {"name": "set_tier"}],
+    ).choices[0].message.tool_calls
+
+    client = Swarm(client=mock_openai_client)
+    response = client.handle_tool_calls(
+        tool_calls, [lookup, transfer, set_tier], {}, debug=False
+    )
+    assert isinstance(response, Response)
+    assert response.agent is sales_agent
+    assert response.context_variables == {"tier": "gold"}
+
+    partial_response = client.handle_tool_calls(
+        tool_calls, [lookup, transfer, set_tier], {}, debug=False, partial=True
+    )
+    assert isinstance(partial_response, PartialResponse)
+
+    assert [m["content"] for m in partial_response.messages] == [
+        "found",
+        '{"assistant": "Sales Agent"}',
+        "ok",
+    ]
+    assert partial_response.agent is sales_agent
+    assert partial_response.context_variables == {"tier": "gold"}
+    dumped = partial_response.model_dump()
+    assert dumped["agent"]["name"] == "Sales Agent"
+    assert dumped["context_variables"] == {"tier": "gold"}
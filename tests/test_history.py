@@ -0,0 +1,15 @@
+from swarm.history import History
+
+
+def test_history_shares_prefix():
+    messages = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}]
+    history = History(messages)
+    history.append({"role": "user", "content": "Bye"})
+
+    assert len(history) == 3
+    assert history[0] is messages[0]
+    assert history[-1]["content"] == "Bye"
+    assert [m["content"] for m in history] == ["Hi", "Hello", "Bye"]
+    assert history[1:] == [messages[1], history.new_messages[0]]
+    # the caller's list is untouched
+    assert len(messages) == 2
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+
+def import_times(statement: str) -> dict:
+    """Cumulative import time in microseconds per module, from `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_import_swarm_is_lazy():
+    times = import_times("import swarm")
+    assert "swarm" in times
+    for heavy in ("openai", "pydantic", "httpx"):
+        assert heavy not in times
+
+
+def test_swarm_class_defers_openai():
+    times = import_times("from swarm import Swarm, Agent")
+    assert "swarm.core" in times
+    assert "openai" not in times
+    assert "httpx" not in times
@@ -0,0 +1,96 @@
+import pytest
+
+from swarm import Swarm, Agent
+from swarm.registry import AgentRegistry, transfer_name
+from swarm.util import compile_tools
+from tests.mock_client import MockOpenAIClient, create_mock_response
+
+
+def make_registry():
+    triage = Agent(name="Triage Agent")
+    sales = Agent(name="Sales Agent", functions=[lambda: "ordered"])
+    refunds = Agent(name="Refunds Agent")
+    registry = AgentRegistry()
+    registry.add(
+        triage,
+        handoffs=[sales, "Refunds Agent"],
+        descriptions={"Refunds Agent": "For returns and refunds."},
+    )
+    registry.add(sales, handoffs=[triage])
+    registry.add(refunds, handoffs=[triage])
+    return registry, triage, sales, refunds
+
+
+def test_build_generates_transfer_functions():
+    registry, triage, sales, refunds = make_registry()
+    registry.build(entry=triage)
+
+    assert registry["Sales Agent"] is sales
+    assert len(registry) == 3
+    assert [f.__name__ for f in triage.functions] == [
+        "transfer_to_sales_agent",
+        "transfer_to_refunds_agent",
+    ]
+    tools = compile_tools(triage.functions).tools
+    assert tools[1]["function"]["description"] == "For returns and refunds."
+    assert [f.__name__ for f in sales.functions] == ["<lambda>", "transfer_to_triage_agent"]
+    # one transfer function per target, shared by the agents handing off to it
+    assert sales.functions[1] is refunds.functions[0]
+
+    # rebuilding replaces the generated functions instead of adding more
+    registry.build(entry=triage)
+    assert len(sales.functions) == 2
+
+
+def test_transfer_name():
+    assert transfer_name("Sales Agent") == "transfer_to_sales_agent"
+    assert transfer_name("Agent #2 (beta)") == "transfer_to_agent_2_beta"
+
+
+def test_validate():
+    registry, triage, sales, refunds = make_registry()
+    registry.add(Agent(name="Orphan"))
+    registry.add(refunds, handoffs=[triage, "Billing", refunds])
+
+    with pytest.raises(ValueError) as error:
+        registry.build(entry=triage)
+    message = str(error.value)
+    assert "'Refunds Agent' hands off to unknown agent 'Billing'" in message
+    assert "'Refunds Agent' hands off to itself" in message
+    assert "Unreachable from 'Triage Agent': 'Orphan'" in message
+    assert "cycle" not in message
+
+    with pytest.raises(ValueError, match="Another agent"):
+        registry.add(Agent(name="Triage Agent"))
+
+
+def test_cycles():
+    registry, triage, _, _ = make_registry()
+    assert registry.cycles() == [
+        ["Triage Agent", "Sales Agent", "Triage Agent"],
+        ["Triage Agent", "Refunds Agent", "Triage Agent"],
+    ]
+    with pytest.raises(ValueError, match="Handoff cycle"):
+        registry.build(entry=triage, allow_cycles=False)
+
+
+def test_run_hands_off_through_registry():
+    registry, triage, sales, _ = make_registry()
+    registry.build(entry=triage)
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[{"name": "transfer_to_sales_agent"}],
+            ),
+            create_mock_response({"role": "assistant", "content": "What would you like?"}),
+        ]
+    )
+
+    response = Swarm(client=mock_client).run(
+        agent=triage, messages=[{"role": "user", "content": "I want to buy"}]
+    )
+
+    assert response.agent is sales
+    assert response.messages[1]["content"] == '{"assistant": "Sales Agent"}'
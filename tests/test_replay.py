@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from swarm import AsyncSwarm, Swarm, Agent
+from swarm.replay import (
+    AsyncRecordingClient,
+    AsyncReplayClient,
+    Cassette,
+    RecordingClient,
+    ReplayClient,
+    ReplayMismatch,
+)
+from tests.mock_client import (
+    MockAsyncOpenAIClient,
+    MockAsyncStream,
+    MockOpenAIClient,
+    create_mock_response,
+    create_mock_stream,
+)
+
+
+def transfer_to_agent2():
+    return agent2
+
+
+agent1 = Agent(name="Agent 1", functions=[transfer_to_agent2])
+agent2 = Agent(name="Agent 2")
+MESSAGES = [{"role": "user", "content": "Agent 2 please"}]
+
+
+def handoff_responses():
+    return [
+        create_mock_response(
+            message={"role": "assistant", "content": ""},
+            function_calls=[{"name": "transfer_to_agent2"}],
+        ),
+        create_mock_response({"role": "assistant", "content": "Hi from 2"}),
+    ]
+
+
+def test_record_and_replay(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses(handoff_responses())
+    recorded = Swarm(client=RecordingClient(mock_client, path)).run(
+        agent=agent1, messages=MESSAGES
+    )
+
+    replay = ReplayClient(path)
+    assert len(replay.cassette) == 2
+    replayed = Swarm(client=replay).run(agent=agent1, messages=MESSAGES)
+
+    assert replayed.messages == recorded.messages
+    assert replayed.agent == agent2
+    assert replay.mismatches == []
+
+
+def test_record_and_replay_stream(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses(
+        [
+            iter(create_mock_stream(function_calls=[{"name": "transfer_to_agent2"}])),
+            iter(create_mock_stream(content="Hi from 2")),
+        ]
+    )
+    recorded = list(
+        Swarm(client=RecordingClient(mock_client, path)).run(
+            agent=agent1, messages=MESSAGES, stream=True
+        )
+    )
+    replayed = list(
+        Swarm(client=ReplayClient(path)).run(agent=agent1, messages=MESSAGES, stream=True)
+    )
+
+    assert replayed[:-1] == recorded[:-1]
+    assert replayed[-1]["response"].messages == recorded[-1]["response"].messages
+
+
+def test_async_record_and_replay(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    mock_client = MockAsyncOpenAIClient()
+    mock_client.set_sequential_responses(
+        [
+            MockAsyncStream(create_mock_stream(function_calls=[{"name": "transfer_to_agent2"}])),
+            MockAsyncStream(create_mock_stream(content="Hi from 2")),
+        ]
+    )
+
+    async def collect(client):
+        stream = await client.run(agent=agent1, messages=MESSAGES, stream=True)
+        return [chunk async for chunk in stream]
+
+    recorded = asyncio.run(collect(AsyncSwarm(client=AsyncRecordingClient(mock_client, path))))
+    replayed = asyncio.run(collect(AsyncSwarm(client=AsyncReplayClient(path))))
+
+    assert replayed[-1]["response"].messages == recorded[-1]["response"].messages
+
+
+def test_replay_mismatch(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses(handoff_responses())
+    Swarm(client=RecordingClient(mock_client, path)).run(agent=agent1, messages=MESSAGES)
+
+    replay = ReplayClient(Cassette(path))
+    changed = [{"role": "user", "content": "Agent 3 please"}]
+    with pytest.raises(ReplayMismatch) as error:
+        Swarm(client=replay).run(agent=agent1, messages=changed)
+
+    assert error.value.difference.startswith("request.messages[1].content")
+    assert replay.mismatches == [error.value]
+    assert "Agent 3 please" in replay.report()
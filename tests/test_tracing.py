@@ -0,0 +1,111 @@
+import json
+from openai.types.completion_usage import CompletionUsage
+from swarm import Swarm, Agent
+from swarm.tracing import JSONLTracer, Tracer
+from tests.mock_client import MockOpenAIClient, create_mock_response, create_mock_stream
+
+
+class RecordingTracer(Tracer):
+    def __init__(self):
+        self.events = []
+
+    def on_turn_start(self, run_id, turn, agent, message_count):
+        self.events.append(("turn_start", turn, agent, message_count))
+
+    def on_completion(self, run_id, turn, agent, model, duration, usage):
+        self.events.append(("completion", turn, agent, model))
+
+    def on_tool_start(self, run_id, turn, agent, name, arguments):
+        self.events.append(("tool_start", turn, name, arguments))
+
+    def on_tool_end(self, run_id, turn, agent, name, duration, error=None):
+        self.events.append(("tool_end", turn, name, error))
+
+    def on_handoff(self, run_id, turn, from_agent, to_agent):
+        self.events.append(("handoff", turn, from_agent, to_agent))
+
+    def on_turn_end(self, run_id, turn, agent, duration, message_count):
+        self.events.append(("turn_end", turn, agent, message_count))
+
+
+def run_with_handoff(tracer):
+    def transfer_to_agent2(reason):
+        return agent2
+
+    agent1 = Agent(name="Agent 1", functions=[transfer_to_agent2])
+    agent2 = Agent(name="Agent 2", model="gpt-4o-mini")
+
+    mock_client = MockOpenAIClient()
+    mock_client.set_sequential_responses(
+        [
+            create_mock_response(
+                message={"role": "assistant", "content": ""},
+                function_calls=[
+                    {"name": "transfer_to_agent2", "args": {"reason": "billing"}}
+                ],
+            ),
+            create_mock_response({"role": "assistant", "content": "Hi from 2"}),
+        ]
+    )
+    client = Swarm(client=mock_client, tracer=tracer)
+    client.run(agent=agent1, messages=[{"role": "user", "content": "Hi"}])
+
+
+def test_tracer_hooks():
+    tracer = RecordingTracer()
+    run_with_handoff(tracer)
+
+    assert tracer.events == [
+        ("turn_start", 1, "Agent 1", 1),
+        ("completion", 1, "Agent 1", "gpt-4o"),
+        ("tool_start", 1, "transfer_to_agent2", {"reason": "billing"}),
+        ("tool_end", 1, "transfer_to_agent2", None),
+        ("handoff", 1, "Agent 1", "Agent 2"),
+        ("turn_end", 1, "Agent 1", 3),
+        ("turn_start", 2, "Agent 2", 3),
+        ("completion", 2, "Agent 2", "gpt-4o-mini"),
+        ("turn_end", 2, "Agent 2", 4),
+    ]
+
+
+def test_jsonl_tracer(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = JSONLTracer(str(path))
+    run_with_handoff(tracer)
+    tracer.close()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [span["span"] for span in spans] == [
+        "completion",
+        "tool",
+        "handoff",
+        "turn",
+        "completion",
+        "turn",
+    ]
+    assert len({span["run_id"] for span in spans}) == 1
+    assert spans[1]["name"] == "transfer_to_agent2"
+    assert all(span["duration"] >= 0 for span in spans)
+
+
+def test_streamed_run_records_usage():
+    usage = CompletionUsage(prompt_tokens=12, completion_tokens=3, total_tokens=15)
+    chunks = create_mock_stream(content="Hi")
+    chunks.append(chunks[-1].model_copy(update={"choices": [], "usage": usage}))
+
+    class UsageTracer(Tracer):
+        def __init__(self):
+            self.usages = []
+
+        def on_completion(self, run_id, turn, agent, model, duration, usage):
+            self.usages.append(usage)
+
+    tracer = UsageTracer()
+    mock_client = MockOpenAIClient()
+    mock_client.set_response(chunks)
+    client = Swarm(client=mock_client, tracer=tracer)
+    list(client.run(agent=Agent(), messages=[{"role": "user", "content": "Hi"}], stream=True))
+
+    create_params = mock_client.chat.completions.create.call_args.kwargs
+    assert create_params["stream_options"] == {"include_usage": True}
+    assert tracer.usages == [usage.model_dump()]
@@ -0,0 +1,106 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import APIConnectionError, OpenAI
+
+from swarm import Swarm, Agent
+from swarm.transport import shared_http_client, transport_stats
+
+COMPLETION = {
+    "id": "chatcmpl-stub",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o",
+    "choices": [
+        {
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": "stub reply"},
+        }
+    ],
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_CONNECT(self):
+        # a tunnel request from a client using this server as its proxy
+        self.server.tunnels.append(self.path)
+        self.send_response(502)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.tunnels = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_port}/v1"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_shared_client_is_reused():
+    assert shared_http_client(max_connections=7) is shared_http_client(max_connections=7)
+    assert shared_http_client(max_connections=7) is not shared_http_client(max_connections=8)
+
+
+def test_swarms_share_connections(stub_server):
+    http_client = shared_http_client(max_connections=3, http2=False)
+    before = transport_stats()
+
+    for _ in range(3):
+        # a new Swarm and OpenAI client per request, as the evals do
+        client = Swarm(
+            client=OpenAI(base_url=stub_server.url, api_key="test", http_client=http_client)
+        )
+        response = client.run(agent=Agent(), messages=[{"role": "user", "content": "Hi"}])
+        assert response.messages[-1]["content"] == "stub reply"
+
+    after = transport_stats()
+    assert after["requests"] - before["requests"] == 3
+    assert after["connections"] - before["connections"] == 1
+    assert after["reused"] - before["reused"] == 2
+
+
+def test_shared_client_uses_environment_proxies(stub_server, monkeypatch):
+    proxy = stub_server.url.removesuffix("/v1")
+    monkeypatch.setenv("HTTPS_PROXY", proxy)
+    monkeypatch.setenv("HTTP_PROXY", proxy)
+    monkeypatch.delenv("NO_PROXY", raising=False)
+    monkeypatch.delenv("no_proxy", raising=False)
+    # a config no other test uses, so the client is created with this environment
+    http_client = shared_http_client(max_connections=5, http2=False)
+    before = transport_stats()
+
+    client = OpenAI(base_url="http://api.invalid/v1", api_key="test", http_client=http_client)
+    response = Swarm(client=client).run(
+        agent=Agent(), messages=[{"role": "user", "content": "Hi"}]
+    )
+    assert response.messages[-1]["content"] == "stub reply"
+    assert transport_stats()["requests"] - before["requests"] == 1
+
+    client = OpenAI(
+        base_url="https://api.invalid/v1", api_key="test", http_client=http_client, max_retries=0
+    )
+    with pytest.raises(APIConnectionError):
+        client.chat.completions.create(model="gpt-4o", messages=[])
+    assert stub_server.tunnels == ["api.invalid:443"]
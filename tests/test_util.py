@@ -1,4 +1,19 @@
-from swarm.util import function_to_json
+import copy
+import json
+from collections import defaultdict
+
+from openai.types.chat.chat_completion_chunk import ChoiceDelta
+
+from swarm.util import (
+    ArgumentsParser,
+    InstructionsCache,
+    StreamedMessage,
+    compile_tools,
+    delta_to_dict,
+    function_to_json,
+    merge_chunk,
+)
+from tests.mock_client import create_mock_stream
 
 
 def test_basic_function():
@@ -48,3 +63,204 @@ def test_complex_function():
             },
         },
     }
+
+
+def test_compile_tools_hides_context_variables():
+    def greet(context_variables, name: str):
+        pass
+
+    def wave():
+        pass
+
+    compiled = compile_tools([greet, wave])
+    assert compiled.tools[0]["function"]["parameters"] == {
+        "type": "object",
+        "properties": {"name": {"type": "string"}},
+        "required": ["name"],
+    }
+    assert compiled.function_map == {"greet": greet, "wave": wave}
+    assert compiled.context_aware == frozenset({"greet"})
+
+
+def test_compile_tools_cache():
+    def first():
+        pass
+
+    def second():
+        pass
+
+    functions = [first]
+    compiled = compile_tools(functions)
+    assert compile_tools(functions) is compiled
+
+    functions.append(second)
+    recompiled = compile_tools(functions)
+    assert recompiled is not compiled
+    assert [t["function"]["name"] for t in recompiled.tools] == ["first", "second"]
+
+
+def test_delta_to_dict_matches_json_round_trip():
+    chunks = create_mock_stream(
+        content="Hi", function_calls=[{"name": "get_weather", "args": {"city": "SF"}}]
+    )
+    for chunk in chunks:
+        delta = chunk.choices[0].delta
+        assert delta_to_dict(delta) == json.loads(delta.model_dump_json())
+
+
+def test_streamed_message():
+    message = StreamedMessage("Agent")
+    chunks = create_mock_stream(
+        content="Hello",
+        function_calls=[{"name": "first", "args": {"a": 1}}, {"name": "second"}],
+    )
+    for chunk in chunks:
+        message.add(chunk.choices[0].delta)
+
+    assert message.to_dict() == {
+        "content": "Hello",
+        "sender": "Agent",
+        "role": "assistant",
+        "function_call": None,
+        "tool_calls": [
+            {
+                "function": {"arguments": '{"a": 1}', "name": "first"},
+                "id": "mock_tc_id_0",
+                "type": "function",
+            },
+            {
+                "function": {"arguments": "{}", "name": "second"},
+                "id": "mock_tc_id_1",
+                "type": "function",
+            },
+        ],
+    }
+
+
+def test_instructions_cache_tracks_keys_read():
+    renders = []
+
+    def instructions(context_variables):
+        renders.append(1)
+        return f"Help {context_variables['name']}."
+
+    cache = InstructionsCache()
+    assert cache.render(instructions, {"name": "Ana", "turn": 1}) == "Help Ana."
+    # an unrelated key changed: cached
+    assert cache.render(instructions, {"name": "Ana", "turn": 2}) == "Help Ana."
+    assert len(renders) == 1
+    # a key it read changed: rendered again
+    assert cache.render(instructions, {"name": "Bo", "turn": 2}) == "Help Bo."
+    assert len(renders) == 2
+    # earlier snapshots are still cached
+    assert cache.render(instructions, {"name": "Ana"}) == "Help Ana."
+    assert len(renders) == 2
+
+
+def test_instructions_cache_whole_context():
+    renders = []
+
+    def instructions(context_variables):
+        renders.append(1)
+        return ", ".join(f"{k}={v}" for k, v in context_variables.items())
+
+    cache = InstructionsCache()
+    assert cache.render(instructions, {"a": 1}) == "a=1"
+    assert cache.render(instructions, {"a": 1}) == "a=1"
+    assert cache.render(instructions, {"a": 1, "b": 2}) == "a=1, b=2"
+    assert len(renders) == 2
+
+
+def test_instructions_cache_printed_context():
+    def instructions(context_variables):
+        return f"Context: {context_variables}"
+
+    cache = InstructionsCache()
+    assert cache.render(instructions, {"name": "Ana"}) == (
+        "Context: defaultdict(<class 'str'>, {'name': 'Ana'})"
+    )
+    assert cache.render(instructions, {"name": "Bob"}) == (
+        "Context: defaultdict(<class 'str'>, {'name': 'Bob'})"
+    )
+
+
+def test_instructions_cache_copied_context():
+    def instructions(context_variables):
+        shallow = context_variables.copy()
+        deep = copy.deepcopy(context_variables)
+        assert type(shallow) is type(deep) is defaultdict
+        return f"Help {deep['name']}."
+
+    cache = InstructionsCache()
+    assert cache.render(instructions, {"name": "Ana"}) == "Help Ana."
+    assert cache.render(instructions, {"name": "Bob"}) == "Help Bob."
+
+
+def test_merge_chunk_multiple_tool_calls():
+    message = {
+        "content": "",
+        "tool_calls": defaultdict(
+            lambda: {"function": {"arguments": "", "name": ""}, "id": "", "type": ""}
+        ),
+    }
+    merge_chunk(
+        message,
+        {
+            "tool_calls": [
+                {"index": 0, "id": "a", "function": {"name": "first", "arguments": '{"x":'}},
+                {"index": 1, "id": "b", "function": {"name": "second", "arguments": "{}"}},
+            ]
+        },
+    )
+    merge_chunk(message, {"tool_calls": [{"index": 0, "function": {"arguments": " 1}"}}]})
+
+    assert message["tool_calls"][0]["function"] == {"name": "first", "arguments": '{"x": 1}'}
+    assert message["tool_calls"][1]["function"] == {"name": "second", "arguments": "{}"}
+
+
+def test_arguments_parser():
+    parser = ArgumentsParser()
+    fragments = ['{"user', '_id": 4', '2, "note": "a, \\"b', '\\" }", "ids": [1,', " 2]}"]
+    updates = [parser.feed(fragment) for fragment in fragments]
+
+    assert updates == [
+        None,
+        None,
+        {"user_id": 42},
+        {"user_id": 42, "note": 'a, "b" }'},
+        {"user_id": 42, "note": 'a, "b" }', "ids": [1, 2]},
+    ]
+    assert parser.done
+
+
+def test_streamed_message_interleaved_arguments():
+    message = StreamedMessage("Agent", parse_arguments=True)
+    fragments = [
+        (0, "call_a", "first", '{"a": 1,'),
+        (1, "call_b", "second", '{"b": 2}'),
+        (0, None, None, ' "c": 3}'),
+    ]
+    for index, id, name, arguments in fragments:
+        message.add(
+            ChoiceDelta(
+                tool_calls=[
+                    {
+                        "index": index,
+                        "id": id,
+                        "type": "function" if id else None,
+                        "function": {"name": name, "arguments": arguments},
+                    }
+                ]
+            )
+        )
+
+    assert [(u["id"], u["arguments"], u["done"]) for u in message.updates] == [
+        ("call_a", {"a": 1}, False),
+        ("call_b", {"b": 2}, True),
+        ("call_a", {"a": 1, "c": 3}, True),
+    ]
+    tool_calls = message.to_dict()["tool_calls"]
+    assert [call["function"]["arguments"] for call in tool_calls] == [
+        '{"a": 1, "c": 3}',
+        '{"b": 2}',
+    ]